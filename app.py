@@ -1,9 +1,11 @@
 # app.py
 
 import streamlit as st
+from logic.utils.instrumentation import write_prometheus
 
 # Step 1: Load users from secrets
 USERS = st.secrets["users"]
+ADMINS = st.secrets.get("admins", [])
 
 # Step 2: Page configuration
 st.set_page_config(page_title="Siempre Energy App", layout="wide")
@@ -46,7 +48,10 @@ if st.session_state.logged_in:
     st.sidebar.title("📋 Menu")
     st.sidebar.markdown(f"👤 Usuario: `{st.session_state.username}`")
     logout_button()
-    section = st.sidebar.radio("Navegar", ["🏠 Home", "🔆 Solar Calculator", "📊 Dashboard AMM", "📡 Dashboard CNEE"])
+    sections = ["🏠 Home", "🔆 Solar Calculator", "📊 Dashboard AMM", "📡 Dashboard CNEE"]
+    if st.session_state.username in ADMINS:
+        sections.append("📈 Métricas")
+    section = st.sidebar.radio("Navegar", sections)
 
     # Page: Home
     if section == "🏠 Home":
@@ -76,5 +81,13 @@ if st.session_state.logged_in:
         from pages import cnee_dash
         cnee_dash.render()
 
+    # Page: Metrics (admins only)
+    elif section == "📈 Métricas":
+        from pages import metrics_dash
+        metrics_dash.render()
+
+    # Export metrics for scraping when PHOTONIC_METRICS_FILE is set
+    write_prometheus()
+
 else:
     login_screen()
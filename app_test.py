@@ -1,8 +1,7 @@
 import streamlit as st
 from streamlit_folium import st_folium
 import folium
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+from logic.clients.geocoder import GeocodingError, get_geocoder
 
 st.set_page_config(page_title="Guatemala Map Pin Picker", layout="centered")
 st.title("Select Location on Map")
@@ -40,16 +39,15 @@ if manual_lat and manual_lon:
 
 # If address is entered and manual coordinates are not used, geocode it
 elif address:
-    geolocator = Nominatim(user_agent="streamlit_app")
     try:
-        location = geolocator.geocode(address, timeout=10)
+        location = get_geocoder().geocode(address)
         if location:
-            st.session_state.pin_lat = location.latitude
-            st.session_state.pin_lon = location.longitude
+            st.session_state.pin_lat = location["latitude"]
+            st.session_state.pin_lon = location["longitude"]
             st.success("📍 Pin set from address.")
         else:
             st.warning("⚠️ Address not found. Try clicking the map instead.")
-    except (GeocoderTimedOut, GeocoderUnavailable) as e:
+    except GeocodingError as e:
         st.error(f"🌐 Geocoding error: {e}")
 
 # Use session state to center map and place marker
@@ -0,0 +1,241 @@
+# benchmarks/run_benchmarks.py
+"""
+Times each stage of the quote pipeline and compares the results with a baseline.
+
+    python -m benchmarks.run_benchmarks                      # run and compare
+    python -m benchmarks.run_benchmarks --update-baseline    # record a new baseline
+    python -m benchmarks.run_benchmarks --large              # include the 100k batch
+    python -m benchmarks.run_benchmarks --stages billing irr --threshold 0.5
+
+Exits with status 1 when any stage's best time per call exceeds its baseline
+by more than the threshold (a fraction, 0.25 = 25% slower), or when a stage
+that ran has no baseline entry. The minimum over
+repeats is compared because it is the least sensitive to machine noise.
+Stages that take under FAST_STAGE_SECONDS per call jitter by more than 25%
+between runs, so they are allowed at least FAST_STAGE_THRESHOLD. Per-stage
+thresholds can be set under "thresholds" in the baseline file.
+
+Timings only mean something on the machine that recorded them, so the
+baseline file is not committed: record one per machine with --update-baseline
+before comparing.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+# Sub-millisecond stages are allowed to double before they count as a regression
+FAST_STAGE_SECONDS = 0.001
+FAST_STAGE_THRESHOLD = 1.0
+
+KWH = [240, 250, 260, 255]
+DEPARTMENT = "Guatemala"
+DISTRIBUTOR = "EGGSA"
+RATE_TYPE = "BT"
+IRRADIANCE = [5.05, 5.28, 5.54, 5.68, 5.71, 5.60, 5.60, 5.50, 5.43, 5.35, 5.15, 5.01]
+
+
+class _NullWriter:
+    def write(self, records):
+        pass
+
+
+def _leads(count):
+    for i in range(count):
+        yield {
+            "id": str(i),
+            "kwh": [200 + i % 400, 210, 220, 230],
+            "department": DEPARTMENT,
+            "distributor": DISTRIBUTOR,
+            "rate_type": RATE_TYPE,
+            "sizing_preference": "Balanced",
+        }
+
+
+def build_stages():
+    """
+    Returns {stage name: (callable, calls per measurement, is_large)}.
+    Imports happen here so import time is not measured.
+    """
+    from logic.energy.system_calculator import SystemCalculator
+    from logic.financial.metrics_calculator import FinancialMetricsCalculator
+    from logic.generation.data_generator import DataGenerator
+    from logic.pipeline import run_batch, run_quote
+    from logic.utils.billing_calculator import BillingCalculator
+    from logic.utils.data_loader import get_full_pricing_data, get_monthly_irradiance
+
+    consumption = DataGenerator.simulate_monthly_distribution(3015, seed=1)
+    generation = DataGenerator.simulate_monthly_generation_from_irradiance(4, IRRADIANCE)
+    cash_flows = FinancialMetricsCalculator.calculate_cashflow_list(18300, 5400)
+
+    def data_loader():
+        get_full_pricing_data(DISTRIBUTOR, RATE_TYPE, DEPARTMENT)
+        get_monthly_irradiance(DEPARTMENT)
+
+    def sizing():
+        system_kw = SystemCalculator.calculate_required_system_size_kw(251.25, 5.41)
+        panels = SystemCalculator.calculate_number_of_panels(system_kw)
+        SystemCalculator.calculate_installed_power_kw(panels)
+        SystemCalculator.calculate_required_area_m2(panels)
+        annual = SystemCalculator.calculate_annual_generation_kwh(panels, 5.41)
+        SystemCalculator.calculate_coverage_percentage(annual, 251.25, "Balanced")
+
+    def simulation():
+        DataGenerator.simulate_monthly_distribution(3015, seed=1)
+        DataGenerator.simulate_monthly_generation_from_irradiance(4, IRRADIANCE)
+        DataGenerator.simulate_annual_data_series(3015, seed=1)
+
+    def billing():
+        BillingCalculator.generate_annual_cost_comparison(consumption, generation, DISTRIBUTOR, RATE_TYPE, DEPARTMENT)
+
+    def irr():
+        FinancialMetricsCalculator.calculate_irr(cash_flows)
+
+    def pdf_report():
+        from logic.utils.pdf_report import PDFReport
+
+        pdf = PDFReport()
+        pdf.add_cover_page()
+        pdf.add_page()
+        pdf.add_user_info({"first_name": "Ana", "last_name": "López", "email": "ana@example.com"})
+        pdf.add_results({"Panels": 4, "Annual Generation (kWh)": 3757.0}, {"IRR (%)": 29.5})
+        pdf.save_to_buffer()
+
+    def single_quote():
+        run_quote(KWH, DEPARTMENT, DISTRIBUTOR, RATE_TYPE)
+
+    def batch_1k():
+        run_batch(_leads(1000), _NullWriter(), workers=1, chunk_size=1000)
+
+    def batch_100k():
+        run_batch(_leads(100000), _NullWriter(), workers=os.cpu_count() or 1, chunk_size=5000)
+
+    return {
+        "data_loader": (data_loader, 1000, False),
+        "sizing": (sizing, 1000, False),
+        "simulation": (simulation, 200, False),
+        "billing": (billing, 200, False),
+        "irr": (irr, 200, False),
+        "pdf_report": (pdf_report, 5, False),
+        "single_quote": (single_quote, 500, False),
+        "batch_1k": (batch_1k, 1, False),
+        "batch_100k": (batch_100k, 1, True),
+    }
+
+
+def time_stage(func, number, repeat):
+    """
+    Runs func number times per measurement, repeat measurements.
+    Returns median and minimum seconds per call.
+    """
+    func()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return {"median_s": statistics.median(samples), "min_s": min(samples), "number": number, "repeat": repeat}
+
+
+def run(stage_names=None, include_large=False, repeat=7):
+    stages = build_stages()
+    results = {}
+    for name, (func, number, is_large) in stages.items():
+        if stage_names and name not in stage_names:
+            continue
+        if is_large and not include_large and not stage_names:
+            continue
+        try:
+            results[name] = time_stage(func, number, 1 if is_large else repeat)
+        except ImportError as e:
+            print(f"{name:<14} skipped ({e})")
+            continue
+        print(f"{name:<14} {results[name]['min_s'] * 1000:>12.4f} ms/call (median {results[name]['median_s'] * 1000:.4f})")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns a list of (stage, current, baseline, allowed) for regressed stages.
+    """
+    regressions = []
+    stage_thresholds = baseline.get("thresholds", {})
+    for name, current in results.items():
+        reference = baseline.get("stages", {}).get(name)
+        if reference is None:
+            continue
+        default = threshold if reference["min_s"] >= FAST_STAGE_SECONDS else max(threshold, FAST_STAGE_THRESHOLD)
+        allowed = reference["min_s"] * (1 + stage_thresholds.get(name, default))
+        if current["min_s"] > allowed:
+            regressions.append((name, current["min_s"], reference["min_s"], allowed))
+    return regressions
+
+
+def missing_baselines(results, baseline):
+    """
+    Returns the names of stages that ran but have no baseline entry.
+    """
+    return [name for name in results if name not in baseline.get("stages", {})]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the quote pipeline stages.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file.")
+    parser.add_argument("--output", help="Also write this run's results to a JSON file.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown as a fraction.")
+    parser.add_argument("--stages", nargs="+", help="Only run these stages.")
+    parser.add_argument("--large", action="store_true", help="Include the 100k-lead batch.")
+    parser.add_argument("--repeat", type=int, default=7, help="Measurements per stage.")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline.")
+    args = parser.parse_args(argv)
+
+    results = run(args.stages, args.large, args.repeat)
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "stages": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        previous = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                previous = json.load(f)
+        report["stages"] = {**previous.get("stages", {}), **results}
+        report["thresholds"] = previous.get("thresholds", {})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline first.")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, current, reference, allowed in regressions:
+        print(f"REGRESSION {name}: {current * 1000:.4f} ms/call vs baseline {reference * 1000:.4f} (allowed {allowed * 1000:.4f})")
+    missing = missing_baselines(results, baseline)
+    for name in missing:
+        print(f"NO BASELINE {name}: run with --update-baseline to record it.")
+    return 1 if regressions or missing else 0
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.exit(main())
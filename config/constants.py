@@ -27,4 +27,49 @@ SYSTEM_LIFETIME_YEARS = 25
 COST_PER_KW = 7500
 
 # Energy price per kWh
-PRICE_PER_KWH = 1.8
\ No newline at end of file
+PRICE_PER_KWH = 1.8
+
+# Annual discount rate used for NPV and discounted payback
+DISCOUNT_RATE = 0.08
+
+# System size multipliers applied for each sizing preference
+SIZING_FACTORS = {"minimum": 0.8, "balanced": 1.0, "maximum": 1.2}
+
+# Days in each month of a non-leap year
+DAYS_PER_MONTH = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
+# Hours in a non-leap year, used by the hourly simulations
+HOURS_PER_YEAR = 8760
+
+# Local time offset from UTC in hours (Guatemala, no daylight saving)
+UTC_OFFSET_HOURS = -6
+
+# Site used to shape hourly generation when a quote has no coordinates (Guatemala City)
+DEFAULT_LATITUDE = 14.6349
+DEFAULT_LONGITUDE = -90.5069
+
+# Shared quote cache: maximum entries, time to live and kWh bucket width
+QUOTE_CACHE_MAXSIZE = 1024
+QUOTE_CACHE_TTL_SECONDS = 3600
+QUOTE_CACHE_KWH_PRECISION = 5
+
+# Distribution company serving each department (EGGSA: center, DEOCSA: west, DEORSA: east)
+DEPARTMENT_DISTRIBUTORS = {
+    "Guatemala": "EGGSA", "Sacatepéquez": "EGGSA", "Escuintla": "EGGSA",
+    "Chimaltenango": "DEOCSA", "Huehuetenango": "DEOCSA", "Quetzaltenango": "DEOCSA",
+    "Quiché": "DEOCSA", "Retalhuleu": "DEOCSA", "San Marcos": "DEOCSA",
+    "Sololá": "DEOCSA", "Suchitepéquez": "DEOCSA", "Totonicapán": "DEOCSA",
+    "Alta Verapaz": "DEORSA", "Baja Verapaz": "DEORSA", "Chiquimula": "DEORSA",
+    "El Progreso": "DEORSA", "Izabal": "DEORSA", "Jalapa": "DEORSA",
+    "Jutiapa": "DEORSA", "Petén": "DEORSA", "Santa Rosa": "DEORSA", "Zacapa": "DEORSA",
+}
+
+# Farthest typical-year weather site used for a location, in km
+TMY_MAX_SITE_DISTANCE_KM = 30
+
+# Fraction of irradiance reflected by the ground in front of the modules
+GROUND_ALBEDO = 0.2
+
+# Module tilts (degrees from horizontal) and azimuths (degrees clockwise from north) searched for the best orientation
+ORIENTATION_TILTS = list(range(0, 91, 5))
+ORIENTATION_AZIMUTHS = list(range(0, 360, 10))
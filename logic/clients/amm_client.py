@@ -0,0 +1,119 @@
+# logic/clients/amm_client.py
+"""
+Client for the AMM (Administrador del Mercado Mayorista) daily generation
+charts.
+
+Responses are cached per (category, date) in memory and on disk. A copy
+downloaded after its date was over never changes, so it is cached
+permanently. Today's data is refreshed after ttl seconds, and a copy
+downloaded while its date was still current expires once the date is over. prefetch() downloads every category for a date in parallel,
+so switching categories in the dashboard does not wait on the network.
+"""
+
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from config.constants import UTC_OFFSET_HOURS
+from logic.clients.base import CachedJsonClient
+from logic.clients.http import DEFAULT_TIMEOUT
+
+AMM_URLS = {
+    "Tecnología": "https://wl12.amm.org.gt/GraficaPW/graficaAreaScada?dt=",
+    "Tipo de Recurso": "https://wl12.amm.org.gt/GraficaPW/graficaTipoRecurso?dt=",
+    "Tipo de Combustible": "https://wl12.amm.org.gt/GraficaPW/graficaCombustible?dt=",
+}
+
+# Seconds before today's data is downloaded again
+AMM_TODAY_TTL_SECONDS = 300
+
+
+LOCAL_TIMEZONE = timezone(timedelta(hours=UTC_OFFSET_HOURS))
+
+
+def local_today():
+    """
+    Current date in Guatemala.
+    """
+    return datetime.now(LOCAL_TIMEZONE).date()
+
+
+def local_date(timestamp):
+    """
+    Date in Guatemala at a Unix timestamp.
+    """
+    return datetime.fromtimestamp(timestamp, LOCAL_TIMEZONE).date()
+
+
+class AMMClient(CachedJsonClient):
+    """
+    Fetches AMM chart data over a pooled session with retries and caching.
+    Keys are (category, ISO date) tuples.
+    """
+
+    name = "amm"
+
+    def __init__(self, session=None, cache_dir=None, ttl=AMM_TODAY_TTL_SECONDS, timeout=DEFAULT_TIMEOUT, max_workers=len(AMM_URLS)):
+        super().__init__(session, cache_dir, timeout, max_workers)
+        self.ttl = ttl
+
+    def url(self, key):
+        category, day = key
+        return AMM_URLS[category] + date.fromisoformat(day).strftime("%d/%m/%Y")
+
+    def is_fresh(self, key, stored_at):
+        day = date.fromisoformat(key[1])
+        if local_date(stored_at) > day:
+            return True
+        # Downloaded while the date was current: partial, and stale once it is over
+        return day >= local_today() and time.time() - stored_at <= self.ttl
+
+    def should_store(self, key, data):
+        # Empty answers for past dates are not cached
+        return bool(data) or date.fromisoformat(key[1]) >= local_today()
+
+    def fetch(self, category, day):
+        """
+        Returns the list of hourly records for a category and date.
+        Raises KeyError for unknown categories and requests exceptions when
+        the download fails.
+        """
+        if category not in AMM_URLS:
+            raise KeyError(f"Unknown AMM category: {category}")
+        key = (category, day.isoformat())
+        records = self.cached(key)
+        if records is not None:
+            return records
+        return self.submit(key).result()
+
+    def prefetch(self, day, categories=None):
+        """
+        Starts downloading every category for the date that is not cached yet.
+        Returns immediately.
+        """
+        for category in categories or AMM_URLS:
+            key = (category, day.isoformat())
+            if self.cached(key) is None:
+                self.submit(key)
+
+    def fetch_all(self, day):
+        """
+        Returns {category: records} for every category, fetched concurrently.
+        """
+        self.prefetch(day)
+        return {category: self.fetch(category, day) for category in AMM_URLS}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_amm_client():
+    """
+    Returns the process-wide AMMClient.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = AMMClient()
+    return _client
@@ -0,0 +1,109 @@
+# logic/clients/base.py
+"""
+Base class for clients that download JSON documents and cache them in
+memory and on disk.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from cachetools import LRUCache
+from logic.clients.disk_cache import DEFAULT_CACHE_DIR, DiskCache
+from logic.clients.http import DEFAULT_TIMEOUT, get_json, make_session
+from logic.utils.instrumentation import timed
+
+
+class CachedJsonClient:
+    """
+    Downloads documents identified by a tuple key on a thread pool.
+
+    Subclasses implement url(key) and may override max_age(key) (seconds a
+    cached copy stays fresh; None = forever) or is_fresh(key, stored_at) for
+    rules that depend on when the copy was downloaded, and should_store(key,
+    data) to keep a response out of both caches.
+    Concurrent requests for the same key share a single download.
+    """
+
+    name = "http"
+
+    def __init__(self, session=None, cache_dir=None, timeout=DEFAULT_TIMEOUT, max_workers=4):
+        self.session = session or make_session(pool_size=max_workers)
+        self.disk = DiskCache(os.path.join(cache_dir or DEFAULT_CACHE_DIR, self.name))
+        self.timeout = timeout
+        self._memory = LRUCache(maxsize=512)
+        self._inflight = {}
+        # Reentrant: a download that finishes immediately runs its callback under the lock
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=self.name)
+
+    def url(self, key):
+        raise NotImplementedError
+
+    def max_age(self, key):
+        return None
+
+    def is_fresh(self, key, stored_at):
+        max_age = self.max_age(key)
+        return max_age is None or time.time() - stored_at <= max_age
+
+    def should_store(self, key, data):
+        return True
+
+    def lookup(self, key):
+        """
+        Returns (data, is_fresh) from memory or disk, or (None, False) if the
+        key was never downloaded.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is None:
+            age = self.disk.age(key)
+            data = None if age is None else self.disk.get(key)
+            if data is None:
+                return None, False
+            entry = (time.time() - age, data)
+            with self._lock:
+                self._memory[key] = entry
+
+        stored_at, data = entry
+        return data, self.is_fresh(key, stored_at)
+
+    def cached(self, key):
+        """
+        Returns the cached data if it is still fresh, otherwise None.
+        """
+        data, fresh = self.lookup(key)
+        return data if fresh else None
+
+    def _download(self, key):
+        with timed(f"http.{self.name}"):
+            data = get_json(self.session, self.url(key), self.timeout)
+        if self.should_store(key, data):
+            with self._lock:
+                self._memory[key] = (time.time(), data)
+            self.disk.set(key, data)
+        return data
+
+    def submit(self, key):
+        """
+        Starts a download unless one is already running for the same key or
+        one finished since the caller last checked the cache. Returns its Future.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                # A download stores its result before it leaves _inflight
+                data, fresh = self.lookup(key)
+                if fresh:
+                    future = Future()
+                    future.set_result(data)
+                    return future
+                future = self._inflight[key] = self._executor.submit(self._download, key)
+                future.add_done_callback(lambda _, key=key: self._forget(key))
+        return future
+
+    def _forget(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
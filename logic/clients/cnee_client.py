@@ -0,0 +1,150 @@
+# logic/clients/cnee_client.py
+"""
+Client for the CNEE (Comisión Nacional de Energía Eléctrica) tariff history
+endpoints.
+
+Responses are cached per (distributor, endpoint) on disk. A cached copy older
+than max_age is still served immediately while a fresh one downloads in the
+background. Only a distributor that was never downloaded waits on the
+network. warm_all() fills the cache for every distributor in the background.
+"""
+
+import os
+import threading
+
+from logic.clients.base import CachedJsonClient
+from logic.clients.http import DEFAULT_TIMEOUT
+
+CNEE_BASE_URL = "https://www.cnee.gob.gt/Calculadora/datos/"
+
+# Endpoint name -> PHP script
+CNEE_ENDPOINTS = {
+    "BTS_TS": "db.BTS_TS.php",
+    "BTS": "db.BTS.php",
+    "TS": "db.TS.php",
+}
+
+# Cost breakdowns are only published for the three large distributors
+COST_ENDPOINTS = ("BTS", "TS")
+COST_DISTRIBUTOR_IDS = (1, 2, 3)
+
+DISTRIBUIDORAS = {
+    "EGGSA": 1,
+    "DEOCSA": 2,
+    "DEORSA": 3,
+    "EMM GUALAN": 4,
+    "EMM GUASTATOYA": 5,
+    "EMM JALAPA": 6,
+    "EMM SAN PEDRO PINULA": 7,
+    "EMM JOYABAJ": 8,
+    "EMM PATULUL": 9,
+    "EMM RETALHULEU": 10,
+    "EMM SAN MARCOS": 11,
+    "EMM SAN PEDRO SAC": 12,
+    "EMM PTO BARRIOS": 13,
+    "EMM IXCAN": 14,
+    "EMM ZACAPA": 15,
+    "EMM QUETZALTENANGO": 16,
+    "EMM HUEHUETENANGO": 17,
+    "EMM YULXAK STA EULALIA": 18,
+    "EMM TECANA": 19,
+}
+
+# Seconds a cached response is considered fresh (tariffs change quarterly)
+CNEE_MAX_AGE_SECONDS = int(os.environ.get("PHOTONIC_CNEE_MAX_AGE", 6 * 3600))
+
+
+def endpoints_for(distributor_id):
+    """
+    Returns the endpoint names published for a distributor id.
+    """
+    if distributor_id in COST_DISTRIBUTOR_IDS:
+        return tuple(CNEE_ENDPOINTS)
+    return tuple(name for name in CNEE_ENDPOINTS if name not in COST_ENDPOINTS)
+
+
+class CNEEClient(CachedJsonClient):
+    """
+    Fetches CNEE tariff data over a pooled session with retries and a
+    stale-while-revalidate disk cache. Keys are (distributor id, endpoint).
+    """
+
+    name = "cnee"
+
+    def __init__(self, session=None, cache_dir=None, max_age=CNEE_MAX_AGE_SECONDS, timeout=DEFAULT_TIMEOUT, max_workers=6):
+        super().__init__(session, cache_dir, timeout, max_workers)
+        self.freshness = max_age
+        self._warmed = False
+
+    def url(self, key):
+        distributor_id, endpoint = key
+        return f"{CNEE_BASE_URL}{CNEE_ENDPOINTS[endpoint]}?distribuidora={distributor_id}"
+
+    def max_age(self, key):
+        return self.freshness
+
+    def prefetch(self, distributor_id):
+        """
+        Starts downloading every endpoint of the distributor that is missing
+        or stale. Returns immediately.
+        """
+        for endpoint in endpoints_for(distributor_id):
+            key = (distributor_id, endpoint)
+            if self.cached(key) is None:
+                self.submit(key)
+
+    def fetch(self, distributor_id, endpoint):
+        """
+        Returns the endpoint's records for the distributor. A stale cached copy
+        is returned at once and refreshed in the background; without any
+        cached copy this waits for the download.
+        """
+        if endpoint not in CNEE_ENDPOINTS:
+            raise KeyError(f"Unknown CNEE endpoint: {endpoint}")
+        key = (distributor_id, endpoint)
+        data, fresh = self.lookup(key)
+        if data is None:
+            return self.submit(key).result()
+        if not fresh:
+            self.submit(key)
+        return data
+
+    def fetch_all(self, distributor_id):
+        """
+        Returns {endpoint: records} for the distributor, fetched concurrently.
+        """
+        self.prefetch(distributor_id)
+        return {endpoint: self.fetch(distributor_id, endpoint) for endpoint in endpoints_for(distributor_id)}
+
+    def warm_all(self):
+        """
+        Queues downloads for every distributor's missing or stale endpoints.
+        Runs once per client; later calls return immediately.
+        """
+        with self._lock:
+            if self._warmed:
+                return
+            self._warmed = True
+        for distributor_id in DISTRIBUIDORAS.values():
+            self.prefetch(distributor_id)
+
+    def age(self, distributor_id, endpoint):
+        """
+        Seconds since the endpoint was last downloaded, or None.
+        """
+        return self.disk.age((distributor_id, endpoint))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_cnee_client():
+    """
+    Returns the process-wide CNEEClient.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = CNEEClient()
+    return _client
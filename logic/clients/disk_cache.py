@@ -0,0 +1,57 @@
+# logic/clients/disk_cache.py
+"""
+Small JSON file cache for downloaded data, one file per key.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.environ.get("PHOTONIC_CACHE_DIR", ".cache")
+
+
+class DiskCache:
+    """
+    Stores JSON values under directory. Keys are tuples of strings, mapped to
+    nested file paths. Freshness is judged from the file modification time.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, key):
+        parts = [re.sub(r"[^\w.-]+", "_", str(part)) for part in key]
+        return os.path.join(self.directory, *parts[:-1], f"{parts[-1]}.json")
+
+    def get(self, key, max_age=None):
+        """
+        Returns the cached value, or None if it is missing, unreadable or older
+        than max_age seconds (None = never expires).
+        """
+        path = self.path(key)
+        try:
+            if max_age is not None and time.time() - os.path.getmtime(path) > max_age:
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def age(self, key):
+        """
+        Seconds since the key was written, or None if it is not cached.
+        """
+        try:
+            return time.time() - os.path.getmtime(self.path(key))
+        except OSError:
+            return None
+
+    def set(self, key, value):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(temporary_path, path)
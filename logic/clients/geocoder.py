@@ -0,0 +1,244 @@
+# logic/clients/geocoder.py
+"""
+Address geocoding with a persistent cache.
+
+Geocoder sits in front of a pluggable backend (Nominatim by default):
+
+- results are stored in a SQLite table keyed on the normalized address, so
+  "19 Calle 16-29,  Zona 7" and "19 calle 16-29, zona 7" share one entry and
+  repeated searches never reach the network. Addresses that were not found
+  are cached too, but expire after GEOCODE_NOT_FOUND_MAX_AGE_SECONDS.
+- backend calls go through a token bucket. Nominatim's usage policy allows
+  one request per second.
+- geocode_many() de-duplicates a list of addresses, answers what it can from
+  the cache and looks up the rest with bounded concurrency.
+
+A backend is any object with geocode(address) returning
+(latitude, longitude, display_name) or None, raising GeocodingError when the
+service cannot be reached.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from logic.clients.disk_cache import DEFAULT_CACHE_DIR
+from logic.clients.http import DEFAULT_TIMEOUT, get_json, make_session
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+NOMINATIM_USER_AGENT = "photonic-solar-calculator"
+GEOCODE_RATE_PER_SECOND = 1.0
+GEOCODE_MAX_WORKERS = 2
+GEOCODE_NOT_FOUND_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocodes (
+    query TEXT PRIMARY KEY,
+    latitude REAL,
+    longitude REAL,
+    display_name TEXT,
+    fetched_at REAL NOT NULL
+)
+"""
+
+
+class GeocodingError(Exception):
+    """
+    Raised when the geocoding service cannot be reached or fails.
+    """
+
+
+def normalize_address(address):
+    """
+    Returns the cache key for an address: accents removed, case folded,
+    whitespace collapsed and spaces before commas dropped.
+    """
+    text = unicodedata.normalize("NFKD", str(address)).encode("ascii", "ignore").decode()
+    text = re.sub(r"\s+", " ", text.casefold()).strip(" ,.;")
+    return re.sub(r"\s*,\s*", ", ", text)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: acquire() blocks until a token is available.
+    Tokens refill at `rate` per second up to `capacity`.
+    """
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+class NominatimBackend:
+    """
+    OpenStreetMap Nominatim search over the shared pooled session.
+    """
+
+    def __init__(self, session=None, url=NOMINATIM_URL, user_agent=NOMINATIM_USER_AGENT, timeout=DEFAULT_TIMEOUT):
+        self.session = session or make_session(GEOCODE_MAX_WORKERS)
+        self.session.headers["User-Agent"] = user_agent
+        self.url = url
+        self.timeout = timeout
+
+    def geocode(self, address):
+        query = requests.Request("GET", self.url, params={"q": address, "format": "jsonv2", "limit": 1}).prepare().url
+        try:
+            results = get_json(self.session, query, timeout=self.timeout)
+        except (requests.RequestException, ValueError) as e:
+            raise GeocodingError(str(e)) from e
+        if not results:
+            return None
+        try:
+            best = results[0]
+            return float(best["lat"]), float(best["lon"]), best.get("display_name", address)
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError) as e:
+            raise GeocodingError(f"Malformed Nominatim result: {e!r}") from e
+
+
+class GeocodeCache:
+    """
+    SQLite table of geocoding results keyed on normalized addresses.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(SCHEMA)
+
+    def get_many(self, queries, not_found_max_age=GEOCODE_NOT_FOUND_MAX_AGE_SECONDS):
+        """
+        Returns {query: result or None} for the cached queries. Expired
+        not-found entries are left out so they are looked up again.
+        """
+        found = {}
+        queries = list(queries)
+        oldest_not_found = time.time() - not_found_max_age
+        with self._lock:
+            for start in range(0, len(queries), 500):
+                batch = queries[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT query, latitude, longitude, display_name, fetched_at FROM geocodes "
+                    f"WHERE query IN ({', '.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for query, latitude, longitude, display_name, fetched_at in rows:
+                    if latitude is not None:
+                        found[query] = {"latitude": latitude, "longitude": longitude, "address": display_name}
+                    elif fetched_at >= oldest_not_found:
+                        found[query] = None
+        return found
+
+    def set(self, query, result):
+        row = (None, None, None) if result is None else (result["latitude"], result["longitude"], result["address"])
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?, ?, ?)", (query, *row, time.time())
+            )
+
+    def close(self):
+        self._connection.close()
+
+
+class Geocoder:
+    """
+    Cached, rate-limited geocoder. Results are dictionaries with latitude,
+    longitude and the backend's display address, or None if not found.
+    """
+
+    def __init__(self, backend=None, cache_path=None, rate=GEOCODE_RATE_PER_SECOND, max_workers=GEOCODE_MAX_WORKERS):
+        self.backend = backend or NominatimBackend()
+        self.cache = GeocodeCache(cache_path or os.path.join(DEFAULT_CACHE_DIR, "geocode.sqlite"))
+        self.bucket = TokenBucket(rate)
+        self.max_workers = max_workers
+
+    def _lookup(self, query, address):
+        self.bucket.acquire()
+        found = self.backend.geocode(address)
+        result = None if found is None else {"latitude": found[0], "longitude": found[1], "address": found[2]}
+        self.cache.set(query, result)
+        return result
+
+    def geocode(self, address):
+        """
+        Geocodes one address. Raises GeocodingError if the backend fails.
+        """
+        query = normalize_address(address)
+        cached = self.cache.get_many([query])
+        if query in cached:
+            return cached[query]
+        return self._lookup(query, address)
+
+    def geocode_many(self, addresses, failures=None):
+        """
+        Geocodes a list of addresses and returns results in the same order.
+        Each distinct normalized address is looked up at most once. Addresses
+        whose lookup failed (any backend error) come back as None and are not
+        cached, so the next run retries them. To tell them apart from
+        addresses that were not found, pass a dict as failures: it receives
+        {address: error message} for every failed lookup.
+        """
+        queries = [normalize_address(address) for address in addresses]
+        results = self.cache.get_many(set(queries))
+        pending = {}
+        for query, address in zip(queries, addresses):
+            if query not in results and query not in pending:
+                pending[query] = address
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {query: pool.submit(self._lookup, query, address) for query, address in pending.items()}
+            errors = {}
+            for query, future in futures.items():
+                try:
+                    results[query] = future.result()
+                except Exception as e:
+                    results[query] = None
+                    errors[query] = f"{type(e).__name__}: {e}"
+            if failures is not None:
+                for query, address in zip(queries, addresses):
+                    if query in errors:
+                        failures[address] = errors[query]
+
+        return [results[query] for query in queries]
+
+
+_geocoder = None
+_geocoder_lock = threading.Lock()
+
+def get_geocoder():
+    """
+    Returns the process-wide Geocoder.
+    """
+    global _geocoder
+    if _geocoder is None:
+        with _geocoder_lock:
+            if _geocoder is None:
+                _geocoder = Geocoder()
+    return _geocoder
@@ -0,0 +1,48 @@
+# logic/clients/http.py
+"""
+Shared HTTP plumbing for the external data clients: a pooled requests
+session, default timeouts and retries with exponential backoff.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 20)
+RETRY_ATTEMPTS = 3
+
+
+def make_session(pool_size=10):
+    """
+    Returns a requests.Session whose connection pool can serve pool_size
+    concurrent requests per host.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _is_transient(error):
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(error, "response", None)
+    return isinstance(error, requests.HTTPError) and response is not None and response.status_code >= 500
+
+
+@retry(
+    retry=retry_if_exception(_is_transient),
+    stop=stop_after_attempt(RETRY_ATTEMPTS),
+    wait=wait_exponential(multiplier=0.5, max=4),
+    reraise=True,
+)
+def get_json(session, url, timeout=DEFAULT_TIMEOUT):
+    """
+    GETs url and returns the decoded JSON body. Connection errors, timeouts
+    and 5xx responses are retried; other errors are raised immediately.
+    """
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
@@ -1,7 +1,12 @@
 # logic/energy/consumption_calculator.py
 
-import random
+import numpy as np
+from logic.energy.load_profiles import normalized_load_shape
+from logic.generation.scenario_generator import ScenarioGenerator
+from logic.utils.hourly_calendar import MONTH_OF_HOUR
+from logic.utils.instrumentation import instrument_class
 
+@instrument_class("consumption")
 class ConsumptionCalculator:
     """
     Handles calculations and simulations related to electricity consumption.
@@ -22,20 +27,30 @@ class ConsumptionCalculator:
         return avg_monthly_kwh * 12
 
     @staticmethod
-    def simulate_monthly_consumption(avg_monthly_kwh, variation=0.05):
+    def simulate_monthly_consumption(avg_monthly_kwh, variation=0.05, seed=None):
         """
         Simulates 12 months of consumption with realistic variation.
         Ensures the total equals the expected annual value.
+        Pass a seed for reproducible results.
         """
-        base = avg_monthly_kwh
-        values = []
+        return ScenarioGenerator(seed).monthly_consumption(avg_monthly_kwh, 1, variation)[0].tolist()
 
-        for _ in range(12):
-            factor = 1 + random.uniform(-variation, variation)
-            values.append(base * factor)
+    @staticmethod
+    def synthesize_hourly_load_profile(monthly_kwh, profile="residential", year=2025):
+        """
+        Spreads 12 monthly kWh totals over the 8760 hours of the year using a
+        standard daily/weekly load shape (residential, commercial or industrial).
+        Accepts (12,) or (n_customers, 12) totals and returns (8760,) or (n_customers, 8760).
+        The profile may be one name or one name per customer.
+        """
+        monthly = np.asarray(monthly_kwh, dtype=float)
+        if monthly.shape[-1] != 12:
+            raise ValueError("Expected 12 monthly consumption values.")
 
-        total = sum(values)
-        scale = (avg_monthly_kwh * 12) / total
-        adjusted = [v * scale for v in values]
+        if isinstance(profile, str):
+            weights = normalized_load_shape(profile, year)
+        else:
+            names, index = np.unique(np.asarray(profile, dtype=object), return_inverse=True)
+            weights = np.stack([normalized_load_shape(name, year) for name in names])[index]
 
-        return adjusted
+        return monthly[..., MONTH_OF_HOUR] * weights
@@ -0,0 +1,49 @@
+# logic/energy/load_profiles.py
+
+from functools import lru_cache
+
+import numpy as np
+from logic.utils.hourly_calendar import HOUR_OF_DAY, MONTH_OF_HOUR, day_of_week, monthly_totals
+
+# Relative hourly demand (hour 0 to 23) for a typical weekday and weekend day
+DAILY_LOAD_SHAPES = {
+    "residential": {
+        "weekday": [0.45, 0.40, 0.38, 0.37, 0.38, 0.50, 0.80, 1.00, 0.85, 0.70, 0.65, 0.65,
+                    0.70, 0.68, 0.65, 0.68, 0.80, 1.00, 1.35, 1.50, 1.45, 1.25, 0.95, 0.65],
+        "weekend": [0.50, 0.45, 0.40, 0.38, 0.38, 0.42, 0.55, 0.75, 0.95, 1.05, 1.05, 1.05,
+                    1.05, 1.00, 0.95, 0.95, 1.00, 1.10, 1.35, 1.45, 1.40, 1.20, 0.95, 0.70],
+    },
+    "commercial": {
+        "weekday": [0.30, 0.28, 0.28, 0.28, 0.30, 0.35, 0.50, 0.80, 1.20, 1.45, 1.55, 1.60,
+                    1.55, 1.55, 1.60, 1.55, 1.45, 1.20, 0.85, 0.60, 0.45, 0.38, 0.33, 0.30],
+        "weekend": [0.28, 0.27, 0.27, 0.27, 0.28, 0.30, 0.35, 0.45, 0.60, 0.70, 0.75, 0.75,
+                    0.75, 0.72, 0.70, 0.65, 0.58, 0.50, 0.42, 0.36, 0.32, 0.30, 0.29, 0.28],
+    },
+    "industrial": {
+        "weekday": [0.55, 0.55, 0.55, 0.55, 0.60, 0.80, 1.15, 1.30, 1.35, 1.35, 1.35, 1.30,
+                    1.20, 1.30, 1.35, 1.35, 1.30, 1.20, 1.05, 0.95, 0.85, 0.70, 0.60, 0.55],
+        "weekend": [0.45, 0.45, 0.45, 0.45, 0.45, 0.50, 0.60, 0.70, 0.75, 0.75, 0.75, 0.75,
+                    0.70, 0.70, 0.70, 0.70, 0.65, 0.60, 0.55, 0.50, 0.50, 0.48, 0.46, 0.45],
+    },
+}
+
+@lru_cache(maxsize=None)
+def normalized_load_shape(profile="residential", year=2025):
+    """
+    Returns 8760 hourly weights for a customer class.
+    Weights within each month sum to 1, so multiplying by a month's kWh total
+    spreads it over that month's hours. The result is cached and read-only.
+    """
+    try:
+        shapes = DAILY_LOAD_SHAPES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown load profile: {profile}") from None
+
+    weekday = np.asarray(shapes["weekday"])
+    weekend = np.asarray(shapes["weekend"])
+    is_weekend = day_of_week(year) >= 5
+    weights = np.where(is_weekend, weekend[HOUR_OF_DAY], weekday[HOUR_OF_DAY])
+
+    weights = weights / monthly_totals(weights)[MONTH_OF_HOUR]
+    weights.flags.writeable = False
+    return weights
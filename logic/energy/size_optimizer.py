@@ -0,0 +1,77 @@
+# logic/energy/size_optimizer.py
+
+from math import floor
+
+import numpy as np
+from config.constants import *
+from logic.financial.metrics_calculator import FinancialMetricsCalculator
+from logic.generation.data_generator import DataGenerator
+from logic.utils.billing_calculator import BillingCalculator
+from logic.utils.instrumentation import instrument_class
+
+@instrument_class("size_optimizer")
+class SystemSizeOptimizer:
+    """
+    Finds the panel count that maximizes NPV by evaluating every feasible
+    count at once as rows of a matrix.
+    """
+
+    @staticmethod
+    def calculate_max_panels(roof_area_m2):
+        """
+        Returns how many panels fit on the available roof area.
+        """
+        return floor(roof_area_m2 / PANEL_AREA_M2 + 1e-9)
+
+    @staticmethod
+    def evaluate_panel_counts(monthly_consumption, monthly_irradiance, distributor, rate_type, department, max_panels, years=SYSTEM_LIFETIME_YEARS, discount_rate=DISCOUNT_RATE):
+        """
+        Evaluates every panel count from 1 to max_panels in one pass.
+        Returns a dictionary of arrays (one entry per count): panels, installed_kw,
+        annual_generation, annual_savings, investment, npv, irr, payback.
+        """
+        panels = np.arange(1, max_panels + 1)
+        generation = DataGenerator.simulate_monthly_generation_matrix(panels, monthly_irradiance)
+        consumption = np.broadcast_to(np.asarray(monthly_consumption, dtype=float), generation.shape)
+        bills = BillingCalculator.generate_annual_cost_comparison_batch(
+            consumption, generation, distributor, rate_type, department
+        )
+
+        installed_kw = panels * PANEL_POWER_KW
+        investment = np.round(installed_kw * COST_PER_KW, 2)
+        savings = bills["annual_savings"]
+        cash_flows = np.hstack([-investment[:, np.newaxis], np.repeat(savings[:, np.newaxis], years, axis=1)])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            payback = np.where(savings > 0, np.round(investment / savings, 2), 0)
+
+        return {
+            "panels": panels,
+            "installed_kw": installed_kw,
+            "annual_generation": generation.sum(axis=1),
+            "annual_savings": savings,
+            "investment": investment,
+            "npv": np.round(FinancialMetricsCalculator.calculate_npv_batch(cash_flows, discount_rate), 2),
+            "irr": FinancialMetricsCalculator.calculate_irr_batch(cash_flows),
+            "payback": payback,
+        }
+
+    @staticmethod
+    def optimize(monthly_consumption, monthly_irradiance, distributor, rate_type, department, roof_area_m2, years=SYSTEM_LIFETIME_YEARS, discount_rate=DISCOUNT_RATE):
+        """
+        Returns the NPV-maximizing system for the roof area.
+        The result holds the optimum's metrics plus the full curve under "curve".
+        Returns None when not even one panel fits on the roof.
+        """
+        max_panels = SystemSizeOptimizer.calculate_max_panels(roof_area_m2)
+        if max_panels < 1:
+            return None
+
+        curve = SystemSizeOptimizer.evaluate_panel_counts(
+            monthly_consumption, monthly_irradiance, distributor, rate_type, department,
+            max_panels, years, discount_rate
+        )
+        best = int(np.argmax(curve["npv"]))
+        optimum = {metric: values[best].item() for metric, values in curve.items()}
+        optimum["curve"] = curve
+        return optimum
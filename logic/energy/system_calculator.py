@@ -2,7 +2,9 @@
 
 from math import ceil
 from config.constants import *
+from logic.utils.instrumentation import instrument_class
 
+@instrument_class("system")
 class SystemCalculator:
     """
     Handles calculations related to system sizing, generation, and area.
@@ -15,6 +17,13 @@ class SystemCalculator:
         """
         return (avg_monthly_kwh * 12) / (annual_irradiance * 365 * SYSTEM_EFFICIENCY)
 
+    @staticmethod
+    def apply_sizing_preference(system_size_kw, sizing_preference):
+        """
+        Scales the required system size by the factor for the sizing preference.
+        """
+        return system_size_kw * SIZING_FACTORS.get(sizing_preference.lower(), 1.0)
+
     @staticmethod
     def calculate_number_of_panels(system_size_kw):
         """
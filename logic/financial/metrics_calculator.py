@@ -1,7 +1,14 @@
 # logic/financial/metrics_calculator.py
 
+import numpy as np
+
 from config.constants import *
+from logic.utils.instrumentation import instrument_class
+
+IRR_LOWER_BOUND = -0.9999
+IRR_UPPER_BOUND = 10.0
 
+@instrument_class("financial")
 class FinancialMetricsCalculator:
     """
     Handles financial and environmental metric calculations.
@@ -94,3 +101,187 @@ class FinancialMetricsCalculator:
                 value += annual_savings
             cumulative.append(round(value, 2))
         return cumulative
+
+    @staticmethod
+    def _as_cashflow_matrix(cash_flows):
+        flows = np.asarray(cash_flows, dtype=float)
+        if flows.ndim == 1:
+            flows = flows[np.newaxis, :]
+        return flows
+
+    @staticmethod
+    def _discount_factors(rates, periods):
+        """
+        Returns an (n, periods) matrix of 1 / (1 + rate) ** t.
+        """
+        return (1 + np.asarray(rates, dtype=float).reshape(-1, 1)) ** -np.arange(periods)
+
+    @staticmethod
+    def calculate_npv_batch(cash_flows, rate=DISCOUNT_RATE):
+        """
+        Calculates the Net Present Value of each row of a 2-D cash flow array.
+        Rate can be a scalar or one value per row.
+        """
+        flows = FinancialMetricsCalculator._as_cashflow_matrix(cash_flows)
+        rates = np.broadcast_to(rate, flows.shape[:1])
+        return (flows * FinancialMetricsCalculator._discount_factors(rates, flows.shape[1])).sum(axis=1)
+
+    @staticmethod
+    def calculate_discounted_payback_batch(cash_flows, rate=DISCOUNT_RATE):
+        """
+        Calculates the discounted payback period in years for each row of a 2-D cash flow array.
+        The year in which the cumulative discounted cash flow turns from negative
+        to non-negative is interpolated linearly. Rows that are never negative
+        pay back immediately (0); rows that never pay back return NaN.
+        """
+        flows = FinancialMetricsCalculator._as_cashflow_matrix(cash_flows)
+        rates = np.broadcast_to(rate, flows.shape[:1])
+        discounted = flows * FinancialMetricsCalculator._discount_factors(rates, flows.shape[1])
+        cumulative = np.cumsum(discounted, axis=1)
+
+        # Only a crossing from a negative balance is interpolated, so the divisor is positive
+        crossing = np.zeros_like(cumulative, dtype=bool)
+        crossing[:, 1:] = (cumulative[:, 1:] >= 0) & (cumulative[:, :-1] < 0)
+        paid_back = crossing.any(axis=1)
+        year = np.argmax(crossing, axis=1)
+
+        rows = np.arange(flows.shape[0])
+        previous = cumulative[rows, year - 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = -previous / discounted[rows, year]
+        payback = np.where(paid_back, year - 1 + fraction, np.nan)
+        payback[cumulative[:, 0] >= 0] = 0
+        return np.round(payback, 2)
+
+    @staticmethod
+    def _is_annuity(flows):
+        """
+        Flags rows shaped like calculate_cashflow_list: one outflow followed by equal inflows.
+        """
+        if flows.shape[1] < 2:
+            return np.zeros(flows.shape[0], dtype=bool)
+        return (flows[:, 0] < 0) & (flows[:, 1] > 0) & (flows[:, 1:] == flows[:, 1:2]).all(axis=1)
+
+    @staticmethod
+    def _solve_annuity_irr(investment, payment, years, max_iterations=100, tolerance=1e-10):
+        """
+        Solves payment * (1 - (1 + r) ** -years) / r = investment for r using
+        Newton's method on the closed-form annuity factor instead of the full cash flow row.
+        """
+        ratio = investment / payment
+        # Starts from the perpetuity rate, a good guess for long-lived systems
+        rate = np.where(ratio < years, 1 / ratio, -0.01)
+        rate = np.where(ratio == years, 0.0, rate)
+        converged = ratio == years
+
+        for _ in range(max_iterations):
+            active = ~converged
+            if not active.any():
+                break
+            r = rate[active]
+            growth = (1 + r) ** -years
+            factor = (1 - growth) / r
+            derivative = (years * growth / (1 + r) - factor) / r
+            step = (factor - ratio[active]) / derivative
+            new_rate = r - step
+
+            done = np.abs(step) < tolerance
+            rate[active] = new_rate
+            converged[active] = done
+
+        return rate, converged & np.isfinite(rate) & (rate > IRR_LOWER_BOUND)
+
+    @staticmethod
+    def _solve_newton_irr(flows, guess, max_iterations=50, tolerance=1e-10):
+        """
+        Vectorized Newton-Raphson over every row. Returns rates and a mask of converged rows.
+        NPV and its derivative are evaluated with Horner's scheme in v = 1 / (1 + rate),
+        one column at a time, so no power matrix is built per iteration.
+        """
+        rate = np.full(flows.shape[0], guess, dtype=float)
+        converged = np.zeros(flows.shape[0], dtype=bool)
+        failed = np.zeros(flows.shape[0], dtype=bool)
+
+        with np.errstate(all="ignore"):
+            for _ in range(max_iterations):
+                active = np.flatnonzero(~(converged | failed))
+                if not active.size:
+                    break
+                rows = flows[active]
+                r = rate[active]
+                v = 1 / (1 + r)
+
+                npv = rows[:, -1].copy()
+                npv_dv = np.zeros_like(npv)
+                for t in range(flows.shape[1] - 2, -1, -1):
+                    npv_dv = npv_dv * v + npv
+                    npv = npv * v + rows[:, t]
+                derivative = -npv_dv * v * v
+
+                step = npv / derivative
+                new_rate = r - step
+                stalled = ~np.isfinite(new_rate) | (new_rate <= IRR_LOWER_BOUND) | (derivative == 0)
+
+                rate[active] = np.where(stalled, r, new_rate)
+                converged[active] = ~stalled & (np.abs(step) < tolerance)
+                failed[active] = stalled
+
+        return rate, converged
+
+    @staticmethod
+    def _solve_bisection_irr(flows, iterations=100):
+        """
+        Bracketing fallback between IRR_LOWER_BOUND and IRR_UPPER_BOUND.
+        Rows without a sign change in that interval return NaN.
+        """
+        count = flows.shape[0]
+        low = np.full(count, IRR_LOWER_BOUND)
+        high = np.full(count, IRR_UPPER_BOUND)
+        npv = FinancialMetricsCalculator.calculate_npv_batch
+        low_value = npv(flows, low)
+        high_value = npv(flows, high)
+        bracketed = np.sign(low_value) != np.sign(high_value)
+
+        for _ in range(iterations):
+            mid = (low + high) / 2
+            mid_value = npv(flows, mid)
+            same_side = np.sign(mid_value) == np.sign(low_value)
+            low = np.where(same_side, mid, low)
+            low_value = np.where(same_side, mid_value, low_value)
+            high = np.where(same_side, high, mid)
+
+        return np.where(bracketed, (low + high) / 2, np.nan)
+
+    @staticmethod
+    def calculate_irr_batch(cash_flows, guess=0.1):
+        """
+        Calculates the Internal Rate of Return of each row of a 2-D cash flow array.
+        Uniform rows (as produced by calculate_cashflow_list) take an annuity fast path;
+        the rest use vectorized Newton-Raphson with a bisection fallback for rows that stall.
+        Returns IRR percentages rounded like calculate_irr, NaN where no IRR exists.
+        """
+        flows = FinancialMetricsCalculator._as_cashflow_matrix(cash_flows)
+        rates = np.full(flows.shape[0], np.nan)
+        solved = np.zeros(flows.shape[0], dtype=bool)
+
+        annuity = FinancialMetricsCalculator._is_annuity(flows)
+        if annuity.any():
+            with np.errstate(all="ignore"):
+                rate, ok = FinancialMetricsCalculator._solve_annuity_irr(
+                    -flows[annuity, 0], flows[annuity, 1], flows.shape[1] - 1
+                )
+            rates[annuity] = rate
+            solved[annuity] = ok
+
+        general = ~solved
+        if general.any():
+            rate, ok = FinancialMetricsCalculator._solve_newton_irr(flows[general], guess)
+            rate[~ok] = np.nan
+            rates[general] = rate
+            solved[general] = ok
+
+        stalled = ~solved
+        if stalled.any():
+            rates[stalled] = FinancialMetricsCalculator._solve_bisection_irr(flows[stalled])
+
+        return np.round(rates * 100, 2)
@@ -0,0 +1,159 @@
+# logic/financial/risk_engine.py
+
+import numpy as np
+from config.constants import *
+from logic.energy.system_calculator import SystemCalculator
+from logic.financial.metrics_calculator import FinancialMetricsCalculator
+from logic.generation.data_generator import DataGenerator
+from logic.generation.scenario_generator import ScenarioGenerator
+from logic.utils.billing_calculator import BillingCalculator
+from logic.utils.data_loader import get_store
+
+PERCENTILES = {"P10": 10, "P50": 50, "P90": 90}
+
+class MonteCarloRiskEngine:
+    """
+    Runs many randomized scenarios of the quote pipeline for one customer and
+    summarizes the spread of the financial results as P10/P50/P90 bands.
+
+    The system is sized once from the nominal inputs, as it would be installed.
+    Each scenario then draws:
+      - a consumption level and monthly pattern,
+      - a yearly irradiance level and monthly irradiance noise,
+      - an annual tariff escalation rate,
+      - an annual panel degradation rate.
+    Year-one savings come from the batch billing path. Later years scale them by
+    tariff escalation and generation degradation, which keeps every step a
+    matrix operation over scenarios.
+    """
+
+    def __init__(
+        self,
+        n_scenarios=10000,
+        seed=None,
+        consumption_variation=0.10,
+        monthly_consumption_variation=0.05,
+        irradiance_variation=0.05,
+        monthly_irradiance_variation=0.03,
+        tariff_escalation_mean=0.03,
+        tariff_escalation_std=0.02,
+        degradation_range=(0.003, 0.008),
+        years=SYSTEM_LIFETIME_YEARS,
+        discount_rate=DISCOUNT_RATE,
+    ):
+        self.n_scenarios = n_scenarios
+        self.seed = seed
+        self.consumption_variation = consumption_variation
+        self.monthly_consumption_variation = monthly_consumption_variation
+        self.irradiance_variation = irradiance_variation
+        self.monthly_irradiance_variation = monthly_irradiance_variation
+        self.tariff_escalation_mean = tariff_escalation_mean
+        self.tariff_escalation_std = tariff_escalation_std
+        self.degradation_range = degradation_range
+        self.years = years
+        self.discount_rate = discount_rate
+
+    def simulate(self, monthly_kwh_input, department, distributor, rate_type, sizing_preference="Balanced", number_of_panels=None):
+        """
+        Runs all scenarios and returns a dictionary of per-scenario arrays plus the
+        deterministic sizing shared by every scenario.
+        Pass number_of_panels to evaluate an already chosen system size.
+        """
+        monthly_irradiance = get_store().monthly_irradiance(department)
+        if monthly_irradiance is None:
+            raise ValueError(f"Missing irradiance data for department: {department}")
+        if get_store().tariff(distributor, rate_type, department) is None:
+            raise ValueError(f"Missing price data for {distributor}/{rate_type}/{department}")
+
+        generator = ScenarioGenerator(self.seed)
+        rng = generator.rng
+        n = self.n_scenarios
+
+        # Sizing from nominal inputs
+        avg_monthly_kwh = sum(monthly_kwh_input) / len(monthly_kwh_input)
+        annual_irradiance = sum(monthly_irradiance) / 12
+        if number_of_panels is None:
+            system_kw = SystemCalculator.calculate_required_system_size_kw(avg_monthly_kwh, annual_irradiance)
+            system_kw = SystemCalculator.apply_sizing_preference(system_kw, sizing_preference)
+            number_of_panels = SystemCalculator.calculate_number_of_panels(system_kw)
+        panels = number_of_panels
+        installed_kw = SystemCalculator.calculate_installed_power_kw(panels)
+        investment = FinancialMetricsCalculator.calculate_investment_cost(installed_kw)
+
+        # Consumption: scenario level x monthly pattern
+        consumption_level = np.clip(rng.normal(1, self.consumption_variation, n), 0.1, None)
+        consumption = generator.monthly_consumption(
+            avg_monthly_kwh * consumption_level, n, self.monthly_consumption_variation
+        )
+
+        # Irradiance: scenario level x monthly noise
+        irradiance_level = np.clip(rng.normal(1, self.irradiance_variation, n), 0.1, None)
+        irradiance = (
+            np.asarray(monthly_irradiance)
+            * irradiance_level[:, np.newaxis]
+            * generator.variation_factors(n, 12, self.monthly_irradiance_variation)
+        )
+        generation = DataGenerator.simulate_monthly_generation_matrix(panels, irradiance)
+
+        bills = BillingCalculator.generate_annual_cost_comparison_batch(
+            consumption, generation, distributor, rate_type, department
+        )
+        first_year_savings = bills["annual_savings"]
+
+        # Lifetime savings: escalate tariffs and degrade generation year over year
+        escalation = rng.normal(self.tariff_escalation_mean, self.tariff_escalation_std, n)
+        degradation = rng.uniform(*self.degradation_range, n)
+        growth = (1 + escalation) * (1 - degradation)
+        yearly_savings = first_year_savings[:, np.newaxis] * growth[:, np.newaxis] ** np.arange(self.years)
+
+        cash_flows = np.hstack([np.full((n, 1), -investment), yearly_savings])
+        irr = FinancialMetricsCalculator.calculate_irr_batch(cash_flows)
+        npv = FinancialMetricsCalculator.calculate_npv_batch(cash_flows, self.discount_rate)
+        payback = FinancialMetricsCalculator.calculate_discounted_payback_batch(cash_flows, 0)
+        discounted_payback = FinancialMetricsCalculator.calculate_discounted_payback_batch(cash_flows, self.discount_rate)
+        roi = (yearly_savings.sum(axis=1) - investment) / investment * 100
+
+        return {
+            "panels": panels,
+            "installed_kw": installed_kw,
+            "investment": investment,
+            "annual_generation": generation.sum(axis=1),
+            "annual_savings": first_year_savings,
+            "annual_cost_without_solar": bills["annual_cost_without_solar"],
+            "annual_cost_with_solar": bills["annual_cost_with_solar"],
+            "payback": payback,
+            "discounted_payback": discounted_payback,
+            "roi": roi,
+            "irr": irr,
+            "npv": npv,
+        }
+
+    def run(self, monthly_kwh_input, department, distributor, rate_type, sizing_preference="Balanced", number_of_panels=None):
+        """
+        Runs the simulation and returns P10/P50/P90 summaries of each metric.
+        Scenarios where a metric is undefined (e.g. never pays back) are reported
+        in "undefined_share" and left out of that metric's percentiles.
+        """
+        results = self.simulate(monthly_kwh_input, department, distributor, rate_type, sizing_preference, number_of_panels)
+        summary = {
+            "n_scenarios": self.n_scenarios,
+            "panels": results["panels"],
+            "installed_kw": results["installed_kw"],
+            "investment": results["investment"],
+            "percentiles": {},
+            "undefined_share": {},
+        }
+
+        for metric in ("annual_generation", "annual_savings", "payback", "discounted_payback", "roi", "irr", "npv"):
+            values = results[metric]
+            defined = ~np.isnan(values)
+            summary["undefined_share"][metric] = round(1 - defined.mean(), 4)
+            if defined.any():
+                bands = np.percentile(values[defined], list(PERCENTILES.values()))
+                summary["percentiles"][metric] = {
+                    label: round(float(value), 2) for label, value in zip(PERCENTILES, bands)
+                }
+            else:
+                summary["percentiles"][metric] = {label: None for label in PERCENTILES}
+
+        return summary
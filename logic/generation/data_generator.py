@@ -1,60 +1,80 @@
 # logic/generation/data_generator.py
 
-import random
+import numpy as np
 from config.constants import (
+    DAYS_PER_MONTH,
     PANEL_POWER_KW,
     SYSTEM_EFFICIENCY,
     SYSTEM_LIFETIME_YEARS
 )
+from logic.generation.scenario_generator import ScenarioGenerator
+from logic.utils.instrumentation import instrument_class
 
+@instrument_class("generation")
 class DataGenerator:
     """
     Generates realistic monthly and annual data for generation and consumption.
     """
 
     @staticmethod
-    def simulate_monthly_distribution(total_annual_value, variation=0.05):
+    def simulate_monthly_distribution(total_annual_value, variation=0.05, seed=None):
         """
         Generates 12 monthly values that sum up to total_annual_value with random variation.
+        Pass a seed for reproducible results.
         """
-        base = total_annual_value / 12
-        monthly_values = []
-
-        for _ in range(12):
-            rand_factor = 1 + random.uniform(-variation, variation)
-            monthly_values.append(base * rand_factor)
-
-        scale = total_annual_value / sum(monthly_values)
-        normalized = [round(val * scale, 2) for val in monthly_values]
-        return normalized
+        values = ScenarioGenerator(seed).monthly_distribution(total_annual_value, 1, variation)[0]
+        return [round(val, 2) for val in values.tolist()]
 
     @staticmethod
-    def simulate_annual_data_series(base_value, years=SYSTEM_LIFETIME_YEARS, variation=0.05):
+    def simulate_annual_data_series(base_value, years=SYSTEM_LIFETIME_YEARS, variation=0.05, seed=None):
         """
         Simulates yearly variation over system lifetime.
+        Pass a seed for reproducible results.
         """
-        values = []
-
-        for _ in range(years):
-            factor = 1 + random.uniform(-variation, variation)
-            values.append(round(base_value * factor, 2))
-
-        return values
+        values = ScenarioGenerator(seed).annual_series(base_value, years, 1, variation)[0]
+        return [round(val, 2) for val in values.tolist()]
 
     @staticmethod
     def simulate_monthly_generation_from_irradiance(number_of_panels, monthly_irradiance_list, panel_power=PANEL_POWER_KW, efficiency=SYSTEM_EFFICIENCY):
         """
         Uses panel count and monthly irradiance to estimate monthly generation.
         """
-        days_per_month = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
         generation = []
 
         for i, irradiance in enumerate(monthly_irradiance_list):
-            kwh = number_of_panels * panel_power * irradiance * efficiency * days_per_month[i]
+            kwh = number_of_panels * panel_power * irradiance * efficiency * DAYS_PER_MONTH[i]
             generation.append(round(kwh, 2))
 
         return generation
 
+    @staticmethod
+    def simulate_monthly_generation_matrix(number_of_panels, monthly_irradiance, panel_power=PANEL_POWER_KW, efficiency=SYSTEM_EFFICIENCY):
+        """
+        Vectorized simulate_monthly_generation_from_irradiance.
+        Panel counts (n,) and irradiance (12,) or (n, 12) broadcast to an (n, 12) matrix.
+        """
+        panels = np.asarray(number_of_panels, dtype=float).reshape(-1, 1)
+        irradiance = np.asarray(monthly_irradiance, dtype=float)
+        kwh = panels * panel_power * irradiance * efficiency * np.asarray(DAYS_PER_MONTH)
+        return np.round(kwh, 2)
+
+    @staticmethod
+    def simulate_monthly_generation_from_coordinates(number_of_panels, latitude, longitude, monthly_irradiance_list, hourly_irradiance=None,
+                                                     tilt=None, azimuth=180, hourly_dni=None, hourly_dhi=None):
+        """
+        Estimates monthly generation by simulating all 8760 hours at the given
+        coordinates and summing them back into months. hourly_irradiance
+        (8760 GHI values in W/m²) replaces the synthetic typical year.
+        A tilt and azimuth model modules on a sloped roof instead of flat ones.
+        """
+        from logic.generation.hourly_simulator import HourlyGenerationSimulator
+
+        hourly = HourlyGenerationSimulator.simulate_hourly_generation(
+            number_of_panels, latitude, longitude, monthly_irradiance_list, hourly_irradiance=hourly_irradiance,
+            tilt=tilt, azimuth=azimuth, hourly_dni=hourly_dni, hourly_dhi=hourly_dhi
+        )
+        return HourlyGenerationSimulator.aggregate_monthly(hourly).tolist()
+
     @staticmethod
     def simulate_annual_generation_with_degradation(base_value, years=30, degradation_rate=0.004):
         """
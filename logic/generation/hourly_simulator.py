@@ -0,0 +1,132 @@
+# logic/generation/hourly_simulator.py
+
+import numpy as np
+from config.constants import (
+    DAYS_PER_MONTH,
+    PANEL_POWER_KW,
+    SYSTEM_EFFICIENCY,
+    UTC_OFFSET_HOURS
+)
+from logic.utils.hourly_calendar import DAY_OF_YEAR, HOUR_OF_DAY, MONTH_OF_HOUR, monthly_totals
+from logic.utils.instrumentation import instrument_class
+
+SOLAR_CONSTANT_W_M2 = 1361.0
+
+@instrument_class("hourly")
+class HourlyGenerationSimulator:
+    """
+    Simulates solar generation for every hour of a typical year (8760 values).
+    All methods accept scalar or array coordinates; arrays of n sites give (n, 8760) results.
+    """
+
+    @staticmethod
+    def _day_angle():
+        # Fractional year in radians at the middle of each hour
+        return 2 * np.pi / 365 * (DAY_OF_YEAR - 1 + (HOUR_OF_DAY + 0.5 - 12) / 24)
+
+    @staticmethod
+    def solar_position(latitude, longitude, utc_offset=UTC_OFFSET_HOURS):
+        """
+        Computes the sun's position at the middle of each hour (NOAA/Spencer approximation).
+        Returns a dictionary with:
+          - cos_zenith
+          - elevation (degrees)
+          - azimuth (degrees clockwise from north)
+          - extraterrestrial (W/m² on a plane normal to the sun)
+        """
+        lat = np.radians(np.asarray(latitude, dtype=float))[..., np.newaxis]
+        lon = np.asarray(longitude, dtype=float)[..., np.newaxis]
+        g = HourlyGenerationSimulator._day_angle()
+
+        equation_of_time = 229.18 * (
+            0.000075 + 0.001868 * np.cos(g) - 0.032077 * np.sin(g)
+            - 0.014615 * np.cos(2 * g) - 0.040849 * np.sin(2 * g)
+        )
+        declination = (
+            0.006918 - 0.399912 * np.cos(g) + 0.070257 * np.sin(g)
+            - 0.006758 * np.cos(2 * g) + 0.000907 * np.sin(2 * g)
+            - 0.002697 * np.cos(3 * g) + 0.00148 * np.sin(3 * g)
+        )
+        true_solar_minutes = (HOUR_OF_DAY + 0.5) * 60 + equation_of_time + 4 * lon - 60 * utc_offset
+        hour_angle = np.radians(true_solar_minutes / 4 - 180)
+
+        cos_zenith = np.clip(
+            np.sin(lat) * np.sin(declination) + np.cos(lat) * np.cos(declination) * np.cos(hour_angle),
+            -1, 1
+        )
+        zenith = np.arccos(cos_zenith)
+        sin_zenith = np.maximum(np.sin(zenith), 1e-9)
+        cos_azimuth = np.clip((np.sin(declination) - np.sin(lat) * cos_zenith) / (np.cos(lat) * sin_zenith), -1, 1)
+        azimuth = np.degrees(np.arccos(cos_azimuth))
+        azimuth = np.where(hour_angle % (2 * np.pi) < np.pi, 360 - azimuth, azimuth)
+
+        extraterrestrial = SOLAR_CONSTANT_W_M2 * (
+            1.00011 + 0.034221 * np.cos(g) + 0.00128 * np.sin(g)
+            + 0.000719 * np.cos(2 * g) + 0.000077 * np.sin(2 * g)
+        )
+
+        return {
+            "cos_zenith": cos_zenith,
+            "elevation": 90 - np.degrees(zenith),
+            "azimuth": azimuth,
+            "extraterrestrial": np.broadcast_to(extraterrestrial, cos_zenith.shape),
+        }
+
+    @staticmethod
+    def clear_sky_irradiance(latitude, longitude, utc_offset=UTC_OFFSET_HOURS):
+        """
+        Returns hourly clear-sky global horizontal irradiance in W/m² (Haurwitz model).
+        """
+        cos_zenith = HourlyGenerationSimulator.solar_position(latitude, longitude, utc_offset)["cos_zenith"]
+        daylight = cos_zenith > 0.01
+        safe = np.where(daylight, cos_zenith, 1)
+        return np.where(daylight, 1098 * safe * np.exp(-0.057 / safe), 0.0)
+
+    @staticmethod
+    def typical_year_irradiance(latitude, longitude, monthly_irradiance, utc_offset=UTC_OFFSET_HOURS):
+        """
+        Returns hourly global horizontal irradiance in W/m² for a typical year.
+        The clear-sky shape is scaled month by month so each month's total matches
+        the monthly average irradiance (kWh/m²/day) used by the rest of the pipeline.
+        """
+        clear_sky = HourlyGenerationSimulator.clear_sky_irradiance(latitude, longitude, utc_offset)
+        target_kwh_m2 = np.asarray(monthly_irradiance, dtype=float) * np.asarray(DAYS_PER_MONTH)
+        clear_sky_kwh_m2 = monthly_totals(clear_sky) / 1000
+        scale = target_kwh_m2 / clear_sky_kwh_m2
+        return clear_sky * np.take(scale, MONTH_OF_HOUR, axis=-1)
+
+    @staticmethod
+    def simulate_hourly_generation(number_of_panels, latitude, longitude, monthly_irradiance=None, panel_power=PANEL_POWER_KW, efficiency=SYSTEM_EFFICIENCY, utc_offset=UTC_OFFSET_HOURS, hourly_irradiance=None,
+                                   tilt=None, azimuth=180, hourly_dni=None, hourly_dhi=None):
+        """
+        Estimates AC energy (kWh) produced in each of the 8760 hours of the year.
+        Uses measured hourly_irradiance (W/m², e.g. a TMY site's GHI) when given,
+        otherwise the typical-year irradiance when monthly_irradiance is given,
+        clear-sky otherwise.
+        With a tilt, the irradiance is transposed onto modules facing azimuth
+        (see PlaneOfArray), using hourly_dni and hourly_dhi when both are given.
+        """
+        if hourly_irradiance is not None:
+            irradiance = np.asarray(hourly_irradiance, dtype=float)
+        elif monthly_irradiance is None:
+            irradiance = HourlyGenerationSimulator.clear_sky_irradiance(latitude, longitude, utc_offset)
+        else:
+            irradiance = HourlyGenerationSimulator.typical_year_irradiance(latitude, longitude, monthly_irradiance, utc_offset)
+
+        if tilt is not None:
+            from logic.generation.plane_of_array import PlaneOfArray
+
+            irradiance = PlaneOfArray.irradiance(
+                latitude, longitude, tilt, azimuth, irradiance, hourly_dni, hourly_dhi, utc_offset=utc_offset
+            )
+
+        panels = np.asarray(number_of_panels, dtype=float)[..., np.newaxis]
+        # Panel ratings are at 1000 W/m², so one hour at G W/m² yields rating x G/1000 kWh
+        return panels * panel_power * efficiency * irradiance / 1000
+
+    @staticmethod
+    def aggregate_monthly(hourly_generation):
+        """
+        Sums hourly generation into the 12 monthly totals used by billing, rounded to 2 decimals.
+        """
+        return np.round(monthly_totals(hourly_generation), 2)
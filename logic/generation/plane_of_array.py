@@ -0,0 +1,132 @@
+# logic/generation/plane_of_array.py
+"""
+Irradiance on tilted modules (plane of array) and the orientation optimizer.
+
+Hourly plane-of-array irradiance is the sum of three components (isotropic
+sky model):
+
+    beam     DNI x cos(angle of incidence)
+    diffuse  DHI x (1 + cos tilt) / 2
+    ground   GHI x albedo x (1 - cos tilt) / 2
+
+When only GHI is known it is split into DNI and DHI with the Erbs
+correlation. Tilt is measured from horizontal and azimuth in degrees clockwise
+from north (180 = facing south), like the solar azimuth of
+HourlyGenerationSimulator.solar_position.
+
+With the sun as a unit vector (east, north, up), the cosine of the angle of
+incidence is cos(tilt) x up + sin(tilt) x (sin(azimuth) x east +
+cos(azimuth) x north). optimize_orientation() uses that form to evaluate a
+whole tilt x azimuth grid over the daylight hours in one broadcast.
+"""
+
+import numpy as np
+from config.constants import GROUND_ALBEDO, ORIENTATION_AZIMUTHS, ORIENTATION_TILTS, UTC_OFFSET_HOURS
+from logic.generation.hourly_simulator import HourlyGenerationSimulator
+from logic.utils.instrumentation import instrument_class
+
+# Below this sun height the beam is treated as zero (zenith of about 86°)
+MIN_COS_ZENITH = 0.065
+
+@instrument_class("poa")
+class PlaneOfArray:
+    """
+    Transposes hourly horizontal irradiance (8760 values in W/m²) onto tilted modules.
+    """
+
+    @staticmethod
+    def decompose(ghi, cos_zenith, extraterrestrial):
+        """
+        Splits global horizontal irradiance into direct normal and diffuse
+        horizontal irradiance with the Erbs correlation. Returns (dni, dhi).
+        """
+        ghi = np.asarray(ghi, dtype=float)
+        sun_up = cos_zenith >= MIN_COS_ZENITH
+        safe = np.where(sun_up, cos_zenith, 1)
+        kt = np.clip(np.where(sun_up, ghi / (extraterrestrial * safe), 0), 0, 1)
+
+        diffuse_fraction = np.where(
+            kt <= 0.22, 1 - 0.09 * kt,
+            np.where(kt <= 0.8, 0.9511 - 0.1604 * kt + 4.388 * kt ** 2 - 16.638 * kt ** 3 + 12.336 * kt ** 4, 0.165)
+        )
+        dni = np.where(sun_up, ghi * (1 - diffuse_fraction) / safe, 0.0)
+        return dni, ghi - dni * np.where(sun_up, cos_zenith, 0)
+
+    @staticmethod
+    def sky(latitude, longitude, ghi, dni=None, dhi=None, utc_offset=UTC_OFFSET_HOURS):
+        """
+        Returns the hourly sun vector (east, north, up) with the ghi, dni and
+        dhi to transpose. DNI and DHI come from decompose() unless both are given.
+        """
+        position = HourlyGenerationSimulator.solar_position(latitude, longitude, utc_offset)
+        up = position["cos_zenith"]
+        ghi = np.asarray(ghi, dtype=float)
+        if dni is None or dhi is None:
+            dni, dhi = PlaneOfArray.decompose(ghi, up, position["extraterrestrial"])
+
+        horizontal = np.sqrt(1 - up ** 2)
+        azimuth = np.radians(position["azimuth"])
+        return {
+            "east": horizontal * np.sin(azimuth),
+            "north": horizontal * np.cos(azimuth),
+            "up": up,
+            "ghi": ghi,
+            "dni": np.where(up > 0, np.asarray(dni, dtype=float), 0.0),
+            "dhi": np.asarray(dhi, dtype=float),
+        }
+
+    @staticmethod
+    def irradiance(latitude, longitude, tilt, azimuth, ghi, dni=None, dhi=None, albedo=GROUND_ALBEDO, utc_offset=UTC_OFFSET_HOURS):
+        """
+        Returns hourly plane-of-array irradiance in W/m² for modules with the
+        given tilt and azimuth (scalars, or one per site like the coordinates).
+        """
+        sky = PlaneOfArray.sky(latitude, longitude, ghi, dni, dhi, utc_offset)
+        tilt = np.radians(np.asarray(tilt, dtype=float))[..., np.newaxis]
+        azimuth = np.radians(np.asarray(azimuth, dtype=float))[..., np.newaxis]
+
+        cos_incidence = np.cos(tilt) * sky["up"] + np.sin(tilt) * (np.sin(azimuth) * sky["east"] + np.cos(azimuth) * sky["north"])
+        beam = sky["dni"] * np.maximum(cos_incidence, 0)
+        diffuse = sky["dhi"] * (1 + np.cos(tilt)) / 2
+        ground = sky["ghi"] * albedo * (1 - np.cos(tilt)) / 2
+        return beam + diffuse + ground
+
+    @staticmethod
+    def optimize_orientation(latitude, longitude, ghi, dni=None, dhi=None, tilts=ORIENTATION_TILTS, azimuths=ORIENTATION_AZIMUTHS,
+                             albedo=GROUND_ALBEDO, utc_offset=UTC_OFFSET_HOURS):
+        """
+        Evaluates annual plane-of-array irradiance for every tilt x azimuth
+        pair at one site. Returns a dictionary with:
+          - tilts, azimuths (the grid axes)
+          - surface (len(tilts), len(azimuths)) in kWh/m² per year
+          - tilt, azimuth, annual_kwh_m2 of the best orientation
+          - horizontal_kwh_m2 (annual GHI, for comparison)
+        """
+        sky = PlaneOfArray.sky(latitude, longitude, ghi, dni, dhi, utc_offset)
+        day = sky["up"] > 0
+        tilts = np.asarray(tilts, dtype=float)
+        azimuths = np.asarray(azimuths, dtype=float)
+        tilt = np.radians(tilts)[:, np.newaxis]
+        azimuth = np.radians(azimuths)[:, np.newaxis]
+
+        # (azimuths, hours) horizontal part, then (tilts, azimuths, hours) in one broadcast
+        facing = np.sin(azimuth) * sky["east"][day] + np.cos(azimuth) * sky["north"][day]
+        cos_incidence = np.cos(tilt)[:, :, np.newaxis] * sky["up"][day] + np.sin(tilt)[:, :, np.newaxis] * facing
+        np.maximum(cos_incidence, 0, out=cos_incidence)
+        beam = cos_incidence @ sky["dni"][day]
+
+        # Diffuse and ground terms do not depend on azimuth, so their annual sums are enough
+        diffuse = sky["dhi"].sum() * (1 + np.cos(tilt)) / 2
+        ground = sky["ghi"].sum() * albedo * (1 - np.cos(tilt)) / 2
+        surface = (beam + diffuse + ground) / 1000
+
+        best_tilt, best_azimuth = np.unravel_index(np.argmax(surface), surface.shape)
+        return {
+            "tilts": tilts,
+            "azimuths": azimuths,
+            "surface": surface,
+            "tilt": float(tilts[best_tilt]),
+            "azimuth": float(azimuths[best_azimuth]),
+            "annual_kwh_m2": float(surface[best_tilt, best_azimuth]),
+            "horizontal_kwh_m2": float(sky["ghi"].sum() / 1000),
+        }
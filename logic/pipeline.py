@@ -0,0 +1,200 @@
+# logic/pipeline.py
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from config.constants import SIZING_FACTORS
+from logic.energy.consumption_calculator import ConsumptionCalculator
+from logic.energy.system_calculator import SystemCalculator
+from logic.financial.metrics_calculator import FinancialMetricsCalculator
+from logic.generation.data_generator import DataGenerator
+from logic.generation.scenario_generator import ScenarioGenerator
+from logic.quote_engine import billing_stage, generation_stage
+from logic.utils.data_loader import get_price_per_kwh, get_store
+
+# Flat output columns written for every lead in batch mode, with their types
+RESULT_FIELDS = {
+    "id": "string",
+    "latitude": "float64",
+    "longitude": "float64",
+    "avg_monthly_kwh": "float64",
+    "annual_kwh": "float64",
+    "system_kw": "float64",
+    "panels": "int64",
+    "installed_kw": "float64",
+    "area_m2": "float64",
+    "annual_generation": "float64",
+    "coverage": "float64",
+    "co2_saved": "float64",
+    "trees": "float64",
+    "annual_cost_without_solar": "float64",
+    "annual_cost_with_solar": "float64",
+    "annual_savings": "float64",
+    "investment": "float64",
+    "payback": "float64",
+    "roi": "float64",
+    "irr": "float64",
+    "warning": "string",
+    "error": "string",
+}
+
+def run_quote(monthly_kwh_input, department, distributor, rate_type, sizing_preference="Balanced", seed=None,
+              latitude=None, longitude=None):
+    """
+    Runs the full single-quote pipeline: consumption, sizing, generation,
+    environmental impact and financial metrics.
+    The seed defaults to one derived from the inputs, so the same lead always
+    gets the same simulated series.
+    With coordinates, irradiance comes from the raster and generation from the
+    hourly simulation (with the nearest TMY site's weather), like the quote engine.
+    Raises ValueError when irradiance or pricing data is missing, or for a
+    sizing preference without a fixed factor ("Optimal" needs the quote engine's
+    size optimizer).
+    """
+    if str(sizing_preference).lower() not in SIZING_FACTORS:
+        raise ValueError(f"Unsupported sizing preference: {sizing_preference} (use Minimum, Balanced or Maximum)")
+
+    monthly_irradiance = get_store().site_irradiance(department, latitude, longitude)
+    if monthly_irradiance is None:
+        raise ValueError(f"Missing irradiance data for department: {department}")
+    monthly_irradiance = list(monthly_irradiance)
+
+    price_per_kwh = get_price_per_kwh(distributor, rate_type, department)
+    if price_per_kwh is None:
+        raise ValueError(f"Missing price data for {distributor}/{rate_type}/{department}")
+
+    if seed is None:
+        seed = ScenarioGenerator.seed_from(list(monthly_kwh_input), department, distributor, rate_type)
+
+    # Consumption
+    avg_monthly_kwh = ConsumptionCalculator.calculate_average_monthly_consumption(monthly_kwh_input)
+    annual_kwh = ConsumptionCalculator.calculate_annual_consumption(avg_monthly_kwh)
+    monthly_consumption_sim = DataGenerator.simulate_monthly_distribution(annual_kwh, seed=seed)
+
+    # System sizing
+    annual_irradiance = sum(monthly_irradiance) / 12
+    system_kw = SystemCalculator.calculate_required_system_size_kw(avg_monthly_kwh, annual_irradiance)
+    system_kw = SystemCalculator.apply_sizing_preference(system_kw, sizing_preference)
+    panels = SystemCalculator.calculate_number_of_panels(system_kw)
+    installed_kw = SystemCalculator.calculate_installed_power_kw(panels)
+    area_m2 = SystemCalculator.calculate_required_area_m2(panels)
+
+    # Generation, shared with the quote engine so batch and calculator quotes agree
+    generation = generation_stage(
+        panels, avg_monthly_kwh, annual_irradiance, monthly_irradiance, sizing_preference, latitude, longitude,
+        roof_tilt=None, roof_azimuth=180
+    )
+    annual_generation = generation["annual_generation"]
+    coverage = generation["coverage"]
+    monthly_generation_sim = generation["monthly_generation"]
+
+    # Environmental impact
+    co2_saved = FinancialMetricsCalculator.calculate_co2_saved(annual_generation)
+    trees = FinancialMetricsCalculator.calculate_tree_equivalents(co2_saved)
+
+    # Financial metrics
+    financial_data = billing_stage(
+        monthly_consumption_sim, monthly_generation_sim, panels, monthly_irradiance, distributor, rate_type, department,
+        latitude, longitude, roof_tilt=None, roof_azimuth=180
+    )["financial"]
+    annual_savings = financial_data["annual_savings"]
+    investment = FinancialMetricsCalculator.calculate_investment_cost(installed_kw)
+    payback = FinancialMetricsCalculator.calculate_payback_period(investment, annual_savings)
+    roi = FinancialMetricsCalculator.calculate_roi(investment, annual_savings)
+    cashflow = FinancialMetricsCalculator.calculate_cashflow_list(investment, annual_savings)
+    irr = FinancialMetricsCalculator.calculate_irr(cashflow)
+    cumulative_cashflow = FinancialMetricsCalculator.generate_cumulative_cashflow_list(investment, annual_savings)
+
+    return {
+        "avg_monthly_kwh": avg_monthly_kwh,
+        "annual_kwh": annual_kwh,
+        "system_kw": system_kw,
+        "panels": panels,
+        "installed_kw": installed_kw,
+        "area_m2": area_m2,
+        "annual_generation": annual_generation,
+        "coverage": coverage,
+        "co2_saved": co2_saved,
+        "trees": trees,
+        "annual_cost_without_solar": financial_data["annual_cost_without_solar"],
+        "annual_cost_with_solar": financial_data["annual_cost_with_solar"],
+        "annual_savings": annual_savings,
+        "investment": investment,
+        "payback": payback,
+        "roi": roi,
+        "irr": irr,
+        "monthly_consumption": monthly_consumption_sim,
+        "monthly_generation": monthly_generation_sim,
+        "cumulative_cashflow": cumulative_cashflow,
+        "seed": seed,
+    }
+
+def quote_lead(lead):
+    """
+    Quotes one normalized lead and returns a flat record with RESULT_FIELDS.
+    Any error is reported in the "error" field instead of being raised, so one
+    bad row does not stop a batch.
+    """
+    record = dict.fromkeys(RESULT_FIELDS)
+    record["id"] = None if lead.get("id") is None else str(lead["id"])
+    record["warning"] = lead.get("warning")
+    if lead.get("error"):
+        record["error"] = lead["error"]
+        return record
+    try:
+        for field in ("latitude", "longitude"):
+            if lead.get(field) is not None:
+                record[field] = float(lead[field])
+        result = run_quote(
+            lead["kwh"], lead["department"], lead["distributor"], lead["rate_type"],
+            lead.get("sizing_preference", "Balanced"), latitude=record["latitude"], longitude=record["longitude"]
+        )
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        return record
+
+    for field in RESULT_FIELDS:
+        if field in result:
+            record[field] = result[field]
+    return record
+
+def quote_leads(leads):
+    """
+    Quotes a chunk of leads. Top-level so it can run in worker processes.
+    """
+    return [quote_lead(lead) for lead in leads]
+
+def run_batch(leads, writer, workers=4, chunk_size=1000):
+    """
+    Quotes an iterable of leads in chunks and writes each chunk as soon as it
+    is ready, preserving input order. At most two chunks per worker are in
+    flight, so memory stays flat regardless of the input size.
+    With workers <= 1 everything runs in the current process.
+    Returns the number of leads written.
+    """
+    leads = iter(leads)
+    chunks = iter(lambda: list(islice(leads, chunk_size)), [])
+    written = 0
+
+    if workers <= 1:
+        for chunk in chunks:
+            records = quote_leads(chunk)
+            writer.write(records)
+            written += len(records)
+        return written
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(quote_leads, chunk))
+            if len(pending) >= workers * 2:
+                records = pending.popleft().result()
+                writer.write(records)
+                written += len(records)
+        while pending:
+            records = pending.popleft().result()
+            writer.write(records)
+            written += len(records)
+
+    return written
@@ -0,0 +1,293 @@
+# logic/quote_engine.py
+"""
+Incremental quote engine.
+
+The quote pipeline is modeled as a graph of named stages:
+
+    consumption -> sizing -> orientation
+                          \\-> generation -> billing -> metrics
+                                        \\-> environmental
+
+Each stage declares the values it reads, either quote inputs (kwh,
+department, sizing_preference, ...) or outputs of earlier stages. The result
+of a stage is memoized on a hash of exactly those values. Rerunning a quote
+recomputes only the stages whose inputs changed. For example, a new sizing
+preference reruns sizing and everything downstream of it, but not the
+consumption simulation. Because the cache key is the inputs themselves (plus
+the data store version, for stages that read tariffs or irradiance), a
+cached result can never be out of date.
+"""
+
+import hashlib
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+from config.constants import DEFAULT_LATITUDE, DEFAULT_LONGITUDE
+from logic.energy.consumption_calculator import ConsumptionCalculator
+from logic.energy.size_optimizer import SystemSizeOptimizer
+from logic.energy.system_calculator import SystemCalculator
+from logic.financial.metrics_calculator import FinancialMetricsCalculator
+from logic.generation.data_generator import DataGenerator
+from logic.generation.hourly_simulator import HourlyGenerationSimulator
+from logic.generation.plane_of_array import PlaneOfArray
+from logic.generation.scenario_generator import ScenarioGenerator
+from logic.utils.billing_calculator import BillingCalculator
+from logic.utils.data_loader import get_store
+from logic.utils.hourly_calendar import MONTH_OF_HOUR, monthly_totals
+from logic.utils.tariff_engine import needs_hourly_billing
+
+# Quote inputs accepted by QuoteEngine.run() and their defaults
+QUOTE_INPUTS = {
+    "kwh": None,
+    "department": None,
+    "distributor": None,
+    "rate_type": None,
+    "sizing_preference": "Balanced",
+    "roof_area": 0,
+    "latitude": None,
+    "longitude": None,
+    "roof_tilt": None,
+    "roof_azimuth": 180,
+    "seed": None,
+}
+
+# --- STAGES ---
+
+def consumption_stage(kwh, seed):
+    avg_monthly_kwh = ConsumptionCalculator.calculate_average_monthly_consumption(kwh)
+    annual_kwh = ConsumptionCalculator.calculate_annual_consumption(avg_monthly_kwh)
+    return {
+        "avg_monthly_kwh": avg_monthly_kwh,
+        "annual_kwh": annual_kwh,
+        "monthly_consumption": DataGenerator.simulate_monthly_distribution(annual_kwh, seed=seed),
+    }
+
+def sizing_stage(avg_monthly_kwh, monthly_consumption, department, distributor, rate_type, sizing_preference, roof_area,
+                 latitude, longitude):
+    monthly_irradiance = get_store().site_irradiance(department, latitude, longitude)
+    if monthly_irradiance is None:
+        raise ValueError(f"Missing irradiance data for department: {department}")
+    monthly_irradiance = list(monthly_irradiance)
+    annual_irradiance = sum(monthly_irradiance) / 12
+
+    optimum = None
+    if sizing_preference.lower() == "optimal":
+        optimum = SystemSizeOptimizer.optimize(
+            monthly_consumption, monthly_irradiance, distributor, rate_type, department, roof_area
+        )
+
+    if optimum is not None:
+        panels = optimum["panels"]
+        system_kw = optimum["installed_kw"]
+    else:
+        system_kw = SystemCalculator.calculate_required_system_size_kw(avg_monthly_kwh, annual_irradiance)
+        system_kw = SystemCalculator.apply_sizing_preference(system_kw, sizing_preference)
+        panels = SystemCalculator.calculate_number_of_panels(system_kw)
+
+    return {
+        "monthly_irradiance": monthly_irradiance,
+        "annual_irradiance": annual_irradiance,
+        "optimum": optimum,
+        "system_kw": system_kw,
+        "panels": panels,
+        "installed_kw": SystemCalculator.calculate_installed_power_kw(panels),
+        "area_m2": SystemCalculator.calculate_required_area_m2(panels),
+    }
+
+def _hourly_weather(weather_site):
+    if weather_site is None:
+        return {"hourly_irradiance": None, "hourly_dni": None, "hourly_dhi": None}
+    return {"hourly_irradiance": weather_site["ghi"], "hourly_dni": weather_site["dni"], "hourly_dhi": weather_site["dhi"]}
+
+def orientation_stage(monthly_irradiance, latitude, longitude, roof_tilt, roof_azimuth):
+    if latitude is None or longitude is None:
+        return {"orientation": None}
+    weather = _hourly_weather(get_store().tmy_site(latitude, longitude))
+    ghi = weather["hourly_irradiance"]
+    if ghi is None:
+        ghi = HourlyGenerationSimulator.typical_year_irradiance(latitude, longitude, monthly_irradiance)
+
+    best = PlaneOfArray.optimize_orientation(latitude, longitude, ghi, weather["hourly_dni"], weather["hourly_dhi"])
+    roof_kwh_m2 = None
+    if roof_tilt is not None:
+        roof = PlaneOfArray.irradiance(latitude, longitude, roof_tilt, roof_azimuth, ghi, weather["hourly_dni"], weather["hourly_dhi"])
+        roof_kwh_m2 = float(roof.sum() / 1000)
+    return {
+        "orientation": {
+            "tilt": best["tilt"],
+            "azimuth": best["azimuth"],
+            "annual_kwh_m2": best["annual_kwh_m2"],
+            "horizontal_kwh_m2": best["horizontal_kwh_m2"],
+            "roof_kwh_m2": roof_kwh_m2,
+            "tilts": best["tilts"].tolist(),
+            "azimuths": best["azimuths"].tolist(),
+            "surface": best["surface"].tolist(),
+        }
+    }
+
+def generation_stage(panels, avg_monthly_kwh, annual_irradiance, monthly_irradiance, sizing_preference, latitude, longitude,
+                     roof_tilt, roof_azimuth):
+    annual_generation = SystemCalculator.calculate_annual_generation_kwh(panels, annual_irradiance)
+    weather_site = get_store().tmy_site(latitude, longitude)
+    if latitude is not None and longitude is not None:
+        monthly_generation = DataGenerator.simulate_monthly_generation_from_coordinates(
+            panels, latitude, longitude, monthly_irradiance, tilt=roof_tilt, azimuth=roof_azimuth, **_hourly_weather(weather_site)
+        )
+        # Measured weather or a known roof orientation makes the hourly simulation the
+        # better annual figure, and keeps it equal to the monthly values billing uses
+        if weather_site is not None or roof_tilt is not None:
+            annual_generation = round(sum(monthly_generation), 2)
+    else:
+        monthly_generation = DataGenerator.simulate_monthly_generation_from_irradiance(panels, monthly_irradiance)
+    return {
+        "annual_generation": annual_generation,
+        "coverage": SystemCalculator.calculate_coverage_percentage(annual_generation, avg_monthly_kwh, sizing_preference),
+        "monthly_generation": monthly_generation,
+        "weather_site": None if weather_site is None else {
+            "name": weather_site["name"], "distance_km": weather_site["distance_km"]
+        },
+    }
+
+def _hourly_generation(panels, monthly_generation, monthly_irradiance, latitude, longitude, roof_tilt, roof_azimuth):
+    # Hourly shape of the simulation, rescaled so each month sums to the monthly generation
+    if latitude is None or longitude is None:
+        latitude, longitude, roof_tilt = DEFAULT_LATITUDE, DEFAULT_LONGITUDE, None
+        weather = _hourly_weather(None)
+    else:
+        weather = _hourly_weather(get_store().tmy_site(latitude, longitude))
+    hourly = HourlyGenerationSimulator.simulate_hourly_generation(
+        panels, latitude, longitude, monthly_irradiance, tilt=roof_tilt, azimuth=roof_azimuth, **weather
+    )
+    simulated = monthly_totals(hourly)
+    scale = np.divide(monthly_generation, simulated, out=np.zeros(12), where=simulated > 0)
+    return hourly * scale[MONTH_OF_HOUR]
+
+def billing_stage(monthly_consumption, monthly_generation, panels, monthly_irradiance, distributor, rate_type, department,
+                  latitude, longitude, roof_tilt, roof_azimuth):
+    # Block, time-of-use, demand and export rules depend on when energy is used, so bill hour by hour
+    if needs_hourly_billing(get_store().tariff(distributor, rate_type, department)):
+        hourly_consumption = ConsumptionCalculator.synthesize_hourly_load_profile(monthly_consumption)
+        hourly_generation = _hourly_generation(
+            panels, monthly_generation, monthly_irradiance, latitude, longitude, roof_tilt, roof_azimuth
+        )
+        financial = BillingCalculator.generate_hourly_cost_comparison(
+            hourly_consumption, hourly_generation, distributor, rate_type, department
+        )
+    else:
+        financial = BillingCalculator.generate_annual_cost_comparison(
+            monthly_consumption, monthly_generation, distributor, rate_type, department
+        )
+    return {"financial": financial}
+
+def metrics_stage(installed_kw, financial):
+    annual_savings = financial["annual_savings"]
+    investment = FinancialMetricsCalculator.calculate_investment_cost(installed_kw)
+    cashflow = FinancialMetricsCalculator.calculate_cashflow_list(investment, annual_savings)
+    return {
+        "investment": investment,
+        "payback": FinancialMetricsCalculator.calculate_payback_period(investment, annual_savings),
+        "roi": FinancialMetricsCalculator.calculate_roi(investment, annual_savings),
+        "irr": FinancialMetricsCalculator.calculate_irr(cashflow),
+        "cumulative_cashflow": FinancialMetricsCalculator.generate_cumulative_cashflow_list(investment, annual_savings),
+    }
+
+def environmental_stage(annual_generation):
+    co2_saved = FinancialMetricsCalculator.calculate_co2_saved(annual_generation)
+    return {
+        "co2_saved": co2_saved,
+        "trees": FinancialMetricsCalculator.calculate_tree_equivalents(co2_saved),
+    }
+
+
+class Stage:
+    """
+    A named pipeline step: func is called with the values named in inputs as
+    keyword arguments and returns a dictionary of outputs.
+    """
+
+    def __init__(self, name, func, inputs):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, inputs={self.inputs})"
+
+
+# In dependency order: every stage only reads quote inputs and earlier outputs
+STAGES = (
+    Stage("consumption", consumption_stage, ("kwh", "seed")),
+    Stage("sizing", sizing_stage, (
+        "avg_monthly_kwh", "monthly_consumption", "department", "distributor", "rate_type",
+        "sizing_preference", "roof_area", "latitude", "longitude",
+    )),
+    Stage("orientation", orientation_stage, ("monthly_irradiance", "latitude", "longitude", "roof_tilt", "roof_azimuth")),
+    Stage("generation", generation_stage, (
+        "panels", "avg_monthly_kwh", "annual_irradiance", "monthly_irradiance", "sizing_preference",
+        "latitude", "longitude", "roof_tilt", "roof_azimuth",
+    )),
+    Stage("billing", billing_stage, (
+        "monthly_consumption", "monthly_generation", "panels", "monthly_irradiance", "distributor", "rate_type", "department",
+        "latitude", "longitude", "roof_tilt", "roof_azimuth",
+    )),
+    Stage("metrics", metrics_stage, ("installed_kw", "financial")),
+    Stage("environmental", environmental_stage, ("annual_generation",)),
+)
+
+
+def _fingerprint(values):
+    return hashlib.sha256(pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+class QuoteEngine:
+    """
+    Runs the quote stages and memoizes each one on a hash of its inputs.
+    Each stage keeps its max_entries most recently used results.
+    Returned values are shared with the cache and must not be modified.
+    """
+
+    def __init__(self, stages=STAGES, max_entries=32):
+        self.stages = stages
+        self.max_entries = max_entries
+        self._memo = {stage.name: OrderedDict() for stage in stages}
+        self.last_computed = []
+
+    def run(self, **inputs):
+        """
+        Returns a dictionary with the quote inputs and every stage output.
+        The seed defaults to one derived from kwh, department, distributor and
+        rate_type, so the simulated series are stable across reruns.
+        Stages that had to be recomputed are listed in last_computed.
+        """
+        unknown = set(inputs) - set(QUOTE_INPUTS)
+        if unknown:
+            raise TypeError(f"Unknown quote inputs: {', '.join(sorted(unknown))}")
+        values = {**QUOTE_INPUTS, **inputs}
+        values["kwh"] = list(values["kwh"])
+        if values["seed"] is None:
+            values["seed"] = ScenarioGenerator.seed_from(
+                values["kwh"], values["department"], values["distributor"], values["rate_type"]
+            )
+
+        data_version = get_store().version
+        self.last_computed = []
+        for stage in self.stages:
+            memo = self._memo[stage.name]
+            arguments = {name: values[name] for name in stage.inputs}
+            key = _fingerprint((data_version, tuple(arguments.values())))
+            outputs = memo.get(key)
+            if outputs is None:
+                outputs = stage.func(**arguments)
+                memo[key] = outputs
+                if len(memo) > self.max_entries:
+                    memo.popitem(last=False)
+                self.last_computed.append(stage.name)
+            else:
+                memo.move_to_end(key)
+            values.update(outputs)
+        return values
+
+    def clear(self):
+        for memo in self._memo.values():
+            memo.clear()
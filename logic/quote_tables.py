@@ -0,0 +1,184 @@
+# logic/quote_tables.py
+"""
+Precomputed quote lookup tables.
+
+build_quote_tables() runs the full pipeline offline over a grid of average
+monthly kWh values for every department x distributor x rate type x sizing
+preference combination available in the data files. The results are written
+to a memory-mappable array file (logic/utils/mmap_store.py).
+
+QuoteTables.lookup() answers a quote by linear interpolation between the two
+surrounding grid points. Grid points are only blended when they have the same
+panel count. Near a panel-count step, the values are extrapolated from the
+nearest points with the panel count the exact pipeline would choose. Averages outside
+the grid, unknown combinations and tables built from older data files return
+None, and fast_quote() then falls back to run_quote().
+
+Every table entry is computed with the fixed TABLE_SEED, so the simulated
+monthly consumption pattern depends only on the average kWh.
+"""
+
+import bisect
+import threading
+import time
+
+import numpy as np
+from logic.energy.system_calculator import SystemCalculator
+from logic.pipeline import run_quote
+from logic.utils.data_loader import get_store
+from logic.utils.mmap_store import open_arrays, write_arrays
+
+DEFAULT_TABLE_PATH = "data/quote_tables.bin"
+TABLE_SEED = 0
+TABLE_PREFERENCES = ("Minimum", "Balanced", "Maximum")
+
+# Scalar quote results stored per grid point, in column order
+TABLE_FIELDS = (
+    "system_kw",
+    "panels",
+    "installed_kw",
+    "area_m2",
+    "annual_generation",
+    "coverage",
+    "co2_saved",
+    "trees",
+    "annual_cost_without_solar",
+    "annual_cost_with_solar",
+    "annual_savings",
+    "investment",
+    "payback",
+    "roi",
+    "irr",
+)
+_SYSTEM_KW = TABLE_FIELDS.index("system_kw")
+_PANELS = TABLE_FIELDS.index("panels")
+
+
+def build_quote_tables(path=DEFAULT_TABLE_PATH, kwh_min=50, kwh_max=5000, kwh_step=10, preferences=TABLE_PREFERENCES):
+    """
+    Computes and writes the lookup tables. Combinations whose pricing or
+    irradiance data is missing are skipped.
+    Returns the number of combinations written.
+    """
+    store = get_store()
+    grid = np.arange(kwh_min, kwh_max + kwh_step / 2, kwh_step, dtype=float)
+
+    combos, tables = [], []
+    for distributor in store.distributors():
+        for rate_type in store.rate_types(distributor):
+            for department in store.departments():
+                if store.tariff(distributor, rate_type, department) is None:
+                    continue
+                if store.monthly_irradiance(department) is None:
+                    continue
+                for preference in preferences:
+                    table = np.empty((len(grid), len(TABLE_FIELDS)))
+                    for i, avg_kwh in enumerate(grid):
+                        result = run_quote([avg_kwh], department, distributor, rate_type, preference, seed=TABLE_SEED)
+                        table[i] = [np.nan if result[field] is None else result[field] for field in TABLE_FIELDS]
+                    combos.append([department, distributor, rate_type, preference])
+                    tables.append(table)
+
+    values = np.stack(tables) if tables else np.empty((0, len(grid), len(TABLE_FIELDS)))
+    meta = {
+        "fields": list(TABLE_FIELDS),
+        "combos": combos,
+        "seed": TABLE_SEED,
+        "data_version": list(store.version),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    write_arrays(path, {"kwh_grid": grid, "values": values}, meta)
+    return len(combos)
+
+
+class QuoteTables:
+    """
+    Read-only view of a lookup table file.
+    """
+
+    def __init__(self, path=DEFAULT_TABLE_PATH):
+        arrays, meta = open_arrays(path)
+        self.path = path
+        self.kwh_grid = arrays["kwh_grid"]
+        self.values = arrays["values"]
+        self.fields = tuple(meta["fields"])
+        self.data_version = tuple(meta["data_version"])
+        self._grid = self.kwh_grid.tolist()
+        self._index = {tuple(combo): i for i, combo in enumerate(meta["combos"])}
+
+    def is_current(self):
+        """
+        True if the tables were built from the current pricing and irradiance files.
+        """
+        return self.data_version == get_store().version
+
+    def lookup(self, department, distributor, rate_type, avg_kwh, sizing_preference="Balanced"):
+        """
+        Returns a dictionary of TABLE_FIELDS for the average monthly kWh, or
+        None when the combination or value is not covered by the table.
+        """
+        combo = self._index.get((department, distributor, rate_type, sizing_preference.capitalize()))
+        grid = self._grid
+        if combo is None or not grid[0] <= avg_kwh <= grid[-1]:
+            return None
+
+        upper = min(bisect.bisect_left(grid, avg_kwh), len(grid) - 1)
+        lower = max(upper - 1, 0)
+        rows = self.values[combo]
+        low, high = rows[lower], rows[upper]
+        weight = 0.0 if upper == lower else (avg_kwh - grid[lower]) / (grid[upper] - grid[lower])
+
+        if low[_PANELS] != high[_PANELS]:
+            # A panel-count step lies between the grid points. Extrapolate from
+            # the two nearest points with the panel count the exact sizing
+            # would produce, or use the nearest one if there is no second.
+            system_kw = low[_SYSTEM_KW] + (high[_SYSTEM_KW] - low[_SYSTEM_KW]) * weight
+            if SystemCalculator.calculate_number_of_panels(system_kw) == high[_PANELS]:
+                if upper + 1 < len(grid) and rows[upper + 1][_PANELS] == high[_PANELS]:
+                    low, high, weight = high, rows[upper + 1], weight - 1
+                else:
+                    low, weight = high, 0.0
+            elif lower > 0 and rows[lower - 1][_PANELS] == low[_PANELS]:
+                low, high, weight = rows[lower - 1], low, weight + 1
+            else:
+                high, weight = low, 0.0
+
+        row = low + (high - low) * weight
+        result = dict(zip(self.fields, row.tolist()))
+        result["panels"] = int(round(result["panels"]))
+        for field, value in result.items():
+            if value != value:  # NaN, e.g. payback with no savings
+                result[field] = None
+        return result
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+def get_quote_tables(path=DEFAULT_TABLE_PATH):
+    """
+    Returns the QuoteTables for path, or None if the file is missing, invalid
+    or stale. A rebuilt file is picked up on the next call.
+    """
+    try:
+        with _tables_lock:
+            tables = _tables.get(path)
+            if tables is None or not tables.is_current():
+                tables = _tables[path] = QuoteTables(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    return tables if tables.is_current() else None
+
+
+def fast_quote(avg_kwh, department, distributor, rate_type, sizing_preference="Balanced", path=DEFAULT_TABLE_PATH):
+    """
+    Returns the scalar quote results for an average monthly kWh, from the
+    lookup tables when possible and from the full pipeline otherwise.
+    """
+    tables = get_quote_tables(path)
+    if tables is not None:
+        result = tables.lookup(department, distributor, rate_type, avg_kwh, sizing_preference)
+        if result is not None:
+            return result
+    result = run_quote([avg_kwh], department, distributor, rate_type, sizing_preference, seed=TABLE_SEED)
+    return {field: result[field] for field in TABLE_FIELDS}
@@ -0,0 +1,228 @@
+# logic/utils/amm_warehouse.py
+"""
+Local Parquet warehouse of AMM hourly generation data.
+
+Layout under the warehouse directory:
+
+    year=2025/month=3/part-<category>-<first day>-<last day>.parquet
+    _manifest.json      {"ingested": {category: ["2025-03-01", ...]}}
+
+backfill() downloads only the (category, day) pairs missing from the
+manifest, with bounded parallelism. Each month partition is written as a new
+file and recorded in the manifest right away. A file whose days never made it
+into the manifest (an interrupted run) is deleted by the next backfill before
+those days are downloaded again, so re-runs never duplicate rows. Only past
+days are ingested, because today's data is still changing, and cached copies
+downloaded before their day was over are never reused (see AMMClient). read() loads a date range
+with partition pruning and row filters pushed down to the Parquet reader.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import defaultdict, deque
+from datetime import timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from logic.clients.amm_client import AMM_URLS, AMMClient, local_today
+
+DEFAULT_WAREHOUSE_DIR = "data/warehouse/amm"
+MANIFEST_FILE = "_manifest.json"
+PART_FILE = re.compile(r"^part-(?P<category>.+)-(?P<first>\d{4}-\d{2}-\d{2})-(?P<last>\d{4}-\d{2}-\d{2})\.parquet$")
+
+SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("hora", pa.int16()),
+    ("category", pa.string()),
+    ("tipo", pa.string()),
+    ("potencia", pa.float64()),
+])
+
+
+def _days(start, end):
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def _months(start, end):
+    months, year, month = [], start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def records_to_table(category, day, records):
+    """
+    Converts one AMM response into a table with SCHEMA, dropping rows whose
+    hour or power is not numeric.
+    """
+    frame = pd.DataFrame(records, columns=["hora", "tipo", "potencia"])
+    frame["hora"] = pd.to_numeric(frame["hora"], errors="coerce")
+    frame["potencia"] = pd.to_numeric(frame["potencia"], errors="coerce")
+    frame = frame.dropna(subset=["hora", "potencia"])
+    return pa.table({
+        "date": pa.array([day] * len(frame), pa.date32()),
+        "hora": pa.array(frame["hora"].astype("int16"), pa.int16()),
+        "category": pa.array([category] * len(frame), pa.string()),
+        "tipo": pa.array(frame["tipo"].astype(str), pa.string()),
+        "potencia": pa.array(frame["potencia"].astype(float), pa.float64()),
+    }, schema=SCHEMA)
+
+
+class AMMWarehouse:
+    """
+    Partitioned Parquet store of AMM hourly data with an ingestion manifest.
+    """
+
+    def __init__(self, root=DEFAULT_WAREHOUSE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    # --- Manifest ---
+
+    def _manifest_path(self):
+        return os.path.join(self.root, MANIFEST_FILE)
+
+    def ingested(self):
+        """
+        Returns {category: set of ISO dates} already stored.
+        """
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return defaultdict(set)
+        return defaultdict(set, {category: set(days) for category, days in manifest.get("ingested", {}).items()})
+
+    def _save_manifest(self, ingested):
+        os.makedirs(self.root, exist_ok=True)
+        temporary_path = self._manifest_path() + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump({"ingested": {category: sorted(days) for category, days in ingested.items()}}, f, ensure_ascii=False)
+        os.replace(temporary_path, self._manifest_path())
+
+    def missing(self, start, end, categories=None):
+        """
+        Returns the (category, day) pairs in the range not ingested yet.
+        Today and future days are never considered missing.
+        """
+        ingested = self.ingested()
+        last = min(end, local_today() - timedelta(days=1))
+        return [
+            (category, day)
+            for day in _days(start, last)
+            for category in categories or AMM_URLS
+            if day.isoformat() not in ingested[category]
+        ]
+
+    # --- Ingestion ---
+
+    @staticmethod
+    def _file_category(category):
+        return category.replace(" ", "_")
+
+    def _write_month(self, year, month, category, tables):
+        table = pa.concat_tables(tables)
+        directory = os.path.join(self.root, f"year={year}", f"month={month}")
+        os.makedirs(directory, exist_ok=True)
+        days = table.column("date").to_pylist()
+        name = f"part-{self._file_category(category)}-{min(days).isoformat()}-{max(days).isoformat()}.parquet"
+        # Hidden until complete: the dataset reader skips names starting with "."
+        temporary_path = os.path.join(directory, f".{name}.tmp")
+        pq.write_table(table, temporary_path)
+        os.replace(temporary_path, os.path.join(directory, name))
+
+    def _remove_unrecorded(self, ingested):
+        """
+        Deletes part files left by an interrupted run: their first day was
+        never recorded in the manifest.
+        """
+        categories = {self._file_category(category): category for category in AMM_URLS}
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                match = PART_FILE.match(name)
+                category = match and categories.get(match.group("category"))
+                if category and match.group("first") not in ingested[category]:
+                    os.remove(os.path.join(directory, name))
+
+    def backfill(self, start, end, categories=None, workers=4, client=None, progress=None):
+        """
+        Downloads and stores every missing (category, day) between start and
+        end. At most `workers` downloads run at once. Days that fail or come
+        back empty are left out of the manifest and retried on the next run.
+        progress, if given, is called with (done, total) after each download.
+        Returns the number of (category, day) pairs ingested.
+        """
+        pending = self.missing(start, end, categories)
+        if not pending:
+            return 0
+        client = client or AMMClient(max_workers=workers)
+
+        tables = defaultdict(list)
+        fetched = []
+        window = deque()
+        done = 0
+        for category, day in pending:
+            window.append((category, day, client.submit((category, day.isoformat()))))
+            if len(window) >= workers:
+                self._collect(window.popleft(), tables, fetched)
+                done += 1
+                if progress:
+                    progress(done, len(pending))
+        while window:
+            self._collect(window.popleft(), tables, fetched)
+            done += 1
+            if progress:
+                progress(done, len(pending))
+
+        with self._lock:
+            ingested = self.ingested()
+            self._remove_unrecorded(ingested)
+            for (year, month, category), month_days in tables.items():
+                self._write_month(year, month, category, [table for _, table in month_days])
+                ingested[category].update(day.isoformat() for day, _ in month_days)
+                self._save_manifest(ingested)
+        return len(fetched)
+
+    @staticmethod
+    def _collect(item, tables, fetched):
+        category, day, future = item
+        try:
+            records = future.result()
+        except Exception:
+            return
+        table = records_to_table(category, day, records)
+        if table.num_rows:
+            tables[(day.year, day.month, category)].append((day, table))
+            fetched.append((category, day))
+
+    # --- Reading ---
+
+    def read(self, start, end, categories=None, columns=None):
+        """
+        Returns a DataFrame of hourly rows between start and end (inclusive).
+        Only the month partitions in the range are opened, and the date and
+        category filters are applied while reading.
+        """
+        empty = SCHEMA.empty_table().to_pandas()
+        if not os.path.isdir(self.root):
+            return empty if columns is None else empty[columns]
+
+        schema = SCHEMA.append(pa.field("year", pa.int32())).append(pa.field("month", pa.int32()))
+        dataset = ds.dataset(self.root, format="parquet", schema=schema, partitioning="hive")
+        partition_filter = None
+        for year, month in _months(start, end):
+            expression = (ds.field("year") == year) & (ds.field("month") == month)
+            partition_filter = expression if partition_filter is None else partition_filter | expression
+
+        row_filter = (ds.field("date") >= pa.scalar(start, pa.date32())) & (ds.field("date") <= pa.scalar(end, pa.date32()))
+        if categories:
+            row_filter &= ds.field("category").isin(list(categories))
+
+        table = dataset.to_table(columns=columns or SCHEMA.names, filter=partition_filter & row_filter)
+        return table.to_pandas()
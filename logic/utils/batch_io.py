@@ -0,0 +1,182 @@
+# logic/utils/batch_io.py
+
+import csv
+import json
+import os
+import re
+from itertools import islice
+
+LEAD_FIELD_ALIASES = {
+    "tariff": "rate_type",
+    "sizing_pref": "sizing_preference",
+}
+
+def _parse_kwh(value):
+    if isinstance(value, (list, tuple)):
+        return [float(v) for v in value]
+    return [float(v) for v in re.split(r"[;,\s|]+", str(value).strip()) if v]
+
+def normalize_lead(record):
+    """
+    Normalizes a raw CSV/JSONL record into a lead dictionary with:
+      - id (optional)
+      - kwh: list of monthly kWh values, from a "kwh" field (list or
+        "240;250;260" string) or from kwh_1, kwh_2, ... columns
+      - department, distributor, rate_type (alias "tariff")
+      - sizing_preference (alias "sizing_pref", default "Balanced")
+    Unparseable kWh values are reported in an "error" field.
+    """
+    lead = {}
+    for key, value in record.items():
+        key = LEAD_FIELD_ALIASES.get(key, key)
+        if value in ("", None):
+            continue
+        lead[key] = value
+
+    try:
+        if "kwh" in lead:
+            lead["kwh"] = _parse_kwh(lead["kwh"])
+        else:
+            columns = sorted(
+                (key for key in lead if re.fullmatch(r"kwh_\d+", key)),
+                key=lambda key: int(key.split("_")[1])
+            )
+            if columns:
+                lead["kwh"] = [float(lead.pop(key)) for key in columns]
+    except (TypeError, ValueError):
+        lead.pop("kwh", None)
+        lead["error"] = "Invalid kWh values"
+
+    lead.setdefault("sizing_preference", "Balanced")
+    return lead
+
+def read_leads(path):
+    """
+    Streams leads from a .csv or .jsonl file one at a time.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if extension == ".csv":
+            for row in csv.DictReader(f):
+                yield normalize_lead(row)
+        elif extension in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield normalize_lead(json.loads(line))
+        else:
+            raise ValueError(f"Unsupported lead file type: {extension}")
+
+def geocode_leads(leads, geocoder, chunk_size=500):
+    """
+    Streams leads, adding latitude and longitude to those that have an
+    "address" but no coordinates. Each chunk of leads is geocoded in one
+    geocoder.geocode_many() call. Leads whose address was not found or whose
+    lookup failed keep no coordinates and get a "warning" field saying which;
+    they are still quoted from their department.
+    """
+    leads = iter(leads)
+    for chunk in iter(lambda: list(islice(leads, chunk_size)), []):
+        pending = [lead for lead in chunk if lead.get("address") and lead.get("latitude") is None]
+        if pending:
+            failures = {}
+            results = geocoder.geocode_many([lead["address"] for lead in pending], failures)
+            for lead, result in zip(pending, results):
+                if lead["address"] in failures:
+                    lead.setdefault("warning", f"Geocoding failed for {lead['address']}: {failures[lead['address']]}")
+                elif result is None:
+                    lead.setdefault("warning", f"Address not found: {lead['address']}")
+                else:
+                    lead["latitude"], lead["longitude"] = result["latitude"], result["longitude"]
+        yield from chunk
+
+def locate_leads(leads, index, chunk_size=500):
+    """
+    Streams leads, filling in department, distributor and municipality from
+    their coordinates with one index.locate_many() call per chunk. Values
+    already present in a lead are kept.
+    """
+    leads = iter(leads)
+    for chunk in iter(lambda: list(islice(leads, chunk_size)), []):
+        pending = [lead for lead in chunk if lead.get("latitude") is not None and lead.get("longitude") is not None]
+        if pending:
+            latitudes, longitudes = [], []
+            for lead in pending:
+                try:
+                    latitudes.append(float(lead["latitude"]))
+                    longitudes.append(float(lead["longitude"]))
+                except (TypeError, ValueError):
+                    latitudes.append(float("nan"))
+                    longitudes.append(float("nan"))
+            located = index.locate_many(latitudes, longitudes)
+            for i, lead in enumerate(pending):
+                for field, values in located.items():
+                    if values[i] is not None:
+                        lead.setdefault(field, values[i])
+        yield from chunk
+
+
+class JsonlWriter:
+    """
+    Appends records to a JSON Lines file, one object per line.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, records):
+        for record in records:
+            self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetWriter:
+    """
+    Writes records to a Parquet file, one row group per write() call.
+    Takes a mapping of field name -> Arrow type name ("string", "int64",
+    "float64"). The schema is fixed up front and every column is nullable, so
+    chunks with missing values (e.g. failed leads) stay compatible.
+    """
+
+    def __init__(self, path, fields):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in fields.items()])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, records):
+        if not records:
+            return
+        columns = {name: [record.get(name) for record in records] for name in self.schema.names}
+        self.writer.write_table(self._pa.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_writer(path, fields):
+    """
+    Opens a JSONL or Parquet result writer based on the file extension.
+    fields maps each output column to its Arrow type name (used by Parquet).
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        return ParquetWriter(path, fields)
+    if extension in (".jsonl", ".ndjson"):
+        return JsonlWriter(path)
+    raise ValueError(f"Unsupported output file type: {extension}")
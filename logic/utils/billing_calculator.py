@@ -1,8 +1,38 @@
 # logic/utils/billing_calculator.py
 
+import numpy as np
+import pandas as pd
+
 from config.constants import TAX_RATE
-from logic.utils.data_loader import get_full_pricing_data
+from logic.utils.data_loader import get_full_pricing_data, get_store
+from logic.utils.instrumentation import instrument_class
+
+
+def _round_like_python(values, ndigits=2):
+    """
+    Rounds an array exactly like the builtin round() does for floats.
+    np.round can disagree with round() on values sitting right on a half-cent
+    boundary, so those few values are re-rounded with the builtin.
+    """
+    rounded = np.round(values, ndigits)
+    scaled = values * 10 ** ndigits
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ties.any():
+        rounded[ties] = [round(float(v), ndigits) for v in values[ties]]
+    return rounded
+
+
+def _sum_months(monthly):
+    """
+    Sums an (n, 12) array month by month, in the same order as sum() over a list.
+    """
+    total = np.zeros(monthly.shape[0])
+    for month in range(monthly.shape[1]):
+        total += monthly[:, month]
+    return total
 
+
+@instrument_class("billing")
 class BillingCalculator:
     """
     Handles the calculation of electricity bills with and without solar.
@@ -64,3 +94,173 @@ class BillingCalculator:
             "annual_savings": round(annual_savings, 2)
         }
 
+    @staticmethod
+    def resolve_tariffs(distributor, rate_type, department, size):
+        """
+        Resolves tariff keys (scalars or one per customer) into arrays of
+        fixedCharge, pricePerKwh and municipalityFee plus a mask of known tariffs.
+        Each distinct key is looked up in the shared store only once.
+        """
+        combined = np.zeros(size, dtype=np.int64)
+        levels = []
+        for key in (distributor, rate_type, department):
+            key = np.asarray(key, dtype=object)
+            if key.ndim == 0:
+                values, codes = key.reshape(1), 0
+            else:
+                values, codes = np.unique(key, return_inverse=True)
+            combined = combined * len(values) + codes
+            levels.append(values)
+        unique_codes, inverse = np.unique(combined, return_inverse=True)
+
+        tariffs = get_store().tariffs
+        table = np.zeros((len(unique_codes), 3))
+        found = np.zeros(len(unique_codes), dtype=bool)
+        for row, code in enumerate(unique_codes):
+            key = []
+            for values in reversed(levels):
+                code, index = divmod(int(code), len(values))
+                key.append(values[index])
+            pricing = tariffs.get(tuple(reversed(key)))
+            if pricing:
+                table[row] = (pricing["fixedCharge"], pricing["pricePerKwh"], pricing["municipalityFee"])
+                found[row] = True
+
+        return table[inverse, 0], table[inverse, 1], table[inverse, 2], found[inverse]
+
+    @staticmethod
+    def calculate_monthly_bills_batch(consumption_kwh, distributor, rate_type, department):
+        """
+        Vectorized calculate_monthly_bill over an (n_customers, n_months) array.
+        Tariff keys may be scalars or one value per customer. Unknown tariffs bill 0.
+        """
+        consumption = np.asarray(consumption_kwh, dtype=float)
+        if consumption.ndim == 1:
+            consumption = consumption[np.newaxis, :]
+
+        tariffs = BillingCalculator.resolve_tariffs(distributor, rate_type, department, consumption.shape[0])
+        return BillingCalculator._bill_with_tariffs(consumption, *tariffs)
+
+    @staticmethod
+    def _bill_with_tariffs(consumption, fixed, price, municipality, found):
+        subtotal = fixed[:, np.newaxis] + consumption * price[:, np.newaxis]
+        with_municipality = subtotal * (1 + municipality[:, np.newaxis])
+        with_tax = with_municipality * (1 + TAX_RATE)
+
+        bills = _round_like_python(with_tax)
+        bills[~found] = 0
+        return bills
+
+    @staticmethod
+    def generate_annual_cost_comparison_batch(monthly_consumptions, monthly_generation, distributor, rate_type, department):
+        """
+        Vectorized generate_annual_cost_comparison for many customers at once.
+        Takes (n_customers, 12) arrays or DataFrames of consumption and generation
+        and tariff keys (scalars or one per customer).
+        Returns a dictionary of arrays with the same keys as the scalar version,
+        plus the monthly bills with and without solar.
+        """
+        consumption = np.asarray(monthly_consumptions, dtype=float)
+        generation = np.asarray(monthly_generation, dtype=float)
+        if consumption.ndim == 1:
+            consumption = consumption[np.newaxis, :]
+        if generation.ndim == 1:
+            generation = generation[np.newaxis, :]
+        if consumption.shape[-1] != 12 or generation.shape[-1] != 12:
+            raise ValueError("Expected 12 months of data for both consumption and generation.")
+        generation = np.broadcast_to(generation, consumption.shape)
+
+        tariffs = BillingCalculator.resolve_tariffs(distributor, rate_type, department, consumption.shape[0])
+
+        monthly_bills_without_solar = BillingCalculator._bill_with_tariffs(consumption, *tariffs)
+        net_monthly = np.maximum(consumption - generation, 0)
+        monthly_bills_with_solar = BillingCalculator._bill_with_tariffs(net_monthly, *tariffs)
+
+        annual_cost_without_solar = _sum_months(monthly_bills_without_solar)
+        annual_cost_with_solar = _sum_months(monthly_bills_with_solar)
+        annual_savings = annual_cost_without_solar - annual_cost_with_solar
+
+        return {
+            "monthly_bills_without_solar": monthly_bills_without_solar,
+            "monthly_bills_with_solar": monthly_bills_with_solar,
+            "annual_cost_without_solar": _round_like_python(annual_cost_without_solar),
+            "annual_cost_with_solar": _round_like_python(annual_cost_with_solar),
+            "annual_savings": _round_like_python(annual_savings)
+        }
+
+    @staticmethod
+    def calculate_dated_bills(bills, history):
+        """
+        Bills dated monthly consumption against the tariff in force on each date.
+        bills is a DataFrame with one row per customer-month and columns date,
+        kwh, distributor, rate_type and department (other columns are kept).
+        history is a TariffHistory or a DataFrame shaped like TariffHistory.frame().
+
+        The pricePerKwh of every row comes from one as-of join on date, grouped
+        by distributor and rate type, so quarterly CNEE adjustments are applied
+        across any number of customers and months without per-row lookups.
+        Fixed charges and municipality fees come from pricing.json. Rows dated
+        before the history starts use the pricing.json price and get a NaT
+        effective_from. Unknown tariffs, including rows with a missing
+        distributor, rate type or department, bill 0.
+        Returns a copy of bills with effective_from, price_per_kwh and bill columns.
+        """
+        from logic.utils.tariff_history import PRICING_RATE_TYPES
+
+        # Missing key values become "", which matches no tariff
+        keys = bills[["distributor", "rate_type", "department"]].fillna("").astype(str)
+        if hasattr(history, "frame"):
+            history = history.frame(distributors=sorted(keys["distributor"].unique()))
+
+        left = pd.DataFrame({
+            "row": np.arange(len(bills)),
+            "date": pd.to_datetime(bills["date"]).to_numpy(dtype="datetime64[ns]"),
+            "distributor": keys["distributor"].to_numpy(),
+            "rate_type": keys["rate_type"].map(PRICING_RATE_TYPES).fillna("").to_numpy(),
+        }).astype({"distributor": str, "rate_type": str}).sort_values("date", kind="stable")
+        right = pd.DataFrame({
+            "effective_from": history["effective_from"].to_numpy(dtype="datetime64[ns]"),
+            "distributor": history["distributor"].to_numpy(),
+            "rate_type": history["rate_type"].to_numpy(),
+            "price_per_kwh": history["price_per_kwh"].to_numpy(dtype=float),
+        }).astype({"distributor": str, "rate_type": str}).sort_values("effective_from", kind="stable")
+        matched = pd.merge_asof(
+            left, right, left_on="date", right_on="effective_from", by=["distributor", "rate_type"]
+        ).sort_values("row")
+
+        # pricing.json entries, resolved once per distinct tariff key
+        codes = keys.groupby(list(keys.columns), sort=False).ngroup().to_numpy()
+        distinct = keys.drop_duplicates()
+        tariffs = BillingCalculator.resolve_tariffs(
+            *(distinct[column].to_numpy(dtype=object) for column in distinct.columns), len(distinct)
+        )
+        fixed, price, municipality, found = (values[codes] for values in tariffs)
+        dated_price = matched["price_per_kwh"].to_numpy()
+        price = np.where(np.isnan(dated_price), price, dated_price)
+        kwh = bills["kwh"].to_numpy(dtype=float)[:, np.newaxis]
+
+        result = bills.copy()
+        result["effective_from"] = matched["effective_from"].to_numpy()
+        result["price_per_kwh"] = np.where(found, price, np.nan)
+        result["bill"] = BillingCalculator._bill_with_tariffs(kwh, fixed, price, municipality, found)[:, 0]
+        return result
+
+    @staticmethod
+    def generate_hourly_cost_comparison(hourly_consumption, hourly_generation, distributor, rate_type, department):
+        """
+        Calculates annual electricity cost without and with solar by netting
+        8760 hourly consumption and generation values, honoring block,
+        time-of-use, demand and export credit rules of the tariff.
+        Returns the same dictionary as generate_annual_cost_comparison.
+        """
+        from logic.utils.tariff_engine import TariffBillingEngine
+
+        if np.shape(hourly_consumption)[-1] != 8760 or np.shape(hourly_generation)[-1] != 8760:
+            raise ValueError("Expected 8760 hours of data for both consumption and generation.")
+
+        result = TariffBillingEngine.compare(hourly_consumption, hourly_generation, distributor, rate_type, department)
+        return {
+            "annual_cost_without_solar": float(result["annual_cost_without_solar"][0]),
+            "annual_cost_with_solar": float(result["annual_cost_with_solar"][0]),
+            "annual_savings": float(result["annual_savings"][0])
+        }
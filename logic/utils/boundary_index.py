@@ -0,0 +1,307 @@
+# logic/utils/boundary_index.py
+"""
+Spatial index of Guatemala's administrative boundaries.
+
+build_boundary_index() compiles a GeoJSON file of municipality (or
+department) polygons into a memory-mappable array file
+(logic/utils/mmap_store.py). Any GADM or geoBoundaries export works. The file
+covers the country with a regular grid of cells:
+
+- cell_owner holds the polygon that contains the whole cell, -1 when the cell
+  is outside every polygon, or -2 when a boundary crosses the cell.
+- for boundary cells, a CSR list (cell_offsets / cell_polygons) names the
+  few polygons whose edges pass nearby.
+
+Most lookups are one grid read. Only points in boundary cells run a
+point-in-polygon test, and only against that cell's candidates. Each polygon
+carries its department, municipality and distributor. The distributor comes
+from a feature property or from DEPARTMENT_DISTRIBUTORS. Department names are
+matched to the spelling used in the data files, so a result can be passed
+straight to the irradiance and pricing lookups.
+"""
+
+import json
+import threading
+import unicodedata
+
+import numpy as np
+
+from config.constants import DEPARTMENT_DISTRIBUTORS
+from logic.utils.mmap_store import open_arrays, write_arrays
+
+DEFAULT_BOUNDARY_INDEX_PATH = "data/boundaries.bin"
+DEFAULT_CELL_SIZE = 0.01  # degrees, about 1.1 km
+
+# Point-edge pairs tested per numpy operation
+_PAIRS_PER_CHUNK = 2_000_000
+
+
+def _fold(name):
+    return unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode().casefold().strip()
+
+_CANONICAL_DEPARTMENTS = {_fold(name): name for name in DEPARTMENT_DISTRIBUTORS}
+
+
+def canonical_department(name):
+    """
+    Returns the data files' spelling of a department name ("Quiche" -> "Quiché"),
+    or the name unchanged if it is not a known department.
+    """
+    return _CANONICAL_DEPARTMENTS.get(_fold(name), name)
+
+
+def _feature_rings(geometry):
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        return []
+    rings = []
+    for polygon in polygons:
+        for ring in polygon:
+            ring = np.asarray(ring, dtype=float)[:, :2]
+            if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+                ring = ring[:-1]
+            if len(ring) >= 3:
+                rings.append(ring)
+    return rings
+
+
+def _ring_edges(rings):
+    return np.concatenate([np.hstack([ring, np.roll(ring, -1, axis=0)]) for ring in rings])
+
+
+def points_in_polygon(edges, xs, ys):
+    """
+    Even-odd ray casting of points against a polygon given as an (m, 4)
+    array of x1, y1, x2, y2 edges (holes and multiple parts included).
+    Returns a boolean array, one value per point.
+    """
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    inside = np.zeros(len(xs), dtype=bool)
+    if len(edges) == 0:
+        return inside
+    x1, y1, x2, y2 = (edges[:, column] for column in range(4))
+    step = max(1, _PAIRS_PER_CHUNK // len(edges))
+    for start in range(0, len(xs), step):
+        px = xs[start:start + step, np.newaxis]
+        py = ys[start:start + step, np.newaxis]
+        straddles = (y1 > py) != (y2 > py)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing_x = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        crossings = np.count_nonzero(straddles & (px < crossing_x), axis=1)
+        inside[start:start + step] = crossings % 2 == 1
+    return inside
+
+
+def build_boundary_index(source, path=DEFAULT_BOUNDARY_INDEX_PATH, department_field="NAME_1",
+                         municipality_field="NAME_2", distributor_field="distributor", cell_size=DEFAULT_CELL_SIZE):
+    """
+    Compiles a GeoJSON FeatureCollection of boundary polygons into an index file.
+    Features without Polygon/MultiPolygon geometry are skipped.
+    Returns the number of polygons indexed.
+    """
+    with open(source, "r", encoding="utf-8") as f:
+        features = json.load(f)["features"]
+
+    regions, polygon_edges = [], []
+    for feature in features:
+        rings = _feature_rings(feature.get("geometry") or {"type": None})
+        if not rings:
+            continue
+        properties = feature.get("properties") or {}
+        department = canonical_department(properties.get(department_field, ""))
+        distributor = properties.get(distributor_field) or DEPARTMENT_DISTRIBUTORS.get(department)
+        regions.append([department, properties.get(municipality_field), distributor])
+        polygon_edges.append(_ring_edges(rings))
+    if not regions:
+        raise ValueError(f"No polygons found in {source}")
+
+    edges = np.concatenate(polygon_edges)
+    edge_offsets = np.concatenate([[0], np.cumsum([len(e) for e in polygon_edges])]).astype(np.int64)
+    bboxes = np.array([
+        [min(e[:, 0].min(), e[:, 2].min()), min(e[:, 1].min(), e[:, 3].min()),
+         max(e[:, 0].max(), e[:, 2].max()), max(e[:, 1].max(), e[:, 3].max())]
+        for e in polygon_edges
+    ])
+
+    # Grid over the union of all polygons
+    origin_x, origin_y = bboxes[:, 0].min(), bboxes[:, 1].min()
+    nx = int(np.ceil((bboxes[:, 2].max() - origin_x) / cell_size)) + 1
+    ny = int(np.ceil((bboxes[:, 3].max() - origin_y) / cell_size)) + 1
+
+    # Owner of every cell center
+    cell_owner = np.full(nx * ny, -1, dtype=np.int32)
+    for polygon, (min_x, min_y, max_x, max_y) in enumerate(bboxes):
+        columns = np.arange(int((min_x - origin_x) // cell_size), int((max_x - origin_x) // cell_size) + 1)
+        rows = np.arange(int((min_y - origin_y) // cell_size), int((max_y - origin_y) // cell_size) + 1)
+        grid_rows, grid_columns = np.meshgrid(rows, columns, indexing="ij")
+        cells = (grid_rows * nx + grid_columns).ravel()
+        inside = points_in_polygon(
+            polygon_edges[polygon],
+            origin_x + (grid_columns.ravel() + 0.5) * cell_size,
+            origin_y + (grid_rows.ravel() + 0.5) * cell_size,
+        )
+        cell_owner[cells[inside]] = polygon
+
+    # Cells near an edge: sample every edge at half-cell spacing, then add the
+    # 8 neighbours of each sampled cell so corner-clipping edges are not missed
+    lengths = np.hypot(edges[:, 2] - edges[:, 0], edges[:, 3] - edges[:, 1])
+    samples = np.ceil(lengths / (cell_size / 2)).astype(np.int64) + 1
+    edge_ids = np.repeat(np.arange(len(edges)), samples)
+    steps = np.arange(len(edge_ids)) - np.repeat(np.cumsum(samples) - samples, samples)
+    t = steps / np.repeat(np.maximum(samples - 1, 1), samples)
+    xs = edges[edge_ids, 0] + t * (edges[edge_ids, 2] - edges[edge_ids, 0])
+    ys = edges[edge_ids, 1] + t * (edges[edge_ids, 3] - edges[edge_ids, 1])
+    owners = np.searchsorted(edge_offsets, edge_ids, side="right") - 1
+    columns = ((xs - origin_x) // cell_size).astype(np.int64)
+    rows = ((ys - origin_y) // cell_size).astype(np.int64)
+
+    pairs = []
+    for d_row in (-1, 0, 1):
+        for d_column in (-1, 0, 1):
+            r, c = rows + d_row, columns + d_column
+            valid = (r >= 0) & (r < ny) & (c >= 0) & (c < nx)
+            pairs.append(np.stack([r[valid] * nx + c[valid], owners[valid]], axis=1))
+    pairs = np.concatenate(pairs)
+    boundary_cells = np.unique(pairs[:, 0])
+    center_owners = cell_owner[boundary_cells]
+    has_owner = center_owners >= 0
+    pairs = np.concatenate([pairs, np.stack([boundary_cells[has_owner], center_owners[has_owner]], axis=1)])
+    pairs = np.unique(pairs, axis=0)
+    cell_owner[boundary_cells] = -2
+
+    cell_offsets = np.zeros(nx * ny + 1, dtype=np.int64)
+    np.add.at(cell_offsets, pairs[:, 0] + 1, 1)
+    cell_offsets = np.cumsum(cell_offsets)
+
+    meta = {
+        "regions": regions,
+        "grid": {"origin_x": origin_x, "origin_y": origin_y, "cell_size": cell_size, "nx": nx, "ny": ny},
+        "source": source,
+    }
+    write_arrays(path, {
+        "edges": edges,
+        "edge_offsets": edge_offsets,
+        "cell_owner": cell_owner,
+        "cell_offsets": cell_offsets,
+        "cell_polygons": pairs[:, 1].astype(np.int32),
+    }, meta)
+    return len(regions)
+
+
+class BoundaryIndex:
+    """
+    Read-only view of a boundary index file.
+    """
+
+    def __init__(self, path=DEFAULT_BOUNDARY_INDEX_PATH):
+        arrays, meta = open_arrays(path)
+        self.path = path
+        self.edges = arrays["edges"]
+        self.edge_offsets = arrays["edge_offsets"]
+        self.cell_owner = arrays["cell_owner"]
+        self.cell_offsets = arrays["cell_offsets"]
+        self.cell_polygons = arrays["cell_polygons"]
+        self.regions = [tuple(region) for region in meta["regions"]]
+        grid = meta["grid"]
+        self.origin_x, self.origin_y = grid["origin_x"], grid["origin_y"]
+        self.cell_size, self.nx, self.ny = grid["cell_size"], grid["nx"], grid["ny"]
+        # Region columns as object arrays with a trailing None, so -1 maps to None
+        self._columns = [np.array(list(column) + [None], dtype=object) for column in zip(*self.regions)]
+
+    def _polygon_edges(self, polygon):
+        return self.edges[self.edge_offsets[polygon]:self.edge_offsets[polygon + 1]]
+
+    def polygon_at(self, latitude, longitude):
+        """
+        Returns the index of the polygon containing the point, or -1.
+        """
+        column = int((longitude - self.origin_x) // self.cell_size)
+        row = int((latitude - self.origin_y) // self.cell_size)
+        if not (0 <= column < self.nx and 0 <= row < self.ny):
+            return -1
+        cell = row * self.nx + column
+        owner = int(self.cell_owner[cell])
+        if owner != -2:
+            return owner
+        for polygon in self.cell_polygons[self.cell_offsets[cell]:self.cell_offsets[cell + 1]]:
+            if points_in_polygon(self._polygon_edges(polygon), [longitude], [latitude])[0]:
+                return int(polygon)
+        return -1
+
+    def locate(self, latitude, longitude):
+        """
+        Returns {"department", "municipality", "distributor"} for a point, or
+        None if it is outside every polygon.
+        """
+        polygon = self.polygon_at(latitude, longitude)
+        if polygon < 0:
+            return None
+        return dict(zip(("department", "municipality", "distributor"), self.regions[polygon]))
+
+    def polygons_at(self, latitudes, longitudes):
+        """
+        Vectorized polygon_at(): returns an int array of polygon indices (-1 outside).
+        """
+        ys = np.asarray(latitudes, dtype=float)
+        xs = np.asarray(longitudes, dtype=float)
+        result = np.full(len(xs), -1, dtype=np.int64)
+        with np.errstate(invalid="ignore"):
+            columns = np.floor((xs - self.origin_x) / self.cell_size)
+            rows = np.floor((ys - self.origin_y) / self.cell_size)
+        on_grid = (columns >= 0) & (columns < self.nx) & (rows >= 0) & (rows < self.ny)
+        points = np.flatnonzero(on_grid)
+        cells = rows[points].astype(np.int64) * self.nx + columns[points].astype(np.int64)
+        owners = self.cell_owner[cells]
+        result[points] = np.where(owners == -2, -1, owners)
+
+        # Boundary cells: test each (point, candidate polygon) pair, grouped by polygon
+        boundary = owners == -2
+        points, cells = points[boundary], cells[boundary]
+        counts = self.cell_offsets[cells + 1] - self.cell_offsets[cells]
+        pair_points = np.repeat(points, counts)
+        starts = np.repeat(self.cell_offsets[cells] - np.cumsum(counts) + counts, counts)
+        pair_polygons = self.cell_polygons[starts + np.arange(len(pair_points))]
+        order = np.argsort(pair_polygons, kind="stable")
+        pair_points, pair_polygons = pair_points[order], pair_polygons[order]
+        splits = np.flatnonzero(np.diff(pair_polygons)) + 1
+        for group_points, group_polygons in zip(np.split(pair_points, splits), np.split(pair_polygons, splits)):
+            if len(group_points) == 0:
+                continue
+            polygon = group_polygons[0]
+            inside = points_in_polygon(self._polygon_edges(polygon), xs[group_points], ys[group_points])
+            hits = group_points[inside]
+            result[hits[result[hits] < 0]] = polygon
+        return result
+
+    def locate_many(self, latitudes, longitudes):
+        """
+        Vectorized locate(): returns a dictionary of object arrays
+        (department, municipality, distributor) with None for points outside
+        every polygon.
+        """
+        polygons = self.polygons_at(latitudes, longitudes)
+        return {
+            name: column[polygons]
+            for name, column in zip(("department", "municipality", "distributor"), self._columns)
+        }
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_boundary_index(path=DEFAULT_BOUNDARY_INDEX_PATH):
+    """
+    Returns the BoundaryIndex for path, or None if the file is missing or invalid.
+    """
+    try:
+        with _indexes_lock:
+            index = _indexes.get(path)
+            if index is None:
+                index = _indexes[path] = BoundaryIndex(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    return index
@@ -1,4 +1,11 @@
+import hashlib
 import json
+import os
+import threading
+from types import MappingProxyType
+
+from logic.utils.irradiance_raster import DEFAULT_RASTER_PATH, get_irradiance_raster
+from logic.utils.tmy_dataset import DEFAULT_TMY_PATH, get_tmy_dataset
 
 def load_json(filepath):
     """
@@ -7,14 +14,216 @@ def load_json(filepath):
     with open(filepath, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+# --- SHARED DATA STORE ---
+
+def _freeze(value):
+    """
+    Recursively converts dicts and lists into read-only mappings and tuples.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class _TrackedJsonFile:
+    """
+    A JSON file that is parsed once and re-parsed only when it changes on disk.
+    A changed mtime triggers a content hash check, so touching a file without
+    editing it does not cause a reload.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.stat_signature = None
+        self.content_hash = None
+        self.data = None
+
+    def refresh(self):
+        """
+        Reloads the file if needed. Returns True when the parsed data changed.
+        """
+        stat = os.stat(self.filepath)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self.stat_signature:
+            return False
+
+        with open(self.filepath, 'rb') as f:
+            raw = f.read()
+        content_hash = hashlib.sha256(raw).hexdigest()
+        self.stat_signature = signature
+        if content_hash == self.content_hash:
+            return False
+
+        self.data = json.loads(raw.decode('utf-8'))
+        self.content_hash = content_hash
+        return True
+
+
+class DataStore:
+    """
+    Immutable in-memory view of the pricing and irradiance files.
+    Tariffs are indexed by (distributor, rate_type, department) and irradiance
+    by department. Every accessor checks the files' signatures and rebuilds the
+    indexes only when a file actually changed. The optional irradiance raster
+    and TMY dataset give site-specific values wherever they have coverage.
+    """
+
+    def __init__(self, pricing_path='data/pricing.json', irradiance_path='data/irradiance_monthly.json',
+                 raster_path=None, tmy_path=None):
+        self._pricing_file = _TrackedJsonFile(pricing_path)
+        self._irradiance_file = _TrackedJsonFile(irradiance_path)
+        # The raster and TMY files live next to the irradiance file unless given explicitly
+        directory = os.path.dirname(irradiance_path)
+        self._raster_path = raster_path or os.path.join(directory, os.path.basename(DEFAULT_RASTER_PATH))
+        self._tmy_path = tmy_path or os.path.join(directory, os.path.basename(DEFAULT_TMY_PATH))
+        self._lock = threading.Lock()
+        self._pricing = MappingProxyType({})
+        self._tariffs = MappingProxyType({})
+        self._irradiance = MappingProxyType({})
+
+    def _sync_pricing(self):
+        with self._lock:
+            if self._pricing_file.refresh():
+                self._pricing = _freeze(self._pricing_file.data)
+                self._tariffs = MappingProxyType({
+                    (distributor, rate_type, department): entry
+                    for distributor, rates in self._pricing.items()
+                    for rate_type, departments in rates.items()
+                    for department, entry in departments.items()
+                })
+
+    def _sync_irradiance(self):
+        with self._lock:
+            if self._irradiance_file.refresh():
+                self._irradiance = _freeze(self._irradiance_file.data)
+
+    @property
+    def version(self):
+        """
+        Content hashes of the pricing and irradiance files plus the raster and
+        TMY signatures. Changes whenever any of them does.
+        """
+        self._sync_pricing()
+        self._sync_irradiance()
+        raster, tmy = self.raster, self.tmy
+        return (
+            self._pricing_file.content_hash,
+            self._irradiance_file.content_hash,
+            raster.signature if raster is not None else None,
+            tmy.signature if tmy is not None else None,
+        )
+
+    @property
+    def pricing(self):
+        """
+        Read-only nested pricing data: distributor -> rate_type -> department -> entry.
+        """
+        self._sync_pricing()
+        return self._pricing
+
+    @property
+    def tariffs(self):
+        """
+        Read-only index of pricing entries keyed by (distributor, rate_type, department).
+        """
+        self._sync_pricing()
+        return self._tariffs
+
+    @property
+    def irradiance(self):
+        """
+        Read-only mapping of department -> tuple of 12 monthly irradiance values.
+        """
+        self._sync_irradiance()
+        return self._irradiance
+
+    @property
+    def raster(self):
+        """
+        The IrradianceRaster, or None when there is no raster file.
+        """
+        return get_irradiance_raster(self._raster_path)
+
+    @property
+    def tmy(self):
+        """
+        The TMYDataset, or None when there is no TMY file.
+        """
+        return get_tmy_dataset(self._tmy_path)
+
+    def tariff(self, distributor, rate_type, department):
+        """
+        Returns the pricing entry for the given key, or None if it does not exist.
+        """
+        return self.tariffs.get((distributor, rate_type, department))
+
+    def monthly_irradiance(self, department):
+        """
+        Returns the 12 monthly irradiance values for a department, or None.
+        """
+        return self.irradiance.get(department)
+
+    def site_irradiance(self, department, latitude=None, longitude=None):
+        """
+        Returns 12 monthly irradiance values for a site, interpolated from the
+        raster when coordinates are given and covered, otherwise the
+        department's values. Returns None when neither is available.
+        """
+        if latitude is not None and longitude is not None and self.raster is not None:
+            values = self.raster.monthly(latitude, longitude)
+            if values is not None:
+                return tuple(values)
+        return self.monthly_irradiance(department)
+
+    def tmy_site(self, latitude=None, longitude=None):
+        """
+        Returns the nearest TMY site (see TMYDataset.site_at) for coordinates,
+        or None without coordinates, dataset or a site close enough.
+        """
+        if latitude is None or longitude is None or self.tmy is None:
+            return None
+        return self.tmy.site_at(latitude, longitude)
+
+    def distributors(self):
+        return list(self.pricing.keys())
+
+    def rate_types(self, distributor):
+        return list(self.pricing.get(distributor, {}).keys())
+
+    def departments(self):
+        return list(self.irradiance.keys())
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(pricing_path='data/pricing.json', irradiance_path='data/irradiance_monthly.json'):
+    """
+    Returns the process-wide DataStore for the given pair of files.
+    Relative paths are resolved against the working directory on first use.
+    """
+    store = _stores.get((pricing_path, irradiance_path))
+    if store is not None:
+        return store
+
+    resolved = (os.path.abspath(pricing_path), os.path.abspath(irradiance_path))
+    with _stores_lock:
+        store = _stores.get(resolved)
+        if store is None:
+            store = _stores[resolved] = DataStore(*resolved)
+        _stores[(pricing_path, irradiance_path)] = store
+        return store
+
 # --- IRRADIANCE DATA ---
 
 def get_monthly_irradiance(department, filepath='data/irradiance_monthly.json'):
     """
     Returns a list of 12 monthly irradiance values for the given department.
     """
-    data = load_json(filepath)
-    return data.get(department)
+    values = get_store(irradiance_path=filepath).monthly_irradiance(department)
+    return list(values) if values is not None else None
 
 # --- PRICING DATA ---
 
@@ -22,18 +231,13 @@ def get_price_per_kwh(distributor, rate_type, department, filepath='data/pricing
     """
     Returns the price per kWh for the given location, distributor, and rate type.
     """
-    data = load_json(filepath)
-    try:
-        return data[distributor][rate_type][department]["pricePerKwh"]
-    except KeyError:
+    entry = get_full_pricing_data(distributor, rate_type, department, filepath)
+    if entry is None:
         return None
+    return entry.get("pricePerKwh")
 
 def get_full_pricing_data(distributor, rate_type, department, filepath='data/pricing.json'):
     """
     Returns full pricing information: pricePerKwh, fixedCharge, municipalityFee.
     """
-    data = load_json(filepath)
-    try:
-        return data[distributor][rate_type][department]
-    except KeyError:
-        return None
+    return get_store(pricing_path=filepath).tariff(distributor, rate_type, department)
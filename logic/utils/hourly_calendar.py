@@ -0,0 +1,35 @@
+# logic/utils/hourly_calendar.py
+
+import datetime
+
+import numpy as np
+from config.constants import DAYS_PER_MONTH
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+# Index arrays for the 8760 hours of a non-leap year, in local standard time
+DAY_OF_YEAR = _read_only(np.repeat(np.arange(1, 366), 24))
+HOUR_OF_DAY = _read_only(np.tile(np.arange(24), 365))
+MONTH_OF_HOUR = _read_only(np.repeat(np.arange(12), np.asarray(DAYS_PER_MONTH) * 24))
+MONTH_START_HOUR = _read_only(np.concatenate([[0], np.cumsum(DAYS_PER_MONTH)[:-1]]) * 24)
+
+def day_of_week(year=2025):
+    """
+    Returns the weekday (0 = Monday) of every hour, for a year laid out as 365 days.
+    """
+    first = datetime.date(year, 1, 1).weekday()
+    return (first + DAY_OF_YEAR - 1) % 7
+
+def monthly_totals(hourly):
+    """
+    Sums an hourly array (..., 8760) into monthly totals (..., 12).
+    """
+    return np.add.reduceat(np.asarray(hourly, dtype=float), MONTH_START_HOUR, axis=-1)
+
+def monthly_maxima(hourly):
+    """
+    Returns the largest hourly value of each month of an hourly array (..., 8760) as (..., 12).
+    """
+    return np.maximum.reduceat(np.asarray(hourly, dtype=float), MONTH_START_HOUR, axis=-1)
@@ -0,0 +1,193 @@
+# logic/utils/instrumentation.py
+"""
+Lightweight timing instrumentation for calculators, pages and HTTP calls.
+
+Enabled with the environment variable PHOTONIC_METRICS=1. When disabled,
+instrumented() and instrument_class() return the original functions
+unchanged and timed() returns a shared no-op context manager, so the cost is
+a single flag check at import time.
+
+Every instrumented call records its latency in a histogram named after the
+call ("billing.generate_annual_cost_comparison", "page.solar_calculator",
+"http.amm", ...). Failed calls are also counted as errors. The metrics can
+be read with REGISTRY.snapshot(), rendered with REGISTRY.to_prometheus(), or
+written to the file in PHOTONIC_METRICS_FILE with write_prometheus().
+"""
+
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+ENABLED = os.environ.get("PHOTONIC_METRICS", "").lower() in ("1", "true", "yes")
+METRICS_FILE = os.environ.get("PHOTONIC_METRICS_FILE")
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Latency histogram with fixed buckets plus call, error and total counters.
+    """
+
+    __slots__ = ("bucket_counts", "count", "errors", "total")
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+
+    def observe(self, seconds, error=False):
+        self.bucket_counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if error:
+            self.errors += 1
+
+
+class MetricsRegistry:
+    """
+    Process-wide collection of histograms keyed by call name.
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, error=False):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds, error)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self):
+        """
+        Returns {name: {count, errors, total_s, mean_s, buckets}} where buckets
+        is a list of (upper bound, cumulative count) pairs ending with +Inf.
+        """
+        with self._lock:
+            items = [(name, list(h.bucket_counts), h.count, h.errors, h.total) for name, h in self._histograms.items()]
+
+        snapshot = {}
+        for name, bucket_counts, count, errors, total in sorted(items):
+            cumulative, buckets = 0, []
+            for bound, bucket_count in zip(BUCKETS + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                buckets.append((bound, cumulative))
+            snapshot[name] = {
+                "count": count,
+                "errors": errors,
+                "total_s": total,
+                "mean_s": total / count if count else 0.0,
+                "buckets": buckets,
+            }
+        return snapshot
+
+    def to_prometheus(self):
+        """
+        Renders the metrics in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP photonic_call_duration_seconds Latency of instrumented calls.",
+            "# TYPE photonic_call_duration_seconds histogram",
+        ]
+        for name, data in snapshot.items():
+            for bound, cumulative in data["buckets"]:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'photonic_call_duration_seconds_bucket{{name="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'photonic_call_duration_seconds_sum{{name="{name}"}} {data["total_s"]:.6f}')
+            lines.append(f'photonic_call_duration_seconds_count{{name="{name}"}} {data["count"]}')
+
+        lines += [
+            "# HELP photonic_call_errors_total Instrumented calls that raised an exception.",
+            "# TYPE photonic_call_errors_total counter",
+        ]
+        for name, data in snapshot.items():
+            lines.append(f'photonic_call_errors_total{{name="{name}"}} {data["errors"]}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+_NULL_TIMER = nullcontext()
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        REGISTRY.observe(self.name, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+def timed(name):
+    """
+    Context manager that records the duration of its block under name.
+    """
+    if not ENABLED:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def instrumented(name):
+    """
+    Decorator that records every call of the function under name.
+    Returns the function unchanged when instrumentation is disabled.
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_class(prefix):
+    """
+    Class decorator that instruments every public static method as
+    "<prefix>.<method name>".
+    """
+    def decorator(cls):
+        if not ENABLED:
+            return cls
+        for attribute, value in list(vars(cls).items()):
+            if isinstance(value, staticmethod) and not attribute.startswith("_"):
+                wrapped = instrumented(f"{prefix}.{attribute}")(value.__func__)
+                setattr(cls, attribute, staticmethod(wrapped))
+        return cls
+    return decorator
+
+
+def write_prometheus(path=None):
+    """
+    Atomically writes the Prometheus text to path (default PHOTONIC_METRICS_FILE).
+    Does nothing when instrumentation is disabled or no path is configured.
+    """
+    path = path or METRICS_FILE
+    if not ENABLED or not path:
+        return
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        f.write(REGISTRY.to_prometheus())
+    os.replace(temporary_path, path)
@@ -0,0 +1,186 @@
+# logic/utils/irradiance_raster.py
+"""
+Gridded monthly irradiance for the whole country.
+
+The raster is a memory-mappable array file (logic/utils/mmap_store.py) with
+one float32 array of shape (rows, columns, 12). Rows run south to north and
+columns west to east, and each cell holds the 12 monthly means for the cell
+center in kWh/m²/day. The 12 months of a cell are contiguous, so a bilinear
+lookup touches four short runs of the file. Opening the raster only parses
+its JSON header.
+
+build_irradiance_raster() converts a NASA POWER regional climatology CSV
+(PARAMETER, LAT, LON, JAN ... DEC columns after the "-END HEADER-" line).
+Any CSV with lat, lon and jan ... dec columns also works.
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from logic.utils.mmap_store import open_arrays, write_arrays
+
+DEFAULT_RASTER_PATH = "data/irradiance_raster.bin"
+DEFAULT_PARAMETER = "ALLSKY_SFC_SW_DWN"
+MONTH_COLUMNS = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+
+# NASA POWER marks missing values with -999
+_FILL_VALUE = -999
+
+
+def _read_power_csv(source):
+    import pandas as pd
+
+    with open(source, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    start = next((i + 1 for i, line in enumerate(lines) if line.strip() == "-END HEADER-"), 0)
+    frame = pd.read_csv(source, skiprows=start)
+    frame.columns = [str(column).strip().lower() for column in frame.columns]
+    return frame
+
+
+def build_irradiance_raster(source, path=DEFAULT_RASTER_PATH, parameter=DEFAULT_PARAMETER):
+    """
+    Converts a CSV of monthly irradiance on a regular lat/lon grid into a
+    raster file. Rows of other NASA POWER parameters are ignored. Missing
+    cells are stored as NaN.
+    Returns the (rows, columns) shape of the raster.
+    """
+    frame = _read_power_csv(source)
+    if "parameter" in frame.columns:
+        frame = frame[frame["parameter"].str.strip() == parameter]
+    missing = [column for column in ("lat", "lon", *MONTH_COLUMNS) if column not in frame.columns]
+    if missing or frame.empty:
+        raise ValueError(f"No gridded monthly irradiance in {source} (missing: {', '.join(missing) or 'rows'})")
+
+    lats = np.unique(frame["lat"].to_numpy(dtype=float))
+    lons = np.unique(frame["lon"].to_numpy(dtype=float))
+    lat_step = float(np.median(np.diff(lats))) if len(lats) > 1 else 1.0
+    lon_step = float(np.median(np.diff(lons))) if len(lons) > 1 else 1.0
+    rows = np.rint((frame["lat"].to_numpy(dtype=float) - lats[0]) / lat_step).astype(np.int64)
+    columns = np.rint((frame["lon"].to_numpy(dtype=float) - lons[0]) / lon_step).astype(np.int64)
+    if not np.allclose(lats[0] + rows * lat_step, frame["lat"]) or not np.allclose(lons[0] + columns * lon_step, frame["lon"]):
+        raise ValueError(f"Points in {source} are not on a regular grid")
+
+    monthly = frame[list(MONTH_COLUMNS)].to_numpy(dtype=float)
+    monthly[monthly <= _FILL_VALUE] = np.nan
+    values = np.full((rows.max() + 1, columns.max() + 1, 12), np.nan, dtype=np.float32)
+    values[rows, columns] = monthly
+
+    meta = {
+        "origin_lat": float(lats[0]),
+        "origin_lon": float(lons[0]),
+        "lat_step": lat_step,
+        "lon_step": lon_step,
+        "units": "kWh/m2/day",
+        "parameter": parameter,
+        "source": source,
+    }
+    write_arrays(path, {"values": values}, meta)
+    return values.shape[:2]
+
+
+class IrradianceRaster:
+    """
+    Read-only view of a raster file with bilinear interpolation between cell
+    centers. Points up to half a cell beyond the outermost centers take the
+    edge values. Missing (NaN) corners are left out of the weighted average.
+    """
+
+    def __init__(self, path=DEFAULT_RASTER_PATH):
+        arrays, meta = open_arrays(path)
+        self.path = path
+        # Plain ndarray view of the memory map: cheaper to slice than np.memmap
+        self.values = np.asarray(arrays["values"])
+        self.rows, self.columns = self.values.shape[:2]
+        self.origin_lat, self.origin_lon = meta["origin_lat"], meta["origin_lon"]
+        self.lat_step, self.lon_step = meta["lat_step"], meta["lon_step"]
+        self.signature = None
+
+    @staticmethod
+    def _axis(position, size):
+        """
+        Returns (lower index, weight of the upper one) for a fractional grid
+        position, or None when it is more than half a cell outside.
+        """
+        if not -0.5 <= position <= size - 0.5:
+            return None
+        position = min(max(position, 0.0), size - 1.0)
+        lower = min(int(position), max(size - 2, 0))
+        return lower, position - lower
+
+    def monthly(self, latitude, longitude):
+        """
+        Returns the 12 interpolated monthly values at a point as a list, or
+        None when the point is outside the raster or every corner is missing.
+        """
+        row = self._axis((latitude - self.origin_lat) / self.lat_step, self.rows)
+        column = self._axis((longitude - self.origin_lon) / self.lon_step, self.columns)
+        if row is None or column is None:
+            return None
+        (i, wy), (j, wx) = row, column
+
+        block = self.values[i:i + 2, j:j + 2]
+        weights = np.outer([1 - wy, wy][:block.shape[0]], [1 - wx, wx][:block.shape[1]]).ravel()
+        block = block.reshape(-1, 12)
+        valid = ~np.isnan(block[:, 0])
+        weight = weights[valid].sum()
+        if weight == 0:
+            return None
+        return (weights[valid] @ block[valid] / weight).tolist()
+
+    def monthly_many(self, latitudes, longitudes):
+        """
+        Vectorized monthly(): returns an (n, 12) array with NaN rows for
+        points outside the raster.
+        """
+        fy = (np.asarray(latitudes, dtype=float) - self.origin_lat) / self.lat_step
+        fx = (np.asarray(longitudes, dtype=float) - self.origin_lon) / self.lon_step
+        with np.errstate(invalid="ignore"):
+            inside = (fy >= -0.5) & (fy <= self.rows - 0.5) & (fx >= -0.5) & (fx <= self.columns - 0.5)
+        fy = np.clip(np.where(inside, fy, 0), 0, self.rows - 1)
+        fx = np.clip(np.where(inside, fx, 0), 0, self.columns - 1)
+        i = np.minimum(fy.astype(np.int64), max(self.rows - 2, 0))
+        j = np.minimum(fx.astype(np.int64), max(self.columns - 2, 0))
+        wy, wx = (fy - i)[:, np.newaxis], (fx - j)[:, np.newaxis]
+        i1, j1 = np.minimum(i + 1, self.rows - 1), np.minimum(j + 1, self.columns - 1)
+
+        total = np.zeros((len(fy), 12))
+        weight = np.zeros((len(fy), 1))
+        for rows, columns, w in ((i, j, (1 - wy) * (1 - wx)), (i, j1, (1 - wy) * wx), (i1, j, wy * (1 - wx)), (i1, j1, wy * wx)):
+            corner = self.values[rows, columns].astype(float)
+            valid = ~np.isnan(corner[:, :1])
+            total += np.where(valid, w * np.nan_to_num(corner), 0)
+            weight += np.where(valid, w, 0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = total / weight
+        result[~inside | (weight[:, 0] == 0)] = np.nan
+        return result
+
+
+_rasters = {}
+_rasters_lock = threading.Lock()
+
+def get_irradiance_raster(path=DEFAULT_RASTER_PATH):
+    """
+    Returns the IrradianceRaster for path, or None if the file is missing or
+    invalid. A rewritten file is picked up on the next call; the raster's
+    signature attribute identifies the file version it was opened from.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    signature = f"{stat.st_mtime_ns}-{stat.st_size}"
+    with _rasters_lock:
+        raster = _rasters.get(path)
+        if raster is None or raster.signature != signature:
+            try:
+                raster = IrradianceRaster(path)
+            except (OSError, ValueError, KeyError):
+                return None
+            raster.signature = signature
+            _rasters[path] = raster
+        return raster
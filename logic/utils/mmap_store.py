@@ -0,0 +1,85 @@
+# logic/utils/mmap_store.py
+"""
+Minimal container for named NumPy arrays that can be memory-mapped.
+
+Layout:
+    8 bytes   magic b"PHOTARR1"
+    8 bytes   header length (little-endian uint64)
+    header    UTF-8 JSON: {"arrays": {name: {"dtype", "shape", "offset"}}, "meta": {...}}
+    data      each array's raw C-order bytes, starting on a 64-byte boundary
+
+Opening a file only parses the small JSON header. The arrays are read-only
+views into a single memory map, so pages are read from disk only when
+touched and nothing is copied.
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"PHOTARR1"
+ALIGNMENT = 64
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_arrays(path, arrays, meta=None):
+    """
+    Writes a mapping of name -> array and a JSON-serializable meta dictionary.
+    The file is written to a temporary path and moved into place, so readers
+    never see a partial file.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+
+    # Offsets are relative to the start of the data section
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        offset = _aligned(offset)
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+
+    header = json.dumps({"arrays": layout, "meta": meta or {}}, ensure_ascii=False).encode("utf-8")
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(temporary_path, path)
+
+
+def open_arrays(path):
+    """
+    Memory-maps a file written by write_arrays().
+    Returns (arrays, meta) where arrays maps each name to a read-only view.
+    Raises ValueError if the file is not in this format.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not an array file: {path}")
+        (header_length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_length).decode("utf-8"))
+
+    data_start = _aligned(len(MAGIC) + 8 + header_length)
+    if os.path.getsize(path) == data_start:
+        buffer = np.zeros(0, dtype=np.uint8)
+    else:
+        buffer = np.memmap(path, dtype=np.uint8, mode="r", offset=data_start)
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        shape = tuple(spec["shape"])
+        count = int(np.prod(shape, dtype=np.int64))
+        start = spec["offset"]
+        arrays[name] = buffer[start:start + count * dtype.itemsize].view(dtype).reshape(shape)
+    return arrays, header["meta"]
@@ -2,6 +2,7 @@ from fpdf import FPDF
 from datetime import datetime
 from io import BytesIO
 import os
+from logic.utils.instrumentation import instrumented
 
 class PDFReport(FPDF):
     def __init__(self):
@@ -19,6 +20,7 @@ class PDFReport(FPDF):
         self.ln(4)
         self.set_text_color(0, 0, 0)
 
+    @instrumented("pdf.add_cover_page")
     def add_cover_page(self):
         self.add_page()
         logo_path = os.path.join(os.path.dirname(__file__), "logo_blue_yellow.png")
@@ -74,6 +76,7 @@ class PDFReport(FPDF):
             self.image(image_path, w=180)
             self.ln(10)
 
+    @instrumented("pdf.save_to_buffer")
     def save_to_buffer(self):
         buffer = BytesIO()
         self.output(buffer)
@@ -0,0 +1,131 @@
+# logic/utils/quote_cache.py
+"""
+Process-wide cache of finished quotes, shared by every Streamlit session.
+
+Inputs are normalized before lookup: monthly kWh values are rounded to the
+nearest multiple of kwh_precision, coordinates to COORDINATE_DECIMALS, names
+are stripped, the roof area is ignored unless the preference is "Optimal"
+and the roof azimuth is ignored unless a roof tilt is given. The quote is
+computed from the normalized inputs, so every input that maps to the same
+key gets exactly the same result.
+
+Entries are evicted least-recently-used when the cache is full and expire
+after ttl seconds. The whole cache is cleared when the pricing or irradiance
+files change (detected through the data store version).
+"""
+
+import threading
+
+from cachetools import TTLCache
+from config.constants import QUOTE_CACHE_KWH_PRECISION, QUOTE_CACHE_MAXSIZE, QUOTE_CACHE_TTL_SECONDS
+from logic.utils.data_loader import get_store
+
+# Coordinates are rounded to about 100 m
+COORDINATE_DECIMALS = 3
+
+
+class QuoteCache:
+    """
+    LRU + TTL cache of quote results keyed on normalized inputs.
+    Cached results are shared between callers and must not be modified.
+    """
+
+    def __init__(self, maxsize=QUOTE_CACHE_MAXSIZE, ttl=QUOTE_CACHE_TTL_SECONDS, kwh_precision=QUOTE_CACHE_KWH_PRECISION):
+        self.kwh_precision = kwh_precision
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._data_version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def normalize(self, kwh, department, distributor, rate_type, sizing_preference="Balanced",
+                  roof_area=0, latitude=None, longitude=None, roof_tilt=None, roof_azimuth=180):
+        """
+        Returns the normalized quote inputs as a dictionary.
+        """
+        precision = self.kwh_precision
+        if precision:
+            kwh = [round(float(value) / precision) * precision for value in kwh]
+        else:
+            kwh = [float(value) for value in kwh]
+        sizing_preference = sizing_preference.strip().capitalize()
+        return {
+            "kwh": kwh,
+            "department": department.strip(),
+            "distributor": distributor.strip(),
+            "rate_type": rate_type.strip(),
+            "sizing_preference": sizing_preference,
+            "roof_area": float(roof_area or 0) if sizing_preference == "Optimal" else 0,
+            "latitude": None if latitude is None else round(float(latitude), COORDINATE_DECIMALS),
+            "longitude": None if longitude is None else round(float(longitude), COORDINATE_DECIMALS),
+            "roof_tilt": None if roof_tilt is None else round(float(roof_tilt)),
+            "roof_azimuth": 180 if roof_tilt is None else round(float(roof_azimuth)) % 360,
+        }
+
+    @staticmethod
+    def make_key(normalized):
+        return tuple(tuple(value) if isinstance(value, list) else value for value in normalized.values())
+
+    def _check_data_version(self):
+        version = get_store().version
+        if version != self._data_version:
+            if self._data_version is not None:
+                self._cache.clear()
+                self.invalidations += 1
+            self._data_version = version
+
+    def get_or_compute(self, compute, **inputs):
+        """
+        Returns the cached quote for the inputs, or calls compute(**normalized
+        inputs) and caches its result. Exceptions are not cached.
+        """
+        normalized = self.normalize(**inputs)
+        key = self.make_key(normalized)
+        with self._lock:
+            self._check_data_version()
+            version = self._data_version
+            result = self._cache.get(key)
+            if result is not None:
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        # Computed outside the lock so slow quotes do not block other sessions
+        result = compute(**normalized)
+        with self._lock:
+            if self._data_version == version:
+                self._cache[key] = result
+        return result
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "ttl": self._cache.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+_quote_cache = None
+_quote_cache_lock = threading.Lock()
+
+def get_quote_cache():
+    """
+    Returns the process-wide QuoteCache.
+    """
+    global _quote_cache
+    if _quote_cache is None:
+        with _quote_cache_lock:
+            if _quote_cache is None:
+                _quote_cache = QuoteCache()
+    return _quote_cache
@@ -0,0 +1,211 @@
+# logic/utils/tariff_engine.py
+"""
+Hourly billing engine for flat, block and time-of-use tariffs.
+
+Tariffs come from the pricing entries in data/pricing.json. On top of the
+basic fields (fixedCharge, pricePerKwh, municipalityFee) an entry may define:
+
+    "energyBlocks": [{"upToKwh": 300, "pricePerKwh": 1.40},
+                     {"upToKwh": null, "pricePerKwh": 1.60}]
+        Monthly kWh priced by consumption block. Takes precedence over TOU.
+
+    "touPeriods": [{"name": "peak", "hours": [18, 19, 20, 21],
+                    "days": "weekdays", "months": [1, 2, 3], "pricePerKwh": 1.95}]
+        Hourly prices. "days" is "all" (default), "weekdays" or "weekends";
+        "months" (1-12) defaults to all. Hours not covered use pricePerKwh.
+
+    "demandCharge": 45.0
+        Charged per kW of the month's highest hourly import.
+
+    "exportCredit": {"mode": "net_metering", "carryover": true}
+        How exported energy is credited:
+          - "net_metering": exported kWh offset imported kWh of the same month
+            (default, matching BillingCalculator's monthly netting)
+          - "net_billing": exported kWh are credited at exportCredit.pricePerKwh
+          - "none": exports earn nothing
+        With carryover, unused credit rolls into the following month.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from config.constants import TAX_RATE
+from logic.utils.data_loader import get_store
+from logic.utils.hourly_calendar import HOUR_OF_DAY, MONTH_OF_HOUR, day_of_week, monthly_maxima, monthly_totals
+from logic.utils.instrumentation import instrument_class
+
+EXPORT_MODES = ("net_metering", "net_billing", "none")
+
+# Pricing entry fields that monthly billing ignores and only this engine applies
+HOURLY_TARIFF_FIELDS = ("energyBlocks", "touPeriods", "demandCharge", "exportCredit")
+
+def needs_hourly_billing(entry):
+    """
+    Returns True if a pricing entry defines any block, time-of-use, demand or export credit rule.
+    """
+    return entry is not None and any(entry.get(field) for field in HOURLY_TARIFF_FIELDS)
+
+class TariffSchedule:
+    """
+    A pricing entry compiled into arrays for vectorized billing.
+    """
+
+    def __init__(self, entry, year=2025):
+        self.fixed_charge = entry["fixedCharge"]
+        self.price_per_kwh = entry["pricePerKwh"]
+        self.municipality_fee = entry["municipalityFee"]
+        self.demand_charge = entry.get("demandCharge", 0.0)
+
+        blocks = entry.get("energyBlocks") or []
+        self.block_limits = np.array([np.inf if b.get("upToKwh") is None else b["upToKwh"] for b in blocks])
+        self.block_prices = np.array([b["pricePerKwh"] for b in blocks])
+
+        periods = entry.get("touPeriods") or []
+        self.is_time_of_use = bool(periods) and not blocks
+        self.hourly_price = self._build_hourly_price(periods, year)
+
+        export = entry.get("exportCredit") or {}
+        self.export_mode = export.get("mode", "net_metering")
+        if self.export_mode not in EXPORT_MODES:
+            raise ValueError(f"Unknown export credit mode: {self.export_mode}")
+        self.export_price = export.get("pricePerKwh", 0.0)
+        self.carryover = export.get("carryover", False)
+
+    def _build_hourly_price(self, periods, year):
+        price = np.full(HOUR_OF_DAY.shape, float(self.price_per_kwh))
+        weekend = day_of_week(year) >= 5
+        for period in periods:
+            mask = np.isin(HOUR_OF_DAY, period["hours"])
+            days = period.get("days", "all")
+            if days == "weekdays":
+                mask &= ~weekend
+            elif days == "weekends":
+                mask &= weekend
+            if period.get("months"):
+                mask &= np.isin(MONTH_OF_HOUR + 1, period["months"])
+            price[mask] = period["pricePerKwh"]
+        price.flags.writeable = False
+        return price
+
+    def energy_charge(self, monthly_kwh):
+        """
+        Energy charge for (n, 12) monthly kWh with the flat or block price.
+        """
+        if not self.block_limits.size:
+            return monthly_kwh * self.price_per_kwh
+        lower = np.concatenate([[0.0], self.block_limits[:-1]])
+        in_block = np.clip(monthly_kwh[..., np.newaxis] - lower, 0, self.block_limits - lower)
+        return in_block @ self.block_prices
+
+    def finalize(self, energy_and_demand):
+        """
+        Adds the fixed charge, municipal fee and tax, rounded to cents like BillingCalculator.
+        """
+        subtotal = self.fixed_charge + energy_and_demand
+        return np.round(subtotal * (1 + self.municipality_fee) * (1 + TAX_RATE), 2)
+
+
+@lru_cache(maxsize=256)
+def _compile_schedule(distributor, rate_type, department, version, year):
+    entry = get_store().tariff(distributor, rate_type, department)
+    return TariffSchedule(entry, year) if entry else None
+
+def get_schedule(distributor, rate_type, department, year=2025):
+    """
+    Returns the compiled TariffSchedule for a pricing key, or None if it does not exist.
+    Compiled schedules are cached until the pricing file changes.
+    """
+    return _compile_schedule(distributor, rate_type, department, get_store().version, year)
+
+
+@instrument_class("tariff")
+class TariffBillingEngine:
+    """
+    Bills hourly consumption and generation arrays for a full year.
+    """
+
+    @staticmethod
+    def bill_year(consumption_hourly, generation_hourly, schedule):
+        """
+        Bills (n, 8760) hourly consumption net of (n, 8760) hourly generation
+        (or None for no solar) under one TariffSchedule. Returns (n, 12) monthly bills.
+        """
+        consumption = np.atleast_2d(np.asarray(consumption_hourly, dtype=float))
+        if generation_hourly is None:
+            imports, exports = consumption, np.zeros_like(consumption)
+        else:
+            net = consumption - np.asarray(generation_hourly, dtype=float)
+            imports, exports = np.maximum(net, 0), np.maximum(-net, 0)
+
+        monthly_import = monthly_totals(imports)
+        monthly_export = monthly_totals(exports)
+        if schedule.is_time_of_use:
+            import_value = monthly_totals(imports * schedule.hourly_price)
+        else:
+            import_value = schedule.energy_charge(monthly_import)
+
+        energy = np.empty_like(monthly_import)
+        carry = np.zeros(monthly_import.shape[0])
+        for month in range(12):
+            if schedule.export_mode == "net_metering":
+                # Credit is kept in kWh and offsets this month's imports
+                available = monthly_export[:, month] + carry
+                billable = np.maximum(monthly_import[:, month] - available, 0)
+                remaining = np.maximum(available - monthly_import[:, month], 0)
+                if schedule.is_time_of_use:
+                    share = np.divide(billable, monthly_import[:, month], out=np.zeros_like(billable), where=monthly_import[:, month] > 0)
+                    energy[:, month] = import_value[:, month] * share
+                else:
+                    energy[:, month] = schedule.energy_charge(billable)
+            elif schedule.export_mode == "net_billing":
+                # Credit is kept in money and offsets this month's energy charge
+                available = monthly_export[:, month] * schedule.export_price + carry
+                energy[:, month] = np.maximum(import_value[:, month] - available, 0)
+                remaining = np.maximum(available - import_value[:, month], 0)
+            else:
+                energy[:, month] = import_value[:, month]
+                remaining = carry
+            carry = remaining if schedule.carryover else np.zeros_like(carry)
+
+        demand = monthly_maxima(imports) * schedule.demand_charge
+        return schedule.finalize(energy + demand)
+
+    @staticmethod
+    def compare(consumption_hourly, generation_hourly, distributor, rate_type, department, chunk_size=1024):
+        """
+        Annual cost without and with solar for (n, 8760) hourly arrays.
+        Tariff keys may be scalars or one per customer; customers are billed in
+        chunks of chunk_size rows to keep memory bounded.
+        Returns a dictionary of arrays with the same keys as
+        BillingCalculator.generate_annual_cost_comparison plus monthly bills.
+        """
+        consumption = np.atleast_2d(np.asarray(consumption_hourly, dtype=float))
+        generation = np.broadcast_to(np.asarray(generation_hourly, dtype=float), consumption.shape)
+        n = consumption.shape[0]
+
+        keys = [np.broadcast_to(np.asarray(key, dtype=object), (n,)) for key in (distributor, rate_type, department)]
+        groups = {}
+        for i, key in enumerate(zip(*keys)):
+            groups.setdefault(key, []).append(i)
+
+        without_solar = np.zeros((n, 12))
+        with_solar = np.zeros((n, 12))
+        for key, rows in groups.items():
+            schedule = get_schedule(*key)
+            if schedule is None:
+                continue
+            rows = np.asarray(rows)
+            for start in range(0, rows.size, chunk_size):
+                chunk = rows[start:start + chunk_size]
+                without_solar[chunk] = TariffBillingEngine.bill_year(consumption[chunk], None, schedule)
+                with_solar[chunk] = TariffBillingEngine.bill_year(consumption[chunk], generation[chunk], schedule)
+
+        annual_without = without_solar.sum(axis=1)
+        annual_with = with_solar.sum(axis=1)
+        return {
+            "monthly_bills_without_solar": without_solar,
+            "monthly_bills_with_solar": with_solar,
+            "annual_cost_without_solar": np.round(annual_without, 2),
+            "annual_cost_with_solar": np.round(annual_with, 2),
+            "annual_savings": np.round(annual_without - annual_with, 2),
+        }
@@ -0,0 +1,230 @@
+# logic/utils/tariff_history.py
+"""
+Local history of CNEE tariffs and the job that keeps data/pricing.json current.
+
+The history is a SQLite table keyed by (distributor, rate_type,
+effective_from). Its primary key is a B-tree, so tariff_at() finds the tariff
+in force on any date with one O(log n) index seek. Rate types use CNEE's
+names: "TS" (tarifa social) and "BTS" (baja tensión simple).
+
+sync_tariff_history() downloads the BTS/TS series of every distributor through
+CNEEClient and upserts them, so re-running only changes periods that are new
+or were revised. regenerate_pricing() then writes the tariff in force today
+into the matching pricing.json entries. Fixed charges and municipality fees
+are not published in these series, so they are kept as they are.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from datetime import date, datetime
+
+import pandas as pd
+
+from logic.clients.cnee_client import DISTRIBUIDORAS, get_cnee_client
+
+DEFAULT_HISTORY_PATH = "data/tariff_history.sqlite"
+
+# BTS_TS endpoint field -> CNEE rate type
+CNEE_SERIES_FIELDS = {"value1": "TS", "value2": "BTS"}
+
+# pricing.json rate type -> CNEE rate type whose price it follows
+PRICING_RATE_TYPES = {"BT": "TS", "BTS": "BTS"}
+
+MONTHS = {
+    "ene": 1, "jan": 1, "feb": 2, "mar": 3, "abr": 4, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "ago": 8, "aug": 8, "sep": 9, "set": 9, "oct": 10, "nov": 11, "dic": 12, "dec": 12,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tariffs (
+    distributor TEXT NOT NULL,
+    rate_type TEXT NOT NULL,
+    effective_from TEXT NOT NULL,
+    price_per_kwh REAL NOT NULL,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (distributor, rate_type, effective_from)
+) WITHOUT ROWID
+"""
+
+
+def parse_period(label):
+    """
+    Returns the first day of the period a CNEE label refers to, or None.
+    Accepts ISO dates ("2024-02-01", "2024-02"), "01/02/2024", "02/2024" and
+    month names in Spanish or English ("Feb-2024", "febrero 24", "Feb-Abr 2024").
+    """
+    text = unicodedata.normalize("NFKD", str(label)).encode("ascii", "ignore").decode().strip().lower()
+
+    match = re.match(r"^(\d{4})-(\d{1,2})(?:-(\d{1,2}))?", text)
+    if match:
+        return date(int(match.group(1)), int(match.group(2)), 1)
+    match = re.match(r"^(\d{1,2})/(\d{1,2})/(\d{4})", text)
+    if match:
+        return date(int(match.group(3)), int(match.group(2)), 1)
+    match = re.match(r"^(\d{1,2})[/-](\d{4})$", text)
+    if match:
+        return date(int(match.group(2)), int(match.group(1)), 1)
+
+    month = next((MONTHS[word[:3]] for word in re.findall(r"[a-z]+", text) if word[:3] in MONTHS), None)
+    years = re.findall(r"\d{4}", text) or [f"20{digits}" for digits in re.findall(r"\b\d{2}\b", text)[-1:]]
+    if month is None or not years:
+        return None
+    return date(int(years[0]), month, 1)
+
+
+def _to_float(value):
+    try:
+        return float(str(value).replace(",", "."))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_tariff_series(records):
+    """
+    Converts BTS_TS endpoint records into (rate_type, effective_from, price)
+    tuples, skipping rows whose period or price cannot be parsed.
+    """
+    rows = []
+    for record in records:
+        effective_from = parse_period(record.get("category"))
+        if effective_from is None:
+            continue
+        for field, rate_type in CNEE_SERIES_FIELDS.items():
+            price = _to_float(record.get(field))
+            if price is not None and price > 0:
+                rows.append((rate_type, effective_from, price))
+    return rows
+
+
+class TariffHistory:
+    """
+    SQLite-backed tariff history with as-of lookups.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def upsert(self, distributor, rows):
+        """
+        Stores (rate_type, effective_from, price) rows for a distributor.
+        Returns the number of rows that were new or changed.
+        """
+        fetched_at = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self._connection:
+            before = self._connection.total_changes
+            self._connection.executemany(
+                """
+                INSERT INTO tariffs (distributor, rate_type, effective_from, price_per_kwh, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (distributor, rate_type, effective_from) DO UPDATE SET
+                    price_per_kwh = excluded.price_per_kwh,
+                    fetched_at = excluded.fetched_at
+                WHERE tariffs.price_per_kwh != excluded.price_per_kwh
+                """,
+                [(distributor, rate_type, day.isoformat(), price, fetched_at) for rate_type, day, price in rows],
+            )
+            return self._connection.total_changes - before
+
+    def tariff_at(self, distributor, rate_type, day):
+        """
+        Returns {"effective_from": date, "price_per_kwh": float} for the tariff
+        in force on day, or None if the history starts later.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                """
+                SELECT effective_from, price_per_kwh FROM tariffs
+                WHERE distributor = ? AND rate_type = ? AND effective_from <= ?
+                ORDER BY effective_from DESC LIMIT 1
+                """,
+                (distributor, rate_type, day.isoformat()),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"effective_from": date.fromisoformat(row[0]), "price_per_kwh": row[1]}
+
+    def frame(self, distributors=None, rate_types=None):
+        """
+        Returns the history as a DataFrame sorted by distributor, rate type and
+        effective_from (a datetime64 column).
+        """
+        query = "SELECT distributor, rate_type, effective_from, price_per_kwh FROM tariffs"
+        conditions, parameters = [], []
+        for column, values in (("distributor", distributors), ("rate_type", rate_types)):
+            if values:
+                conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+                parameters.extend(values)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY distributor, rate_type, effective_from"
+        with self._lock:
+            frame = pd.read_sql_query(query, self._connection, params=parameters)
+        frame["effective_from"] = pd.to_datetime(frame["effective_from"])
+        return frame
+
+
+def sync_tariff_history(history, client=None, distributors=None):
+    """
+    Downloads the BTS/TS tariff series for each distributor (all of
+    DISTRIBUIDORAS by default) and upserts them into the history.
+    Returns {distributor: number of new or changed rows}; distributors whose
+    download failed are reported as None.
+    """
+    client = client or get_cnee_client()
+    names = distributors or list(DISTRIBUIDORAS)
+    futures = {name: client.submit((DISTRIBUIDORAS[name], "BTS_TS")) for name in names}
+
+    summary = {}
+    for name, future in futures.items():
+        try:
+            records = future.result()
+        except Exception:
+            summary[name] = None
+            continue
+        summary[name] = history.upsert(name, parse_tariff_series(records))
+    return summary
+
+
+def regenerate_pricing(history, pricing_path="data/pricing.json", as_of=None):
+    """
+    Sets pricePerKwh of every pricing.json entry to the CNEE tariff in force on
+    as_of (default today) and records its "effectiveFrom" date. Entries
+    without history are left unchanged. The file is replaced atomically and
+    only rewritten when something changed. Returns the number of updated entries.
+    """
+    as_of = as_of or date.today()
+    with open(pricing_path, "r", encoding="utf-8") as f:
+        pricing = json.load(f)
+
+    updated = 0
+    for distributor, rates in pricing.items():
+        for rate_type, departments in rates.items():
+            cnee_rate_type = PRICING_RATE_TYPES.get(rate_type)
+            tariff = cnee_rate_type and history.tariff_at(distributor, cnee_rate_type, as_of)
+            if not tariff:
+                continue
+            for entry in departments.values():
+                effective_from = tariff["effective_from"].isoformat()
+                if entry.get("pricePerKwh") != tariff["price_per_kwh"] or entry.get("effectiveFrom") != effective_from:
+                    entry["pricePerKwh"] = tariff["price_per_kwh"]
+                    entry["effectiveFrom"] = effective_from
+                    updated += 1
+
+    if updated:
+        temporary_path = f"{pricing_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(pricing, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        os.replace(temporary_path, pricing_path)
+    return updated
@@ -0,0 +1,233 @@
+# logic/utils/tmy_dataset.py
+"""
+Typical meteorological year (TMY) weather for many sites in one file.
+
+The dataset is a memory-mappable array file (logic/utils/mmap_store.py):
+
+    latitude, longitude, elevation   (sites,) site index
+    ghi, dni, dhi                    (sites, 8760) irradiance in W/m²
+    temp_air, wind_speed             (sites, 8760) °C and m/s
+
+Each variable is stored as its own column block, and one site's year is a
+contiguous row inside it. site() returns read-only views into the memory map,
+so only the pages of the requested site and variables are read from disk.
+Hours follow logic/utils/hourly_calendar.py: a 365-day year in local
+standard time (UTC_OFFSET_HOURS).
+
+build_tmy_dataset() converts PVGIS TMY CSV exports (times in UTC) and NSRDB
+PSM3 TMY CSV downloads (local standard time of the site's time zone).
+"""
+
+import os
+import re
+import threading
+
+import numpy as np
+
+from config.constants import HOURS_PER_YEAR, TMY_MAX_SITE_DISTANCE_KM, UTC_OFFSET_HOURS
+from logic.utils.mmap_store import open_arrays, write_arrays
+
+DEFAULT_TMY_PATH = "data/tmy.bin"
+TMY_VARIABLES = ("ghi", "dni", "dhi", "temp_air", "wind_speed")
+EARTH_RADIUS_KM = 6371.0
+
+# Source column -> TMY variable, per export format
+PVGIS_COLUMNS = {"G(h)": "ghi", "Gb(n)": "dni", "Gd(h)": "dhi", "T2m": "temp_air", "WS10m": "wind_speed"}
+NSRDB_COLUMNS = {"GHI": "ghi", "DNI": "dni", "DHI": "dhi", "Temperature": "temp_air", "Wind Speed": "wind_speed"}
+
+
+def _to_typical_year(months, days, hours, values, source_utc_offset):
+    """
+    Orders hourly rows by calendar position, drops February 29 and shifts them
+    from the source's time zone to local standard time.
+    """
+    months, days, hours = np.asarray(months), np.asarray(days), np.asarray(hours)
+    keep = ~((months == 2) & (days == 29))
+    order = np.lexsort((hours[keep], days[keep], months[keep]))
+    if len(order) != HOURS_PER_YEAR:
+        raise ValueError(f"Expected {HOURS_PER_YEAR} hourly rows, found {len(order)}")
+    shift = UTC_OFFSET_HOURS - source_utc_offset
+    return {name: np.roll(np.asarray(column, dtype=float)[keep][order], shift) for name, column in values.items()}
+
+
+def _read_pvgis(path, lines):
+    import pandas as pd
+
+    site = {}
+    for line in lines:
+        match = re.match(r"(Latitude|Longitude|Elevation)[^:]*:\s*(-?[\d.]+)", line)
+        if match:
+            site[match.group(1).lower()] = float(match.group(2))
+    header = next(i for i, line in enumerate(lines) if line.startswith("time(UTC)"))
+    rows = 0
+    while header + 1 + rows < len(lines) and re.match(r"\d{8}:\d{4}", lines[header + 1 + rows]):
+        rows += 1
+    frame = pd.read_csv(path, skiprows=header, nrows=rows)
+    stamps = frame["time(UTC)"].astype(str)
+    values = {variable: frame[column] for column, variable in PVGIS_COLUMNS.items()}
+    site.update(_to_typical_year(
+        stamps.str[4:6].astype(int), stamps.str[6:8].astype(int), stamps.str[9:11].astype(int), values, 0
+    ))
+    return site
+
+
+def _read_nsrdb(path, lines):
+    import pandas as pd
+
+    names = [name.strip() for name in lines[0].split(",")]
+    metadata = dict(zip(names, (value.strip() for value in lines[1].split(","))))
+    frame = pd.read_csv(path, skiprows=2)
+    values = {variable: frame[column] for column, variable in NSRDB_COLUMNS.items()}
+    site = {
+        "latitude": float(metadata["Latitude"]),
+        "longitude": float(metadata["Longitude"]),
+        "elevation": float(metadata.get("Elevation") or 0),
+    }
+    site.update(_to_typical_year(frame["Month"], frame["Day"], frame["Hour"], values, float(metadata["Time Zone"])))
+    return site
+
+
+def read_tmy_csv(path):
+    """
+    Parses one PVGIS or NSRDB TMY CSV export into a dictionary with latitude,
+    longitude, elevation and one 8760-value array per TMY variable.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    if any(line.startswith("time(UTC)") for line in lines):
+        site = _read_pvgis(path, lines)
+    elif lines and lines[0].startswith("Source") and "Latitude" in lines[0]:
+        site = _read_nsrdb(path, lines)
+    else:
+        raise ValueError(f"Unrecognized TMY export: {path}")
+    site.setdefault("elevation", 0.0)
+    return site
+
+
+def build_tmy_dataset(sources, path=DEFAULT_TMY_PATH):
+    """
+    Converts TMY CSV exports, one per site, into a dataset file.
+    Returns the number of sites written.
+    """
+    sites = [read_tmy_csv(source) for source in sources]
+    if not sites:
+        raise ValueError("No TMY files given")
+    arrays = {
+        name: np.array([site[name] for site in sites], dtype=float)
+        for name in ("latitude", "longitude", "elevation")
+    }
+    for variable in TMY_VARIABLES:
+        arrays[variable] = np.array([site[variable] for site in sites], dtype=np.float32)
+    meta = {
+        "names": [os.path.splitext(os.path.basename(source))[0] for source in sources],
+        "utc_offset": UTC_OFFSET_HOURS,
+    }
+    write_arrays(path, arrays, meta)
+    return len(sites)
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """
+    Great-circle distances in km from one point to arrays of points.
+    """
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class TMYDataset:
+    """
+    Read-only view of a TMY dataset file with a nearest-site index.
+    """
+
+    def __init__(self, path=DEFAULT_TMY_PATH):
+        arrays, meta = open_arrays(path)
+        self.path = path
+        self.names = meta["names"]
+        # The site index is small: keep plain copies for fast distance math
+        self.latitude = np.array(arrays["latitude"])
+        self.longitude = np.array(arrays["longitude"])
+        self.elevation = np.array(arrays["elevation"])
+        self._columns = {variable: np.asarray(arrays[variable]) for variable in TMY_VARIABLES}
+        self.signature = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def site(self, index, variables=TMY_VARIABLES):
+        """
+        Returns a site's metadata plus read-only views of its hourly variables.
+        Nothing is read from disk until the arrays are used.
+        """
+        site = {
+            "name": self.names[index],
+            "latitude": float(self.latitude[index]),
+            "longitude": float(self.longitude[index]),
+            "elevation": float(self.elevation[index]),
+        }
+        for variable in variables:
+            site[variable] = self._columns[variable][index]
+        return site
+
+    def nearest(self, latitude, longitude):
+        """
+        Returns (site index, distance in km) of the closest site.
+        """
+        distances = haversine_km(latitude, longitude, self.latitude, self.longitude)
+        index = int(np.argmin(distances))
+        return index, float(distances[index])
+
+    def nearest_many(self, latitudes, longitudes, chunk_size=4096):
+        """
+        Vectorized nearest(): returns arrays of site indices and distances.
+        """
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        indices = np.empty(len(latitudes), dtype=np.int64)
+        distances = np.empty(len(latitudes))
+        for start in range(0, len(latitudes), chunk_size):
+            stop = start + chunk_size
+            matrix = haversine_km(
+                latitudes[start:stop, np.newaxis], longitudes[start:stop, np.newaxis], self.latitude, self.longitude
+            )
+            indices[start:stop] = np.argmin(matrix, axis=1)
+            distances[start:stop] = matrix[np.arange(len(matrix)), indices[start:stop]]
+        return indices, distances
+
+    def site_at(self, latitude, longitude, max_distance_km=TMY_MAX_SITE_DISTANCE_KM):
+        """
+        Returns the nearest site (see site()) with its distance_km, or None if
+        no site is within max_distance_km.
+        """
+        index, distance = self.nearest(latitude, longitude)
+        if distance > max_distance_km:
+            return None
+        site = self.site(index)
+        site["distance_km"] = distance
+        return site
+
+
+_datasets = {}
+_datasets_lock = threading.Lock()
+
+def get_tmy_dataset(path=DEFAULT_TMY_PATH):
+    """
+    Returns the TMYDataset for path, or None if the file is missing or
+    invalid. A rewritten file is picked up on the next call.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    signature = f"{stat.st_mtime_ns}-{stat.st_size}"
+    with _datasets_lock:
+        dataset = _datasets.get(path)
+        if dataset is None or dataset.signature != signature:
+            try:
+                dataset = TMYDataset(path)
+            except (OSError, ValueError, KeyError):
+                return None
+            dataset.signature = signature
+            _datasets[path] = dataset
+        return dataset
@@ -1,129 +1,229 @@
 # main.py
 
-from logic.energy.consumption_calculator import ConsumptionCalculator
-from logic.energy.system_calculator import SystemCalculator
-from logic.financial.metrics_calculator import FinancialMetricsCalculator
+import argparse
+import sys
+import time
+from datetime import date
+
+from logic.clients.geocoder import get_geocoder
 from logic.generation.data_generator import DataGenerator
-from logic.utils.data_loader import get_monthly_irradiance, get_price_per_kwh
-from logic.utils.billing_calculator import BillingCalculator
-
-import matplotlib.pyplot as plt
-import numpy as np
-
-# === USER INPUTS ===
-monthly_kwh_input = [240, 250, 260, 255]  # kWh values
-department = "Guatemala"
-distributor = "EGGSA"
-rate_type = "BT"
-sizing_preference = "Balanced"
-
-# === LOAD EXTERNAL DATA ===
-monthly_irradiance = get_monthly_irradiance(department)
-if monthly_irradiance is None:
-    raise ValueError(f"Missing irradiance data for department: {department}")
-
-price_per_kwh = get_price_per_kwh(distributor, rate_type, department)
-if price_per_kwh is None:
-    raise ValueError(f"Missing price data for {distributor}/{rate_type}/{department}")
-
-# === STEP 1: CONSUMPTION CALCULATIONS ===
-avg_monthly_kwh = ConsumptionCalculator.calculate_average_monthly_consumption(monthly_kwh_input)
-annual_kwh = ConsumptionCalculator.calculate_annual_consumption(avg_monthly_kwh)
-monthly_consumption_sim = DataGenerator.simulate_monthly_distribution(annual_kwh)
-
-# === STEP 2: SYSTEM SIZING ===
-annual_irradiance = sum(monthly_irradiance) / 12
-system_kw = SystemCalculator.calculate_required_system_size_kw(avg_monthly_kwh, annual_irradiance)
-panels = SystemCalculator.calculate_number_of_panels(system_kw)
-installed_kw = SystemCalculator.calculate_installed_power_kw(panels)
-area_m2 = SystemCalculator.calculate_required_area_m2(panels)
-annual_generation = SystemCalculator.calculate_annual_generation_kwh(panels, annual_irradiance)
-coverage = SystemCalculator.calculate_coverage_percentage(annual_generation, avg_monthly_kwh, sizing_preference)
-monthly_generation_sim = DataGenerator.simulate_monthly_generation_from_irradiance(panels, monthly_irradiance)
-
-# === STEP 3: ENVIRONMENTAL IMPACT ===
-co2_saved = FinancialMetricsCalculator.calculate_co2_saved(annual_generation)
-trees = FinancialMetricsCalculator.calculate_tree_equivalents(co2_saved)
-
-# === STEP 4: FINANCIAL METRICS ===
-financial_data = BillingCalculator.generate_annual_cost_comparison(
-    monthly_consumption_sim,
-    monthly_generation_sim,
-    distributor,
-    rate_type,
-    department
-)
-
-annual_cost_without_solar = financial_data["annual_cost_without_solar"]
-annual_cost_with_solar = financial_data["annual_cost_with_solar"]
-annual_savings = financial_data["annual_savings"]
-
-investment = FinancialMetricsCalculator.calculate_investment_cost(installed_kw)
-payback = FinancialMetricsCalculator.calculate_payback_period(investment, annual_savings)
-roi = FinancialMetricsCalculator.calculate_roi(investment, annual_savings)
-cashflow = FinancialMetricsCalculator.calculate_cashflow_list(investment, annual_savings)
-irr = FinancialMetricsCalculator.calculate_irr(cashflow)
-cumulative_cashflow = FinancialMetricsCalculator.generate_cumulative_cashflow_list(investment, annual_savings)
-
-# === STEP 5: ANNUAL SIMULATIONS ===
-annual_consumption_series = DataGenerator.simulate_annual_data_series(annual_kwh)
-annual_generation_series = DataGenerator.simulate_annual_data_series(annual_generation)
-
-# === OUTPUTS ===
-print("==== SYSTEM SIZING ====")
-print(f"Avg. Monthly Consumption (kWh): {avg_monthly_kwh}")
-print(f"Annual Consumption (kWh): {annual_kwh}")
-print(f"System Size (kW): {system_kw}")
-print(f"Panels Required: {panels}")
-print(f"Installed Power (kW): {installed_kw}")
-print(f"Required Area (m²): {area_m2}")
-print(f"Annual Generation (kWh): {annual_generation}")
-print(f"Coverage (%): {coverage}")
-
-print("\n==== ENVIRONMENTAL IMPACT ====")
-print(f"CO2 Saved (kg/year): {co2_saved}")
-print(f"Tree Equivalents: {trees}")
-
-print("\n==== FINANCIAL ====")
-print(f"Annual Bill Without Solar (Q): {annual_cost_without_solar}")
-print(f"Annual Bill With Solar (Q): {annual_cost_with_solar}")
-print(f"Annual Savings (Q): {annual_savings}")
-print(f"Investment Cost (Q): {investment}")
-print(f"Payback Period (years): {payback}")
-print(f"ROI (%): {roi}")
-print(f"IRR (%): {irr}")
-
-print("\n==== SIMULATED DATA ====")
-print("Monthly Consumption (kWh):", monthly_consumption_sim)
-print("Monthly Generation (kWh):", monthly_generation_sim)
-print("Annual Consumption Series:", annual_consumption_series)
-print("Annual Generation Series:", annual_generation_series)
-
-# === PLOT 1: Monthly Energy Comparison ===
-months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
-          "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-x = np.arange(12)
-width = 0.35
-
-plt.figure(figsize=(10, 5))
-plt.bar(x - width/2, monthly_consumption_sim, width, label="Consumption (kWh)", color="skyblue")
-plt.bar(x + width/2, monthly_generation_sim, width, label="Generation (kWh)", color="orange")
-plt.title("Monthly Energy Consumption vs Generation")
-plt.xlabel("Month")
-plt.ylabel("Energy (kWh)")
-plt.xticks(x, months)
-plt.legend()
-plt.grid(True, axis="y", linestyle="--", alpha=0.6)
-plt.tight_layout()
-plt.show()
-
-# === PLOT 2: Cumulative Cash Flow ===
-plt.figure(figsize=(10, 5))
-plt.plot(cumulative_cashflow, marker='o', color='green')
-plt.title("Cumulative Cash Flow Over System Lifetime")
-plt.xlabel("Year")
-plt.ylabel("Cumulative Value (Q)")
-plt.xticks(range(len(cumulative_cashflow)))
-plt.grid(True)
-plt.tight_layout()
-plt.show()
+from logic.pipeline import RESULT_FIELDS, run_batch, run_quote
+from logic.quote_tables import DEFAULT_TABLE_PATH, build_quote_tables
+from logic.utils.amm_warehouse import DEFAULT_WAREHOUSE_DIR, AMMWarehouse
+from logic.utils.batch_io import geocode_leads, locate_leads, open_writer, read_leads
+from logic.utils.boundary_index import DEFAULT_BOUNDARY_INDEX_PATH, DEFAULT_CELL_SIZE, build_boundary_index, get_boundary_index
+from logic.utils.irradiance_raster import DEFAULT_PARAMETER, DEFAULT_RASTER_PATH, build_irradiance_raster
+from logic.utils.tariff_history import DEFAULT_HISTORY_PATH, TariffHistory, regenerate_pricing, sync_tariff_history
+from logic.utils.tmy_dataset import DEFAULT_TMY_PATH, build_tmy_dataset
+
+# === DEFAULT INPUTS ===
+DEFAULT_KWH = [240, 250, 260, 255]  # kWh values
+DEFAULT_DEPARTMENT = "Guatemala"
+DEFAULT_DISTRIBUTOR = "EGGSA"
+DEFAULT_RATE_TYPE = "BT"
+DEFAULT_SIZING_PREFERENCE = "Balanced"
+
+def print_quote(result):
+    """
+    Prints a single quote in the console report format.
+    """
+    print("==== SYSTEM SIZING ====")
+    print(f"Avg. Monthly Consumption (kWh): {result['avg_monthly_kwh']}")
+    print(f"Annual Consumption (kWh): {result['annual_kwh']}")
+    print(f"System Size (kW): {result['system_kw']}")
+    print(f"Panels Required: {result['panels']}")
+    print(f"Installed Power (kW): {result['installed_kw']}")
+    print(f"Required Area (m²): {result['area_m2']}")
+    print(f"Annual Generation (kWh): {result['annual_generation']}")
+    print(f"Coverage (%): {result['coverage']}")
+
+    print("\n==== ENVIRONMENTAL IMPACT ====")
+    print(f"CO2 Saved (kg/year): {result['co2_saved']}")
+    print(f"Tree Equivalents: {result['trees']}")
+
+    print("\n==== FINANCIAL ====")
+    print(f"Annual Bill Without Solar (Q): {result['annual_cost_without_solar']}")
+    print(f"Annual Bill With Solar (Q): {result['annual_cost_with_solar']}")
+    print(f"Annual Savings (Q): {result['annual_savings']}")
+    print(f"Investment Cost (Q): {result['investment']}")
+    print(f"Payback Period (years): {result['payback']}")
+    print(f"ROI (%): {result['roi']}")
+    print(f"IRR (%): {result['irr']}")
+
+    annual_consumption_series = DataGenerator.simulate_annual_data_series(result["annual_kwh"], seed=result["seed"])
+    annual_generation_series = DataGenerator.simulate_annual_data_series(result["annual_generation"], seed=result["seed"] + 1)
+
+    print("\n==== SIMULATED DATA ====")
+    print("Monthly Consumption (kWh):", result["monthly_consumption"])
+    print("Monthly Generation (kWh):", result["monthly_generation"])
+    print("Annual Consumption Series:", annual_consumption_series)
+    print("Annual Generation Series:", annual_generation_series)
+
+def plot_quote(result):
+    """
+    Shows the monthly energy and cumulative cash flow charts.
+    """
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    # === PLOT 1: Monthly Energy Comparison ===
+    months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+              "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+    x = np.arange(12)
+    width = 0.35
+
+    plt.figure(figsize=(10, 5))
+    plt.bar(x - width/2, result["monthly_consumption"], width, label="Consumption (kWh)", color="skyblue")
+    plt.bar(x + width/2, result["monthly_generation"], width, label="Generation (kWh)", color="orange")
+    plt.title("Monthly Energy Consumption vs Generation")
+    plt.xlabel("Month")
+    plt.ylabel("Energy (kWh)")
+    plt.xticks(x, months)
+    plt.legend()
+    plt.grid(True, axis="y", linestyle="--", alpha=0.6)
+    plt.tight_layout()
+    plt.show()
+
+    # === PLOT 2: Cumulative Cash Flow ===
+    cumulative_cashflow = result["cumulative_cashflow"]
+    plt.figure(figsize=(10, 5))
+    plt.plot(cumulative_cashflow, marker='o', color='green')
+    plt.title("Cumulative Cash Flow Over System Lifetime")
+    plt.xlabel("Year")
+    plt.ylabel("Cumulative Value (Q)")
+    plt.xticks(range(len(cumulative_cashflow)))
+    plt.grid(True)
+    plt.tight_layout()
+    plt.show()
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Solar quote calculator.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    quote = subparsers.add_parser("quote", help="Quote a single customer (default).")
+    quote.add_argument("--kwh", type=float, nargs="+", default=DEFAULT_KWH, help="Monthly kWh history.")
+    quote.add_argument("--department", default=DEFAULT_DEPARTMENT)
+    quote.add_argument("--distributor", default=DEFAULT_DISTRIBUTOR)
+    quote.add_argument("--rate-type", default=DEFAULT_RATE_TYPE)
+    quote.add_argument("--sizing-preference", default=DEFAULT_SIZING_PREFERENCE, choices=["Minimum", "Balanced", "Maximum"])
+    quote.add_argument("--plot", action="store_true", help="Show the charts after printing the results.")
+
+    batch = subparsers.add_parser("batch", help="Quote a CSV/JSONL file of leads.")
+    batch.add_argument("input", help="Leads file (.csv or .jsonl).")
+    batch.add_argument("output", help="Results file (.jsonl or .parquet).")
+    batch.add_argument("--workers", type=int, default=4, help="Worker processes (1 = run in-process).")
+    batch.add_argument("--chunk-size", type=int, default=1000, help="Leads per chunk sent to a worker.")
+    batch.add_argument("--geocode", action="store_true", help="Geocode the address column of leads without coordinates.")
+    batch.add_argument("--locate", action="store_true", help="Fill in department and distributor from lead coordinates.")
+
+    tables = subparsers.add_parser("build-tables", help="Precompute the quote lookup tables.")
+    tables.add_argument("--output", default=DEFAULT_TABLE_PATH, help="Table file to write.")
+    tables.add_argument("--kwh-min", type=float, default=50, help="Smallest average monthly kWh in the grid.")
+    tables.add_argument("--kwh-max", type=float, default=5000, help="Largest average monthly kWh in the grid.")
+    tables.add_argument("--kwh-step", type=float, default=10, help="Grid spacing in kWh.")
+
+    boundaries = subparsers.add_parser("build-boundaries", help="Compile a GeoJSON of municipality boundaries.")
+    boundaries.add_argument("source", help="GeoJSON FeatureCollection (e.g. a GADM level-2 export).")
+    boundaries.add_argument("--output", default=DEFAULT_BOUNDARY_INDEX_PATH, help="Index file to write.")
+    boundaries.add_argument("--department-field", default="NAME_1", help="Feature property with the department name.")
+    boundaries.add_argument("--municipality-field", default="NAME_2", help="Feature property with the municipality name.")
+    boundaries.add_argument("--cell-size", type=float, default=DEFAULT_CELL_SIZE, help="Grid cell size in degrees.")
+
+    irradiance = subparsers.add_parser("build-irradiance", help="Convert a NASA POWER grid CSV into the irradiance raster.")
+    irradiance.add_argument("source", help="Regional monthly climatology CSV.")
+    irradiance.add_argument("--output", default=DEFAULT_RASTER_PATH, help="Raster file to write.")
+    irradiance.add_argument("--parameter", default=DEFAULT_PARAMETER, help="NASA POWER parameter to use.")
+
+    tmy = subparsers.add_parser("build-tmy", help="Convert PVGIS/NSRDB TMY CSV exports into the TMY dataset.")
+    tmy.add_argument("sources", nargs="+", help="TMY CSV files, one per site.")
+    tmy.add_argument("--output", default=DEFAULT_TMY_PATH, help="Dataset file to write.")
+
+    backfill = subparsers.add_parser("amm-backfill", help="Download missing AMM days into the local warehouse.")
+    backfill.add_argument("--start", type=date.fromisoformat, required=True, help="First day (YYYY-MM-DD).")
+    backfill.add_argument("--end", type=date.fromisoformat, required=True, help="Last day (YYYY-MM-DD).")
+    backfill.add_argument("--categories", nargs="+", help="AMM categories (default: all).")
+    backfill.add_argument("--workers", type=int, default=4, help="Concurrent downloads.")
+    backfill.add_argument("--warehouse", default=DEFAULT_WAREHOUSE_DIR, help="Warehouse directory.")
+
+    tariffs = subparsers.add_parser("sync-tariffs", help="Update the CNEE tariff history and pricing.json.")
+    tariffs.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="Tariff history database.")
+    tariffs.add_argument("--pricing", default="data/pricing.json", help="Pricing file to regenerate.")
+    tariffs.add_argument("--no-pricing", action="store_true", help="Only update the history.")
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "batch":
+        index = get_boundary_index() if args.locate else None
+        if args.locate and index is None:
+            print(f"No boundary index at {DEFAULT_BOUNDARY_INDEX_PATH}; run build-boundaries first.")
+            return 1
+        start = time.perf_counter()
+        with open_writer(args.output, RESULT_FIELDS) as writer:
+            leads = read_leads(args.input)
+            if args.geocode:
+                leads = geocode_leads(leads, get_geocoder())
+            if index is not None:
+                leads = locate_leads(leads, index)
+            count = run_batch(leads, writer, workers=args.workers, chunk_size=args.chunk_size)
+        print(f"Quoted {count} leads in {time.perf_counter() - start:.1f}s -> {args.output}")
+        return 0
+
+    if args.command == "build-tables":
+        start = time.perf_counter()
+        count = build_quote_tables(args.output, args.kwh_min, args.kwh_max, args.kwh_step)
+        print(f"Built tables for {count} combinations in {time.perf_counter() - start:.1f}s -> {args.output}")
+        return 0
+
+    if args.command == "build-boundaries":
+        start = time.perf_counter()
+        count = build_boundary_index(
+            args.source, args.output, args.department_field, args.municipality_field, cell_size=args.cell_size
+        )
+        print(f"Indexed {count} boundaries in {time.perf_counter() - start:.1f}s -> {args.output}")
+        return 0
+
+    if args.command == "build-irradiance":
+        rows, columns = build_irradiance_raster(args.source, args.output, args.parameter)
+        print(f"Wrote a {rows}x{columns} irradiance raster -> {args.output}")
+        return 0
+
+    if args.command == "build-tmy":
+        count = build_tmy_dataset(args.sources, args.output)
+        print(f"Wrote {count} TMY sites -> {args.output}")
+        return 0
+
+    if args.command == "amm-backfill":
+        start = time.perf_counter()
+        count = AMMWarehouse(args.warehouse).backfill(args.start, args.end, args.categories, args.workers)
+        print(f"Ingested {count} category-days in {time.perf_counter() - start:.1f}s -> {args.warehouse}")
+        return 0
+
+    if args.command == "sync-tariffs":
+        history = TariffHistory(args.history)
+        summary = sync_tariff_history(history)
+        for distributor, changed in summary.items():
+            print(f"{distributor}: {'download failed' if changed is None else f'{changed} new or changed periods'}")
+        if not args.no_pricing:
+            print(f"Updated {regenerate_pricing(history, args.pricing)} pricing entries in {args.pricing}")
+        history.close()
+        return 0
+
+    if args.command is None:
+        args = build_parser().parse_args(["quote"] + (argv or []))
+
+    try:
+        result = run_quote(args.kwh, args.department, args.distributor, args.rate_type, args.sizing_preference)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print_quote(result)
+    if args.plot:
+        plot_quote(result)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
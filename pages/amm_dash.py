@@ -1,28 +1,91 @@
 # pages/amm_dash.py
 
 import streamlit as st
-import requests
 import pandas as pd
 import plotly.graph_objects as go
-from datetime import date
+from datetime import timedelta
+from logic.clients.amm_client import AMM_URLS, get_amm_client, local_today
+from logic.utils.amm_warehouse import AMMWarehouse
+from logic.utils.instrumentation import instrumented
 
-def render():
-    URLS = {
-        "Tecnología": "https://wl12.amm.org.gt/GraficaPW/graficaAreaScada?dt=",
-        "Tipo de Recurso": "https://wl12.amm.org.gt/GraficaPW/graficaTipoRecurso?dt=",
-        "Tipo de Combustible": "https://wl12.amm.org.gt/GraficaPW/graficaCombustible?dt="
-    }
+def render_range(opcion):
+    """
+    Shows daily energy per type over a date range, read from the local warehouse.
+    """
+    ayer = local_today() - timedelta(days=1)
+    rango = st.date_input(
+        "Selecciona el rango de fechas:",
+        value=(ayer - timedelta(days=29), ayer),
+        max_value=ayer,
+        format="DD/MM/YYYY"
+    )
+    if len(rango) != 2:
+        st.info("Selecciona la fecha inicial y la final.")
+        return
+    inicio, fin = rango
+
+    warehouse = AMMWarehouse()
+    faltantes = warehouse.missing(inicio, fin, [opcion])
+    if faltantes:
+        st.warning(f"Faltan {len(faltantes)} días de este rango en el almacén local.")
+        if st.button("Descargar días faltantes"):
+            barra = st.progress(0.0)
+            warehouse.backfill(
+                inicio, fin, [opcion], client=get_amm_client(),
+                progress=lambda hechos, total: barra.progress(hechos / total)
+            )
+            st.rerun()
 
+    df = warehouse.read(inicio, fin, [opcion], columns=["date", "tipo", "potencia"])
+    if df.empty:
+        st.info("No hay datos almacenados para este rango.")
+        return
+
+    # Hourly MW summed over each day gives MWh per day
+    diario = df.groupby(["date", "tipo"], as_index=False)["potencia"].sum()
+    df_demanda = diario[diario["tipo"] == "DEMANDA LOCAL PROG"]
+    df_otros = diario[diario["tipo"] != "DEMANDA LOCAL PROG"]
+
+    fig = go.Figure()
+    for tipo in df_otros["tipo"].unique():
+        sub_df = df_otros[df_otros["tipo"] == tipo]
+        fig.add_trace(go.Scatter(x=sub_df["date"], y=sub_df["potencia"], mode="lines", stackgroup="uno", name=tipo))
+    if not df_demanda.empty:
+        fig.add_trace(go.Scatter(
+            x=df_demanda["date"],
+            y=df_demanda["potencia"],
+            mode="lines",
+            name="DEMANDA LOCAL PROG",
+            line=dict(color="red", width=3, dash="dash")
+        ))
+
+    fig.update_layout(
+        title=f"Energía diaria ({opcion}) - {inicio.strftime('%d/%m/%Y')} a {fin.strftime('%d/%m/%Y')}",
+        xaxis_title="Fecha",
+        yaxis_title="Energía (MWh)",
+        hovermode="x unified",
+        legend_title="Tipo"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+@instrumented("page.amm_dash")
+def render():
     st.title("Dashboard de Generación Energética - Guatemala")
 
-    opcion = st.selectbox("Selecciona categoría de datos:", list(URLS.keys()))
-    fecha = st.date_input("Selecciona una fecha:", value=date.today(), format="DD/MM/YYYY")
+    opcion = st.selectbox("Selecciona categoría de datos:", list(AMM_URLS.keys()))
+    modo = st.radio("Modo:", ["Día", "Rango de fechas"], horizontal=True)
+    if modo == "Rango de fechas":
+        render_range(opcion)
+        return
+
+    fecha = st.date_input("Selecciona una fecha:", value=local_today(), format="DD/MM/YYYY")
     fecha_str = fecha.strftime("%d/%m/%Y")
 
-    url = URLS[opcion] + fecha_str
+    # Download every category for the date in parallel so switching is instant
+    client = get_amm_client()
+    client.prefetch(fecha)
     try:
-        response = requests.get(url)
-        data = response.json()
+        data = client.fetch(opcion, fecha)
     except Exception as e:
         st.error("Error al obtener los datos desde AMM.")
         st.stop()
@@ -1,46 +1,31 @@
 # pages/cnee_dash.py
 
 import streamlit as st
-import requests
 import pandas as pd
 import plotly.graph_objects as go
+from logic.clients.cnee_client import COST_DISTRIBUTOR_IDS, DISTRIBUIDORAS, get_cnee_client
+from logic.utils.instrumentation import instrumented
 
+@instrumented("page.cnee_dash")
 def render():
     st.title("📡 CNEE Dashboard")
     st.markdown("Visualización de tarifas históricas e integración de costos.")
 
-    # Mapping of distribuidoras
-    DISTRIBUIDORAS = {
-        "EGGSA": 1,
-        "DEOCSA": 2,
-        "DEORSA": 3,
-        "EMM GUALAN": 4,
-        "EMM GUASTATOYA": 5,
-        "EMM JALAPA": 6,
-        "EMM SAN PEDRO PINULA": 7,
-        "EMM JOYABAJ": 8,
-        "EMM PATULUL": 9,
-        "EMM RETALHULEU": 10,
-        "EMM SAN MARCOS": 11,
-        "EMM SAN PEDRO SAC": 12,
-        "EMM PTO BARRIOS": 13,
-        "EMM IXCAN": 14,
-        "EMM ZACAPA": 15,
-        "EMM QUETZALTENANGO": 16,
-        "EMM HUEHUETENANGO": 17,
-        "EMM YULXAK STA EULALIA": 18,
-        "EMM TECANA": 19,
-        
-    }
-
     # Dropdown
     selected_dist = st.selectbox("Selecciona la distribuidora", options=DISTRIBUIDORAS.keys())
     dist_id = DISTRIBUIDORAS[selected_dist]
 
+    # Selected distributor first, then warm the cache for all of them in the background
+    client = get_cnee_client()
+    client.prefetch(dist_id)
+    client.warm_all()
+    age = client.age(dist_id, "BTS_TS")
+    if age is not None:
+        st.caption(f"Datos en caché, actualizados hace {int(age // 60)} min.")
+
     # --- Graph 1: BTS vs TS histórico ---
     try:
-        url_1 = f"https://www.cnee.gob.gt/Calculadora/datos/db.BTS_TS.php?distribuidora={dist_id}"
-        data_1 = requests.get(url_1).json()
+        data_1 = client.fetch(dist_id, "BTS_TS")
         df_1 = pd.DataFrame(data_1)
 
         fig1 = go.Figure()
@@ -57,11 +42,10 @@ def render():
         st.error(f"Error al cargar la gráfica 1: {e}")
 
     # --- Only show cost integration plots for EEGSA, DEOCSA, DEORSA ---
-    if dist_id <= 3:
+    if dist_id in COST_DISTRIBUTOR_IDS:
         # --- Graph 2: Integración de Costos BTS ---
         try:
-            url_2 = f"https://www.cnee.gob.gt/Calculadora/datos/db.BTS.php?distribuidora={dist_id}"
-            data_2 = requests.get(url_2).json()
+            data_2 = client.fetch(dist_id, "BTS")
             df_2 = pd.DataFrame(data_2)
             df_2["Generacion"] = df_2["Generacion"].astype(float)
 
@@ -84,8 +68,7 @@ def render():
 
         # --- Graph 3: Integración de Costos TS (Stacked Bar) ---
         try:
-            url_3 = f"https://www.cnee.gob.gt/Calculadora/datos/db.TS.php?distribuidora={dist_id}"
-            data_3 = requests.get(url_3).json()
+            data_3 = client.fetch(dist_id, "TS")
             df_3 = pd.DataFrame(data_3)
             df_3["Generación"] = df_3["Generación"].astype(float)
 
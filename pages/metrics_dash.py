@@ -0,0 +1,63 @@
+# pages/metrics_dash.py
+
+import streamlit as st
+import pandas as pd
+from logic.utils.instrumentation import ENABLED, REGISTRY
+from logic.utils.quote_cache import get_quote_cache
+
+def render():
+    st.title("📈 Métricas de rendimiento")
+    st.markdown("Latencia y número de llamadas de cálculos, páginas y servicios externos.")
+
+    st.subheader("Caché de cotizaciones")
+    stats = get_quote_cache().stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Entradas", f"{stats['size']} / {stats['maxsize']}")
+    col2.metric("Aciertos", stats["hits"])
+    col3.metric("Fallos", stats["misses"])
+    col4.metric("Tasa de aciertos", f"{stats['hit_rate'] * 100:.1f}%")
+
+    st.subheader("Latencias")
+    if not ENABLED:
+        st.info("La instrumentación está desactivada. Inicia la app con `PHOTONIC_METRICS=1` para registrar métricas.")
+        return
+
+    snapshot = REGISTRY.snapshot()
+    if not snapshot:
+        st.info("Aún no hay llamadas registradas.")
+        return
+
+    df = pd.DataFrame([
+        {
+            "Nombre": name,
+            "Llamadas": data["count"],
+            "Errores": data["errors"],
+            "Total (s)": round(data["total_s"], 4),
+            "Promedio (ms)": round(data["mean_s"] * 1000, 3),
+        }
+        for name, data in snapshot.items()
+    ]).sort_values("Total (s)", ascending=False)
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    selected = st.selectbox("Histograma de latencia", options=list(snapshot.keys()))
+    buckets = snapshot[selected]["buckets"]
+    previous = 0
+    rows = []
+    for bound, cumulative in buckets:
+        label = "+Inf" if bound == float("inf") else f"≤ {bound * 1000:g} ms"
+        rows.append({"Rango": label, "Llamadas": cumulative - previous})
+        previous = cumulative
+    st.bar_chart(pd.DataFrame(rows).set_index("Rango"))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            label="📥 Descargar (Prometheus)",
+            data=REGISTRY.to_prometheus(),
+            file_name="metrics.prom",
+            mime="text/plain"
+        )
+    with col2:
+        if st.button("Reiniciar métricas"):
+            REGISTRY.reset()
+            st.rerun()
@@ -6,33 +6,32 @@ import pandas as pd
 import numpy as np
 import streamlit as st
 import tempfile
-import json
 
 from streamlit_folium import st_folium
 import folium
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
 
+from logic.clients.geocoder import GeocodingError, get_geocoder
 from logic.utils.pdf_report import PDFReport
 from io import BytesIO
-from logic.energy.consumption_calculator import ConsumptionCalculator
-from logic.energy.system_calculator import SystemCalculator
-from logic.financial.metrics_calculator import FinancialMetricsCalculator
+from logic.financial.risk_engine import MonteCarloRiskEngine
 from logic.generation.data_generator import DataGenerator
-from logic.utils.data_loader import get_monthly_irradiance, get_price_per_kwh
-from logic.utils.billing_calculator import BillingCalculator
-
-
-@st.cache_data
-def load_json(path):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-pricing_data = load_json("data/pricing.json")
-irradiance_monthly = load_json("data/irradiance_monthly.json")
-
-
+from logic.utils.boundary_index import get_boundary_index
+from logic.utils.data_loader import get_store
+from logic.quote_engine import QuoteEngine
+from logic.quote_tables import fast_quote
+from logic.utils.quote_cache import get_quote_cache
+from logic.utils.instrumentation import instrumented, timed
+
+# Roof directions offered in step 2 and their azimuth in degrees clockwise from north
+ROOF_DIRECTIONS = {
+    "South": 180, "South-West": 225, "West": 270, "North-West": 315,
+    "North": 0, "North-East": 45, "East": 90, "South-East": 135,
+}
+
+@instrumented("page.solar_calculator")
 def render():
+    store = get_store()
+
     if "step" not in st.session_state:
         st.session_state.step = 1
 
@@ -48,8 +47,8 @@ def render():
             with col3: kwh3 = st.number_input("Month 3 (kWh)", min_value=0, step=100)
             with col4: kwh4 = st.number_input("Month 4 (kWh)", min_value=0, step=100)
 
-            distributor = st.selectbox("Electricity Distributor", list(pricing_data.keys()))
-            tariff = st.selectbox("Tariff Type", list(pricing_data[distributor].keys()))
+            distributor = st.selectbox("Electricity Distributor", store.distributors())
+            tariff = st.selectbox("Tariff Type", store.rate_types(distributor))
 
             if st.form_submit_button("Next"):
                 st.session_state.kwh = [kwh1, kwh2, kwh3, kwh4]
@@ -63,8 +62,12 @@ def render():
         st.header("Step 2: Location and System Sizing Preference")
 
         with st.form("step2_form"):
-            department = st.selectbox("Department", list(irradiance_monthly.keys()))
-            sizing_pref = st.selectbox("Sizing Preference", ["Minimum", "Balanced", "Maximum"])
+            department = st.selectbox("Department", store.departments())
+            sizing_pref = st.selectbox("Sizing Preference", ["Minimum", "Balanced", "Maximum", "Optimal"])
+            roof_area = st.number_input("Available Roof Area (m²) - used by the Optimal preference", min_value=0.0, value=50.0, step=5.0)
+            knows_roof = st.checkbox("I know my roof's tilt and direction")
+            roof_tilt = st.slider("Roof Tilt (°) - 0 for a flat roof", min_value=0, max_value=60, value=15, step=5)
+            roof_direction = st.selectbox("Direction the Roof Faces", list(ROOF_DIRECTIONS))
 
             col1, col2 = st.columns([1, 3])
             with col1:
@@ -75,6 +78,9 @@ def render():
                 if st.form_submit_button("Next"):
                     st.session_state.department = department
                     st.session_state.sizing_pref = sizing_pref
+                    st.session_state.roof_area = roof_area
+                    st.session_state.roof_tilt = roof_tilt if knows_roof else None
+                    st.session_state.roof_azimuth = ROOF_DIRECTIONS[roof_direction]
                     st.session_state.step = 3
                     st.rerun()
 
@@ -82,6 +88,24 @@ def render():
         st.title("Solar Energy Calculator")
         st.header("Step 3: Personal Information")
 
+        # Instant preliminary estimate from the precomputed lookup tables
+        try:
+            estimate = fast_quote(
+                sum(st.session_state.kwh) / len(st.session_state.kwh),
+                st.session_state.department,
+                st.session_state.distributor,
+                st.session_state.tariff,
+                st.session_state.sizing_pref,
+            )
+            st.info(
+                f"Preliminary estimate: **{estimate['panels']} panels**, "
+                f"about **Q{estimate['annual_savings']:,.0f}** in annual savings."
+            )
+            if st.session_state.get("roof_tilt") is not None:
+                st.caption("The preliminary estimate assumes flat panels. Your roof's tilt and direction are applied once the location is set.")
+        except (ValueError, ZeroDivisionError):
+            pass
+
         with st.form("step3_form"):
             col1, col2 = st.columns(2)
             with col1:
@@ -140,16 +164,16 @@ def render():
                     except ValueError:
                         st.warning("Invalid latitude or longitude values.")
                 elif address:
-                    geolocator = Nominatim(user_agent="solar-calculator")
                     try:
-                        location = geolocator.geocode(address, timeout=10)
+                        with timed("http.geocode"):
+                            location = get_geocoder().geocode(address)
                         if location:
-                            st.session_state.pin_lat = location.latitude
-                            st.session_state.pin_lon = location.longitude
+                            st.session_state.pin_lat = location["latitude"]
+                            st.session_state.pin_lon = location["longitude"]
                             st.success("📍 Coordinates set from address.")
                         else:
                             st.warning("Address not found.")
-                    except (GeocoderTimedOut, GeocoderUnavailable) as e:
+                    except GeocodingError as e:
                         st.error(f"Geocoding error: {e}")
         
         st.text("If entered address by name and it didnt work try beeing as close as the example address.")
@@ -166,7 +190,8 @@ def render():
         )
         folium.Marker([lat, lon], popup="Selected Location").add_to(m)
         m.add_child(folium.LatLngPopup())
-        map_data = st_folium(m, width=700, height=500)
+        with timed("render.folium_map"):
+            map_data = st_folium(m, width=700, height=500)
 
         if map_data and map_data.get("last_clicked"):
             clicked = map_data["last_clicked"]
@@ -176,6 +201,13 @@ def render():
 
         st.markdown(f"**Current Coordinates:** `{st.session_state.pin_lat}`, `{st.session_state.pin_lon}`")
 
+        # Department, municipality and distributor under the pin
+        boundary_index = get_boundary_index()
+        located = boundary_index.locate(st.session_state.pin_lat, st.session_state.pin_lon) if boundary_index else None
+        if located:
+            place = ", ".join(part for part in (located["municipality"], located["department"]) if part)
+            st.markdown(f"**Location:** {place} — distributor {located['distributor'] or 'unknown'}")
+
         # Navigation form
         with st.form("nav_buttons_form"):
             col3, col4 = st.columns([1, 3])
@@ -204,6 +236,21 @@ def render():
                     "latitude": st.session_state.pin_lat,
                     "longitude": st.session_state.pin_lon,
                 })
+
+                # The pin decides the department and distributor used for irradiance
+                # and tariffs, but only when a tariff exists for them
+                st.session_state.location_warning = None
+                if located:
+                    st.session_state.location_info.update(located)
+                    department, distributor = located["department"], located["distributor"]
+                    if department in store.departments() and store.tariff(distributor, st.session_state.tariff, department):
+                        st.session_state.department = department
+                        st.session_state.distributor = distributor
+                    elif (department, distributor) != (st.session_state.department, st.session_state.distributor):
+                        st.session_state.location_warning = (
+                            f"No {st.session_state.tariff} tariff is available for {distributor} in {department}. "
+                            f"The quote uses your selection ({st.session_state.distributor}, {st.session_state.department}) instead."
+                        )
                 st.session_state.step = 5
                 st.rerun()
                 
@@ -212,6 +259,10 @@ def render():
     elif st.session_state.step == 5:
         st.title("Solar Energy Calculator")
         st.success("Calculation Complete")
+        if st.session_state.get("location_warning"):
+            st.warning(st.session_state.location_warning)
+        if st.session_state.get("roof_tilt") is not None and (st.session_state.get("pin_lat") is None or st.session_state.get("pin_lon") is None):
+            st.info("Your roof's tilt and direction need a location on the map, so flat panels are assumed.")
     
         # Load session values
         kwh_list = st.session_state.kwh
@@ -219,59 +270,51 @@ def render():
         rate_type = st.session_state.tariff
         dept = st.session_state.department
         pref = st.session_state.sizing_pref
-    
-        # --- Energy Calculations ---
-        avg_kwh = ConsumptionCalculator.calculate_average_monthly_consumption(kwh_list)
-        annual_kwh = ConsumptionCalculator.calculate_annual_consumption(avg_kwh)
-        monthly_kwh_sim = DataGenerator.simulate_monthly_distribution(annual_kwh)
-        monthly_irradiance = irradiance_monthly[dept]
-        annual_irradiance = sum(monthly_irradiance) / 12
-    
-        system_kw = SystemCalculator.calculate_required_system_size_kw(avg_kwh, annual_irradiance)
-        if pref.lower() == "minimum":
-            system_kw *= 0.8
-        elif pref.lower() == "maximum":
-            system_kw *= 1.2
-    
-        panels = SystemCalculator.calculate_number_of_panels(system_kw)
-        installed_kw = SystemCalculator.calculate_installed_power_kw(panels)
-        area = SystemCalculator.calculate_required_area_m2(panels)
-        annual_gen = SystemCalculator.calculate_annual_generation_kwh(panels, annual_irradiance)
-        coverage = SystemCalculator.calculate_coverage_percentage(annual_gen, avg_kwh, pref)
-        monthly_generation = DataGenerator.simulate_monthly_generation_from_irradiance(panels, monthly_irradiance)
-    
-        # --- Store Results Once ---
-        if "results" not in st.session_state:
-            financial = BillingCalculator.generate_annual_cost_comparison(
-                monthly_kwh_sim, monthly_generation, distributor, rate_type, dept
-            )
-            investment = FinancialMetricsCalculator.calculate_investment_cost(installed_kw)
-            payback = FinancialMetricsCalculator.calculate_payback_period(investment, financial["annual_savings"])
-            roi = FinancialMetricsCalculator.calculate_roi(investment, financial["annual_savings"])
-            irr = FinancialMetricsCalculator.calculate_irr(
-                FinancialMetricsCalculator.calculate_cashflow_list(investment, financial["annual_savings"])
-            )
-            co2 = FinancialMetricsCalculator.calculate_co2_saved(annual_gen)
-            trees = FinancialMetricsCalculator.calculate_tree_equivalents(co2)
-    
-            st.session_state.results = {
-                "financial": financial,
-                "investment": investment,
-                "payback": payback,
-                "roi": roi,
-                "irr": irr,
-                "co2": co2,
-                "trees": trees
-            }
-    
-        # Retrieve stored values
-        financial = st.session_state.results["financial"]
-        investment = st.session_state.results["investment"]
-        payback = st.session_state.results["payback"]
-        roi = st.session_state.results["roi"]
-        irr = st.session_state.results["irr"]
-        co2 = st.session_state.results["co2"]
-        trees = st.session_state.results["trees"]
+        lat = st.session_state.get("pin_lat")
+        lon = st.session_state.get("pin_lon")
+
+        # --- Quote: shared across sessions, otherwise only changed stages are recomputed ---
+        if "quote_engine" not in st.session_state:
+            st.session_state.quote_engine = QuoteEngine()
+        quote = get_quote_cache().get_or_compute(
+            st.session_state.quote_engine.run,
+            kwh=kwh_list,
+            department=dept,
+            distributor=distributor,
+            rate_type=rate_type,
+            sizing_preference=pref,
+            roof_area=st.session_state.get("roof_area", 0),
+            latitude=lat,
+            longitude=lon,
+            roof_tilt=st.session_state.get("roof_tilt"),
+            roof_azimuth=st.session_state.get("roof_azimuth", 180),
+        )
+        seed = quote["seed"]
+
+        # Energy results
+        avg_kwh = quote["avg_monthly_kwh"]
+        annual_kwh = quote["annual_kwh"]
+        monthly_kwh_sim = quote["monthly_consumption"]
+        optimum = quote["optimum"]
+        if pref.lower() == "optimal" and optimum is None:
+            st.warning("The roof area is too small for a single panel. Showing the Balanced size instead.")
+        system_kw = quote["system_kw"]
+        panels = quote["panels"]
+        area = quote["area_m2"]
+        annual_gen = quote["annual_generation"]
+        coverage = quote["coverage"]
+        monthly_generation = quote["monthly_generation"]
+        monthly_irradiance = quote["monthly_irradiance"]
+        orientation = quote["orientation"]
+
+        # Financial and environmental results
+        financial = quote["financial"]
+        investment = quote["investment"]
+        payback = quote["payback"]
+        roi = quote["roi"]
+        irr = quote["irr"]
+        co2 = quote["co2_saved"]
+        trees = quote["trees"]
     
         personal_info = st.session_state.get("personal_info", {})
     
@@ -301,6 +344,11 @@ def render():
             st.write(f"• Required Area (m²): **{area}**")
             st.write(f"• Annual Generation (kWh): **{annual_gen}**")
             st.write(f"• Coverage (%): **{coverage}%**")
+            if orientation:
+                st.write(f"• Best Panel Orientation: **{orientation['tilt']:.0f}° tilt, {orientation['azimuth']:.0f}° azimuth** ({orientation['annual_kwh_m2']:,.0f} kWh/m² per year)")
+                if orientation["roof_kwh_m2"] is not None:
+                    share = 100 * orientation["roof_kwh_m2"] / orientation["annual_kwh_m2"]
+                    st.write(f"• Your Roof Receives: **{share:.0f}%** of the best orientation's sunlight")
             st.divider()
             
             st.subheader("Financial & Environmental Results")
@@ -312,6 +360,24 @@ def render():
             st.write(f"• CO2 Saved (kg/year): **{co2}**")
             st.write(f"• Tree Equivalents: **{trees}**")
             st.divider()
+
+            with st.expander("🎲 Risk Analysis (Monte Carlo)"):
+                st.caption("10,000 scenarios varying irradiance, tariff escalation, panel degradation and consumption.")
+                risk = MonteCarloRiskEngine(n_scenarios=10000, seed=seed).run(
+                    kwh_list, dept, distributor, rate_type, pref, number_of_panels=panels
+                )
+                labels = {
+                    "annual_savings": "Annual Savings (Q)",
+                    "payback": "Payback Period (years)",
+                    "roi": "ROI (%)",
+                    "irr": "IRR (%)",
+                    "npv": "NPV (Q)",
+                }
+                risk_df = pd.DataFrame(
+                    [risk["percentiles"][metric] for metric in labels],
+                    index=list(labels.values())
+                )
+                st.table(risk_df)
             # --- Download PDF Report ---
             if st.button("📄 PDF Report"):
                 pdf = PDFReport()
@@ -357,6 +423,9 @@ def render():
         with tab2:
         
             st.info("Graphs will be added in the next step.")
+            weather_site = quote.get("weather_site")
+            if weather_site:
+                st.caption(f"Hourly generation uses typical-year weather from {weather_site['name']} ({weather_site['distance_km']:.1f} km away).")
             
             # Month ordering
             months_order = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
@@ -406,9 +475,8 @@ def render():
             # st.bar_chart(cashflow_df)
 
             # Changing color
-            cashflow = FinancialMetricsCalculator.calculate_cashflow_list(investment, financial["annual_savings"])
-            years = list(range(len(cashflow)))
-            cumulative = [sum(cashflow[:i+1]) for i in range(len(cashflow))]
+            cumulative = quote["cumulative_cashflow"]
+            years = list(range(len(cumulative)))
 
             colors = ["lightcoral" if val < 0 else "lightgreen" for val in cumulative]
 
@@ -434,7 +502,7 @@ def render():
             # Simulate annual data series for 25 years
             years = list(range(1, 31))
             annual_gen_series = DataGenerator.simulate_annual_generation_with_degradation(annual_gen, years=30)
-            annual_cons_series = DataGenerator.simulate_annual_data_series(annual_kwh, years=30, variation=0.04)
+            annual_cons_series = DataGenerator.simulate_annual_data_series(annual_kwh, years=30, variation=0.04, seed=seed)
 
             # Create the line chart
             fig = go.Figure()
@@ -467,6 +535,41 @@ def render():
             st.plotly_chart(fig, use_container_width=True)
             
                                 
+            if optimum is not None:
+                curve = optimum["curve"]
+                fig = go.Figure(data=[
+                    go.Scatter(x=curve["panels"], y=curve["npv"], mode="lines+markers", line=dict(color="#0B284C"))
+                ])
+                fig.add_vline(x=optimum["panels"], line_dash="dash", line_color="#FFBF41")
+                fig.update_layout(
+                    title="Net Present Value by Number of Panels",
+                    xaxis_title="Number of Panels",
+                    yaxis_title="NPV (Q)",
+                    height=400,
+                    showlegend=False
+                )
+                st.plotly_chart(fig, use_container_width=True)
+
+            if orientation:
+                fig = go.Figure(data=[
+                    go.Heatmap(
+                        x=orientation["azimuths"], y=orientation["tilts"], z=orientation["surface"],
+                        colorscale="YlOrBr", colorbar=dict(title="kWh/m²")
+                    )
+                ])
+                fig.add_trace(go.Scatter(
+                    x=[orientation["azimuth"]], y=[orientation["tilt"]], mode="markers",
+                    marker=dict(color="#0B284C", size=12, symbol="x")
+                ))
+                fig.update_layout(
+                    title="Annual Sunlight on the Panels by Orientation",
+                    xaxis_title="Azimuth (° from North)",
+                    yaxis_title="Tilt (°)",
+                    height=400,
+                    showlegend=False
+                )
+                st.plotly_chart(fig, use_container_width=True)
+
             # Monthly irradiance chart for the selected department
             months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
                       "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
@@ -509,7 +612,8 @@ def render():
                     attr="Esri Satellite"
                 )
                 folium.Marker([lat, lon], popup="System Location").add_to(m)
-                st_folium(m, width=700, height=500)
+                with timed("render.folium_map"):
+                    st_folium(m, width=700, height=500)
             else:
                 st.info("📌 Location not set. Please return to Step 4.")
 
@@ -7,4 +7,7 @@ echo "Activating virtual environment and installing requirements..."
 source venv/bin/activate
 pip install -r requirements.txt
 
+echo "Precomputing quote lookup tables..."
+python main.py build-tables
+
 echo "Setup complete. Run the app with ./run.sh"
\ No newline at end of file
@@ -0,0 +1,103 @@
+import threading
+from datetime import date, timedelta
+
+import pytest
+import requests
+from tenacity import wait_none
+
+from logic.clients import amm_client
+from logic.clients.amm_client import AMM_URLS, AMMClient, local_today
+from logic.clients.http import get_json
+
+class FakeResponse:
+    def __init__(self, payload, status=200):
+        self.payload = payload
+        self.status_code = status
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(response=self)
+
+    def json(self):
+        return self.payload
+
+class FakeSession:
+    def __init__(self, failures=0, payload=None):
+        self.urls = []
+        self.failures = failures
+        self.payload = payload
+        self.lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        with self.lock:
+            self.urls.append(url)
+            if self.failures:
+                self.failures -= 1
+                raise requests.ConnectionError("down")
+        if self.payload is not None:
+            return FakeResponse(self.payload)
+        return FakeResponse([{"hora": "1", "tipo": "HIDRO", "potencia": 100.0, "url": url}])
+
+PAST = date(2025, 1, 15)
+
+def test_past_dates_cached_in_memory_and_on_disk(tmp_path):
+    session = FakeSession()
+    client = AMMClient(session=session, cache_dir=str(tmp_path))
+    first = client.fetch("Tecnología", PAST)
+    assert client.fetch("Tecnología", PAST) == first
+    assert len(session.urls) == 1
+    assert session.urls[0].endswith("15/01/2025")
+
+    # A new client (e.g. after a restart) reads the disk cache
+    fresh = AMMClient(session=FakeSession(), cache_dir=str(tmp_path))
+    assert fresh.fetch("Tecnología", PAST) == first
+    assert fresh.session.urls == []
+
+def test_today_expires_after_ttl(tmp_path):
+    session = FakeSession()
+    client = AMMClient(session=session, cache_dir=str(tmp_path), ttl=-1)
+    client.fetch("Tecnología", local_today())
+    client.fetch("Tecnología", local_today())
+    assert len(session.urls) == 2
+
+def test_partial_day_expires_once_the_day_is_over(tmp_path, monkeypatch):
+    today = local_today()
+    session = FakeSession()
+    client = AMMClient(session=session, cache_dir=str(tmp_path))
+    client.fetch("Tecnología", today)
+    client.fetch("Tecnología", today)
+    assert len(session.urls) == 1
+
+    monkeypatch.setattr(amm_client, "local_today", lambda: today + timedelta(days=1))
+    client.fetch("Tecnología", today)
+    assert len(session.urls) == 2
+
+    # The copy on disk was also downloaded while the day was current
+    other = AMMClient(session=FakeSession(), cache_dir=str(tmp_path))
+    other.fetch("Tecnología", today)
+    assert len(other.session.urls) == 1
+
+def test_empty_past_day_is_not_cached(tmp_path):
+    session = FakeSession(payload=[])
+    client = AMMClient(session=session, cache_dir=str(tmp_path))
+    assert client.fetch("Tecnología", PAST) == []
+    assert client.fetch("Tecnología", PAST) == []
+    assert len(session.urls) == 2
+
+def test_fetch_all_downloads_each_category_once(tmp_path):
+    session = FakeSession()
+    client = AMMClient(session=session, cache_dir=str(tmp_path))
+    client.prefetch(PAST)
+    results = client.fetch_all(PAST)
+    assert set(results) == set(AMM_URLS)
+    assert len(session.urls) == len(AMM_URLS)
+
+def test_transient_errors_are_retried():
+    session = FakeSession(failures=2)
+    fetch = get_json.retry_with(wait=wait_none())
+    assert fetch(session, "https://example.invalid/data")[0]["potencia"] == 100.0
+    assert len(session.urls) == 3
+
+def test_unknown_category(tmp_path):
+    with pytest.raises(KeyError):
+        AMMClient(session=FakeSession(), cache_dir=str(tmp_path)).fetch("Solar", PAST)
@@ -0,0 +1,82 @@
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from logic.clients import amm_client
+from logic.clients.amm_client import AMM_URLS, AMMClient
+from logic.utils.amm_warehouse import AMMWarehouse
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+class FakeSession:
+    def __init__(self):
+        self.urls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        with self.lock:
+            self.urls.append(url)
+        day = int(url.split("dt=")[1][:2])
+        return FakeResponse([
+            {"hora": str(hour), "tipo": "HIDRO", "potencia": float(day * 100 + hour)} for hour in range(1, 25)
+        ] + [{"hora": "TOTAL", "tipo": "HIDRO", "potencia": 0}])
+
+def _warehouse(tmp_path):
+    session = FakeSession()
+    client = AMMClient(session=session, cache_dir=str(tmp_path / "cache"))
+    return AMMWarehouse(str(tmp_path / "warehouse")), client, session
+
+def test_backfill_is_incremental(tmp_path):
+    warehouse, client, session = _warehouse(tmp_path)
+    assert warehouse.backfill(date(2025, 1, 30), date(2025, 2, 2), client=client) == 4 * len(AMM_URLS)
+    assert len(session.urls) == 4 * len(AMM_URLS)
+
+    # Only the new days are downloaded on the next run
+    assert warehouse.backfill(date(2025, 1, 30), date(2025, 2, 4), categories=["Tecnología"], client=client) == 2
+    assert warehouse.missing(date(2025, 1, 30), date(2025, 2, 4), ["Tecnología"]) == []
+
+def test_read_filters_by_range_and_category(tmp_path):
+    warehouse, client, _ = _warehouse(tmp_path)
+    warehouse.backfill(date(2025, 1, 30), date(2025, 2, 2), client=client)
+
+    frame = warehouse.read(date(2025, 1, 31), date(2025, 2, 1), categories=["Tipo de Recurso"])
+    assert len(frame) == 2 * 24
+    assert set(frame["category"]) == {"Tipo de Recurso"}
+    assert sorted(set(frame["date"].astype(str))) == ["2025-01-31", "2025-02-01"]
+    assert frame["potencia"].max() == 3124.0
+
+def test_backfill_downloads_again_a_day_cached_while_current(tmp_path, monkeypatch):
+    warehouse, client, session = _warehouse(tmp_path)
+    day = date(2025, 1, 30)
+    monkeypatch.setattr(amm_client, "local_date", lambda timestamp: day)
+    monkeypatch.setattr(amm_client, "local_today", lambda: day)
+    client.fetch("Tecnología", day)
+
+    monkeypatch.setattr(amm_client, "local_today", lambda: day + timedelta(days=1))
+    assert warehouse.backfill(day, day, categories=["Tecnología"], client=client) == 1
+    assert len(session.urls) == 2
+
+def test_interrupted_backfill_does_not_duplicate_rows(tmp_path, monkeypatch):
+    warehouse, client, _ = _warehouse(tmp_path)
+    save_manifest = warehouse._save_manifest
+    def crash(ingested):
+        raise OSError("disk full")
+    monkeypatch.setattr(warehouse, "_save_manifest", crash)
+    with pytest.raises(OSError):
+        warehouse.backfill(date(2025, 1, 30), date(2025, 1, 31), categories=["Tecnología"], client=client)
+
+    monkeypatch.setattr(warehouse, "_save_manifest", save_manifest)
+    assert warehouse.backfill(date(2025, 1, 30), date(2025, 1, 31), categories=["Tecnología"], client=client) == 2
+    assert len(warehouse.read(date(2025, 1, 30), date(2025, 1, 31))) == 2 * 24
+
+def test_read_empty_warehouse(tmp_path):
+    assert AMMWarehouse(str(tmp_path / "none")).read(date(2025, 1, 1), date(2025, 1, 2)).empty
@@ -0,0 +1,22 @@
+from benchmarks.run_benchmarks import compare, missing_baselines, time_stage
+
+def test_time_stage_reports_per_call_times():
+    calls = []
+    result = time_stage(lambda: calls.append(1), number=10, repeat=3)
+    assert len(calls) == 31  # warm-up + 3 x 10
+    assert result["min_s"] <= result["median_s"]
+
+def test_compare_flags_only_slower_stages():
+    baseline = {"stages": {"billing": {"min_s": 1.0}, "irr": {"min_s": 1.0}}, "thresholds": {"irr": 1.0}}
+    results = {"billing": {"min_s": 1.3}, "irr": {"min_s": 1.3}, "new_stage": {"min_s": 9.0}}
+    regressions = compare(results, baseline, 0.25)
+    assert [r[0] for r in regressions] == ["billing"]
+
+def test_stages_without_baseline_are_reported():
+    baseline = {"stages": {"billing": {"min_s": 1.0}}}
+    assert missing_baselines({"billing": {"min_s": 1.0}, "batch_100k": {"min_s": 9.0}}, baseline) == ["batch_100k"]
+
+def test_fast_stages_get_a_wider_threshold():
+    baseline = {"stages": {"sizing": {"min_s": 4e-6}, "batch_1k": {"min_s": 0.4}}}
+    results = {"sizing": {"min_s": 7e-6}, "batch_1k": {"min_s": 0.6}}
+    assert [r[0] for r in compare(results, baseline, 0.25)] == ["batch_1k"]
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+from logic.utils.billing_calculator import BillingCalculator, _round_like_python
+
+def test_batch_matches_scalar_comparison():
+    rng = np.random.default_rng(7)
+    consumption = rng.uniform(0, 1500, (200, 12)).round(2)
+    generation = rng.uniform(0, 1500, (200, 12)).round(2)
+    distributors = rng.choice(["EGGSA", "DEOCSA"], 200)
+    departments = rng.choice(["Guatemala", "Escuintla"], 200)
+
+    batch = BillingCalculator.generate_annual_cost_comparison_batch(
+        consumption, generation, distributors, "BTS", departments
+    )
+
+    for i in range(200):
+        scalar = BillingCalculator.generate_annual_cost_comparison(
+            consumption[i].tolist(), generation[i].tolist(), distributors[i], "BTS", departments[i]
+        )
+        for key, value in scalar.items():
+            assert batch[key][i] == value
+
+def test_batch_unknown_tariff_bills_zero():
+    bills = BillingCalculator.calculate_monthly_bills_batch([[100] * 12], "EGGSA", "BT", "Atlantis")
+    assert bills.shape == (1, 12)
+    assert not bills.any()
+
+def test_batch_rounding_matches_builtin_on_ties():
+    values = np.array([0.125, 0.375, 2.675, 1.005, 10.115, 1234.565])
+    assert _round_like_python(values).tolist() == [round(v, 2) for v in values.tolist()]
+
+def test_dated_bills_use_tariff_in_force():
+    history = pd.DataFrame({
+        "distributor": ["EGGSA", "EGGSA", "EGGSA"],
+        "rate_type": ["BTS", "BTS", "TS"],
+        "effective_from": pd.to_datetime(["2024-02-01", "2024-05-01", "2024-02-01"]),
+        "price_per_kwh": [1.2, 1.6, 1.0],
+    })
+    bills = pd.DataFrame({
+        "customer": [1, 1, 1, 2, 3, 4],
+        "date": ["2024-01-15", "2024-04-30", "2024-05-01", "2024-06-10", "2024-06-10", "2024-06-10"],
+        "kwh": [200.0, 200.0, 200.0, 150.0, 150.0, 150.0],
+        "distributor": ["EGGSA", "EGGSA", "EGGSA", "EGGSA", "EGGSA", None],
+        "rate_type": ["BTS", "BTS", "BTS", "BT", "BT", "BT"],
+        "department": ["Guatemala", "Guatemala", "Guatemala", "Escuintla", "Atlantis", np.nan],
+    })
+
+    result = BillingCalculator.calculate_dated_bills(bills, history)
+
+    assert result["customer"].tolist() == [1, 1, 1, 2, 3, 4]
+    assert pd.isna(result["effective_from"][0])
+    assert result["price_per_kwh"][:4].tolist() == [1.509, 1.2, 1.6, 1.0]
+    assert pd.isna(result["price_per_kwh"][4])
+    assert result["bill"][4] == 0
+    # Missing keys are unknown tariffs, not errors
+    assert pd.isna(result["price_per_kwh"][5])
+    assert result["bill"][5] == 0
+
+    # Same result as the static formula with the dated price
+    fixed, municipality = 11.198, 0.13
+    expected = round((fixed + 200 * 1.6) * (1 + municipality) * 1.12, 2)
+    assert result["bill"][2] == expected
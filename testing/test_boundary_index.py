@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+import pytest
+
+from logic.utils.boundary_index import BoundaryIndex, build_boundary_index, canonical_department, points_in_polygon
+
+def square(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]
+
+def circle(cx, cy, r, n=64):
+    angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    return [[cx + r * np.cos(a), cy + r * np.sin(a)] for a in angles]
+
+def feature(department, municipality, geometry_type, coordinates, **properties):
+    return {
+        "type": "Feature",
+        "properties": {"NAME_1": department, "NAME_2": municipality, **properties},
+        "geometry": {"type": geometry_type, "coordinates": coordinates},
+    }
+
+@pytest.fixture
+def index(tmp_path):
+    lake = circle(-90.3, 14.7, 0.12)
+    features = [
+        # Department with a hole where an enclave municipality sits
+        feature("Guatemala", "Mixco", "Polygon", [square(-90.6, 14.5, -90.0, 15.0), lake[::-1]]),
+        feature("Guatemala", "Enclave", "Polygon", [lake]),
+        feature("Quiche", "Islas", "MultiPolygon", [[square(-91.5, 14.5, -91.0, 15.0)], [square(-90.9, 14.5, -90.7, 14.7)]]),
+        feature("Petén", "Flores", "Polygon", [square(-90.0, 14.5, -89.2, 15.3)], distributor="EEM"),
+    ]
+    source = tmp_path / "boundaries.geojson"
+    source.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+    path = tmp_path / "boundaries.bin"
+    assert build_boundary_index(str(source), str(path), cell_size=0.05) == 4
+    return BoundaryIndex(str(path))
+
+def test_canonical_department():
+    assert canonical_department("QUICHE") == "Quiché"
+    assert canonical_department("Atlantis") == "Atlantis"
+
+def test_locate_points(index):
+    assert index.locate(14.9, -90.55) == {"department": "Guatemala", "municipality": "Mixco", "distributor": "EGGSA"}
+    assert index.locate(14.7, -90.3)["municipality"] == "Enclave"
+    assert index.locate(14.6, -90.8) == {"department": "Quiché", "municipality": "Islas", "distributor": "DEOCSA"}
+    assert index.locate(15.2, -89.5)["distributor"] == "EEM"
+    assert index.locate(14.8, -90.8) is None
+    assert index.locate(20.0, -90.0) is None
+
+def test_locate_many_matches_brute_force(index):
+    rng = np.random.default_rng(3)
+    lats = rng.uniform(14.4, 15.4, 20000)
+    lons = rng.uniform(-91.6, -89.1, 20000)
+
+    expected = np.full(len(lats), -1)
+    for polygon in range(len(index.regions)):
+        edges = index._polygon_edges(polygon)
+        expected[points_in_polygon(edges, lons, lats) & (expected < 0)] = polygon
+
+    assert np.array_equal(index.polygons_at(lats, lons), expected)
+    for i in range(0, 20000, 997):
+        assert index.polygon_at(lats[i], lons[i]) == expected[i]
+
+    located = index.locate_many([14.9, 14.8, np.nan], [-90.55, -90.8, -90.0])
+    assert located["department"].tolist() == ["Guatemala", None, None]
+    assert located["distributor"].tolist() == ["EGGSA", None, None]
+
+def test_locate_leads_fills_missing_fields(index):
+    from logic.utils.batch_io import locate_leads
+
+    leads = [
+        {"id": 1, "latitude": "14.9", "longitude": "-90.55"},
+        {"id": 2, "latitude": 14.9, "longitude": -90.55, "distributor": "DEOCSA"},
+        {"id": 3, "latitude": "bad", "longitude": "-90.55"},
+        {"id": 4},
+    ]
+    result = list(locate_leads(leads, index, chunk_size=3))
+    assert (result[0]["department"], result[0]["distributor"]) == ("Guatemala", "EGGSA")
+    assert result[1]["distributor"] == "DEOCSA"
+    assert "department" not in result[2] and "department" not in result[3]
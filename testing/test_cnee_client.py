@@ -0,0 +1,61 @@
+import os
+import threading
+import time
+
+from logic.clients.cnee_client import DISTRIBUIDORAS, CNEEClient, endpoints_for
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+class FakeSession:
+    def __init__(self):
+        self.urls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        with self.lock:
+            self.urls.append(url)
+            version = len(self.urls)
+        return FakeResponse([{"category": "2025-01", "value1": 1.5, "version": version}])
+
+def test_cost_endpoints_only_for_large_distributors():
+    assert endpoints_for(1) == ("BTS_TS", "BTS", "TS")
+    assert endpoints_for(7) == ("BTS_TS",)
+
+def test_fetch_all_uses_cache_on_second_call(tmp_path):
+    session = FakeSession()
+    client = CNEEClient(session=session, cache_dir=str(tmp_path))
+    first = client.fetch_all(1)
+    assert set(first) == {"BTS_TS", "BTS", "TS"}
+    assert client.fetch_all(1) == first
+    assert len(session.urls) == 3
+    assert any("db.BTS.php?distribuidora=1" in url for url in session.urls)
+
+def test_stale_copy_served_while_refreshing(tmp_path):
+    seed = CNEEClient(session=FakeSession(), cache_dir=str(tmp_path))
+    stale = seed.fetch(5, "BTS_TS")
+    path = seed.disk.path((5, "BTS_TS"))
+    os.utime(path, (time.time() - 3600, time.time() - 3600))
+
+    session = FakeSession()
+    client = CNEEClient(session=session, cache_dir=str(tmp_path), max_age=60)
+    assert client.fetch(5, "BTS_TS") == stale
+    client._executor.shutdown(wait=True)
+    assert len(session.urls) == 1
+    assert client.age(5, "BTS_TS") < 60
+
+def test_warm_all_covers_every_distributor_once(tmp_path):
+    session = FakeSession()
+    client = CNEEClient(session=session, cache_dir=str(tmp_path))
+    client.warm_all()
+    client.warm_all()
+    client._executor.shutdown(wait=True)
+    expected = sum(len(endpoints_for(i)) for i in DISTRIBUIDORAS.values())
+    assert len(session.urls) == expected
@@ -0,0 +1,47 @@
+import json
+import os
+
+import pytest
+from logic.utils.data_loader import DataStore, get_full_pricing_data, get_monthly_irradiance, get_store
+
+def _write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+def test_store_indexes_tariffs(tmp_path):
+    pricing = tmp_path / "pricing.json"
+    irradiance = tmp_path / "irradiance.json"
+    _write(pricing, {"EGGSA": {"BT": {"Guatemala": {"fixedCharge": 1.0, "pricePerKwh": 2.0, "municipalityFee": 0.1}}}})
+    _write(irradiance, {"Guatemala": [5.0] * 12})
+
+    store = DataStore(str(pricing), str(irradiance))
+    assert store.tariff("EGGSA", "BT", "Guatemala")["pricePerKwh"] == 2.0
+    assert store.tariff("EGGSA", "BT", "Escuintla") is None
+    assert store.monthly_irradiance("Guatemala") == (5.0,) * 12
+
+def test_store_is_read_only(tmp_path):
+    pricing = tmp_path / "pricing.json"
+    _write(pricing, {"EGGSA": {"BT": {"Guatemala": {"pricePerKwh": 2.0}}}})
+    store = DataStore(str(pricing), str(tmp_path / "missing.json"))
+
+    with pytest.raises(TypeError):
+        store.tariff("EGGSA", "BT", "Guatemala")["pricePerKwh"] = 3.0
+
+def test_store_reloads_only_on_content_change(tmp_path):
+    pricing = tmp_path / "pricing.json"
+    _write(pricing, {"EGGSA": {"BT": {"Guatemala": {"pricePerKwh": 2.0}}}})
+    store = DataStore(str(pricing), str(tmp_path / "missing.json"))
+    first = store.pricing
+
+    os.utime(pricing, ns=(0, 0))
+    assert store.pricing is first
+
+    _write(pricing, {"EGGSA": {"BT": {"Guatemala": {"pricePerKwh": 3.0}}}})
+    os.utime(pricing, ns=(10**9, 10**9))
+    assert store.tariff("EGGSA", "BT", "Guatemala")["pricePerKwh"] == 3.0
+
+def test_module_helpers_share_store():
+    assert get_store() is get_store()
+    assert get_full_pricing_data("EGGSA", "BT", "Guatemala")["pricePerKwh"] == 1.419
+    assert len(get_monthly_irradiance("Guatemala")) == 12
+    assert get_monthly_irradiance("Atlantis") is None
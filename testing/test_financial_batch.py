@@ -0,0 +1,36 @@
+import numpy as np
+from logic.financial.metrics_calculator import FinancialMetricsCalculator
+
+def test_irr_batch_matches_scalar_for_uniform_cashflows():
+    flows = [FinancialMetricsCalculator.calculate_cashflow_list(investment, savings)
+             for investment, savings in [(30000, 6000), (45750, 5200.5), (10000, 900)]]
+    batch = FinancialMetricsCalculator.calculate_irr_batch(flows)
+    expected = [FinancialMetricsCalculator.calculate_irr(row) for row in flows]
+    assert np.allclose(batch, expected, atol=0.01)
+
+def test_irr_batch_matches_scalar_for_irregular_cashflows():
+    flows = [[-1000, 300, 400, 500, 200, 0], [-5000, 1000, 1500, 2000, 2500, -200]]
+    batch = FinancialMetricsCalculator.calculate_irr_batch(flows)
+    expected = [FinancialMetricsCalculator.calculate_irr(row) for row in flows]
+    assert np.allclose(batch, expected, atol=0.01)
+
+def test_irr_batch_solves_negative_and_missing_irr():
+    flows = np.array([[-30000] + [1000] * 25, [100] + [10] * 25])
+    irr = FinancialMetricsCalculator.calculate_irr_batch(flows)
+    npv = FinancialMetricsCalculator.calculate_npv_batch(flows[:1], irr[0] / 100)
+    assert irr[0] < 0 and abs(npv[0]) < 50
+    assert np.isnan(irr[1])
+
+def test_npv_and_discounted_payback_batch():
+    flows = [[-100, 50, 50, 50], [-100, 10, 10, 10]]
+    assert np.allclose(FinancialMetricsCalculator.calculate_npv_batch(flows, 0), [50, -70])
+    payback = FinancialMetricsCalculator.calculate_discounted_payback_batch(flows, 0)
+    assert payback[0] == 2.0 and np.isnan(payback[1])
+
+def test_discounted_payback_without_initial_outflow():
+    flows = [[10, 5, 5, 5], [50, -20, -10, 5], [-100, 0, 100, 10]]
+    payback = FinancialMetricsCalculator.calculate_discounted_payback_batch(flows, 0)
+    # Never negative: paid back from the start, even when later flows are not positive
+    assert payback[0] == 0 and payback[1] == 0
+    # A zero flow while still negative is skipped until the balance crosses zero
+    assert payback[2] == 2.0
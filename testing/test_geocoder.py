@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+import requests
+
+from logic.clients.geocoder import Geocoder, GeocodingError, NominatimBackend, TokenBucket, normalize_address
+from logic.pipeline import quote_lead
+from logic.utils.batch_io import geocode_leads
+
+class FakeBackend:
+    def __init__(self, fail=(), broken=()):
+        self.calls = []
+        self.fail = set(fail)
+        self.broken = set(broken)
+        self.lock = threading.Lock()
+
+    def geocode(self, address):
+        with self.lock:
+            self.calls.append(address)
+        if address in self.fail:
+            raise GeocodingError("down")
+        if address in self.broken:
+            raise KeyError("lat")
+        if "nowhere" in address.lower():
+            return None
+        return 14.6, -90.5, f"{address}, Guatemala"
+
+def make_geocoder(tmp_path, backend):
+    return Geocoder(backend, cache_path=str(tmp_path / "geocode.sqlite"), rate=1000)
+
+def test_normalize_address():
+    assert normalize_address("  19 Calle 16-29 ,Zona 7,  Mixco. ") == "19 calle 16-29, zona 7, mixco"
+    assert normalize_address("Petén") == normalize_address("PETEN")
+
+def test_geocode_is_cached_on_disk(tmp_path):
+    backend = FakeBackend()
+    geocoder = make_geocoder(tmp_path, backend)
+    assert geocoder.geocode("Zona 10, Guatemala")["latitude"] == 14.6
+    assert geocoder.geocode("zona 10,guatemala")["longitude"] == -90.5
+    assert geocoder.geocode("Nowhere") is None
+    assert geocoder.geocode("NOWHERE") is None
+
+    # A new geocoder on the same file does not call the backend again
+    assert make_geocoder(tmp_path, backend).geocode("Zona 10, Guatemala")["address"] == "Zona 10, Guatemala, Guatemala"
+    assert backend.calls == ["Zona 10, Guatemala", "Nowhere"]
+
+def test_geocode_many_deduplicates_and_skips_failures(tmp_path):
+    backend = FakeBackend(fail={"Zona 4"})
+    geocoder = make_geocoder(tmp_path, backend)
+    geocoder.geocode("Zona 1")
+
+    failures = {}
+    results = geocoder.geocode_many(["Zona 1", "Zona 2", "zona 2", "Zona 4", "Nowhere", "ZONA 2"], failures)
+
+    assert [result and result["latitude"] for result in results] == [14.6, 14.6, 14.6, None, None, 14.6]
+    assert failures == {"Zona 4": "GeocodingError: down"}
+    assert sorted(backend.calls) == ["Nowhere", "Zona 1", "Zona 2", "Zona 4"]
+
+    # The failed lookup was not cached and is retried
+    backend.fail.clear()
+    assert geocoder.geocode_many(["Zona 4"])[0]["latitude"] == 14.6
+
+def test_token_bucket_waits_for_refill():
+    now = [0.0]
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2, capacity=1, clock=lambda: now[0], sleep=sleep)
+    for _ in range(3):
+        bucket.acquire()
+    assert waits == [0.5, 0.5]
+
+def test_geocode_leads(tmp_path):
+    geocoder = make_geocoder(tmp_path, FakeBackend(fail={"Zona 4"}, broken={"Zona 5"}))
+    leads = [
+        {"id": 1, "address": "Zona 1"},
+        {"id": 2, "address": "Nowhere"},
+        {"id": 3, "latitude": "15.0", "longitude": "-91.0", "address": "Zona 9"},
+        {"id": 4},
+        {"id": 5, "address": "Zona 4"},
+        {"id": 6, "address": "Zona 5"},
+    ]
+    result = list(geocode_leads(leads, geocoder, chunk_size=2))
+    assert result[0]["latitude"] == 14.6
+    assert result[1]["warning"] == "Address not found: Nowhere"
+    assert result[2]["latitude"] == "15.0"
+    assert "latitude" not in result[3]
+    # Failed lookups are reported separately and do not stop the batch
+    assert result[4]["warning"] == "Geocoding failed for Zona 4: GeocodingError: down"
+    assert result[5]["warning"].startswith("Geocoding failed for Zona 5: KeyError")
+    assert not any(lead.get("error") for lead in result)
+
+def test_lead_with_geocoding_warning_is_still_quoted():
+    lead = {"id": 1, "kwh": [240], "department": "Guatemala", "distributor": "EGGSA", "rate_type": "BT",
+            "address": "Nowhere", "warning": "Address not found: Nowhere"}
+    record = quote_lead(lead)
+    assert record["error"] is None and record["panels"] > 0
+    assert record["warning"] == "Address not found: Nowhere"
+
+def test_nominatim_backend_parses_results():
+    class FakeSession:
+        headers = {}
+
+        def __init__(self, payload):
+            self.payload = payload
+            self.urls = []
+
+        def get(self, url, timeout=None):
+            self.urls.append(url)
+            response = requests.Response()
+            response.status_code = 200
+            response._content = self.payload
+            return response
+
+    session = FakeSession(b'[{"lat": "14.63", "lon": "-90.51", "display_name": "Zona 1"}]')
+    assert NominatimBackend(session).geocode("Zona 1, Guatemala") == (14.63, -90.51, "Zona 1")
+    assert "q=Zona+1%2C+Guatemala" in session.urls[0]
+    assert session.headers["User-Agent"]
+    assert NominatimBackend(FakeSession(b"[]")).geocode("Nowhere") is None
+    with pytest.raises(GeocodingError):
+        NominatimBackend(FakeSession(b'[{"display_name": "Zona 1"}]')).geocode("Zona 1")
@@ -0,0 +1,29 @@
+import numpy as np
+from logic.generation.data_generator import DataGenerator
+from logic.generation.hourly_simulator import HourlyGenerationSimulator
+from logic.utils.hourly_calendar import HOUR_OF_DAY, monthly_totals
+
+IRRADIANCE = [5.05, 5.28, 5.54, 5.68, 5.71, 5.60, 5.60, 5.50, 5.43, 5.35, 5.15, 5.01]
+
+def test_hourly_generation_aggregates_to_monthly_model():
+    hourly = HourlyGenerationSimulator.simulate_hourly_generation(4, 14.63, -90.51, IRRADIANCE)
+    assert hourly.shape == (8760,)
+    monthly = HourlyGenerationSimulator.aggregate_monthly(hourly).tolist()
+    assert np.allclose(monthly, DataGenerator.simulate_monthly_generation_from_irradiance(4, IRRADIANCE), atol=0.011)
+
+def test_no_generation_at_night():
+    hourly = HourlyGenerationSimulator.simulate_hourly_generation(4, 14.63, -90.51, IRRADIANCE)
+    night = (HOUR_OF_DAY < 5) | (HOUR_OF_DAY > 19)
+    assert not hourly[night].any()
+    assert hourly[HOUR_OF_DAY == 12].min() > 0
+
+def test_solar_noon_elevation_near_equinox():
+    position = HourlyGenerationSimulator.solar_position(14.63, -90.51)
+    # March 20, 12:00-13:00 local: the sun is close to 90 - latitude
+    noon = (79 - 1) * 24 + 12
+    assert abs(position["elevation"][noon] - (90 - 14.63)) < 5
+
+def test_many_sites_broadcast():
+    hourly = HourlyGenerationSimulator.simulate_hourly_generation([4, 8], [14.6, 15.3], [-90.5, -91.5], IRRADIANCE)
+    assert hourly.shape == (2, 8760)
+    assert np.allclose(monthly_totals(hourly[1]), 2 * monthly_totals(hourly[0]), rtol=1e-9)
@@ -0,0 +1,59 @@
+import pytest
+
+from logic.utils import instrumentation
+from logic.utils.instrumentation import MetricsRegistry
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(instrumentation, "ENABLED", True)
+    instrumentation.REGISTRY.reset()
+    yield instrumentation.REGISTRY
+    instrumentation.REGISTRY.reset()
+
+def test_disabled_returns_originals(monkeypatch):
+    monkeypatch.setattr(instrumentation, "ENABLED", False)
+    func = lambda: 1
+    assert instrumentation.instrumented("x")(func) is func
+    assert instrumentation.timed("x") is instrumentation.timed("y")
+
+def test_instrument_class_records_static_methods(enabled):
+    @instrumentation.instrument_class("calc")
+    class Calc:
+        @staticmethod
+        def double(x):
+            return 2 * x
+
+        @staticmethod
+        def fail():
+            raise ValueError("boom")
+
+    assert Calc.double(3) == 6
+    with pytest.raises(ValueError):
+        Calc.fail()
+
+    snapshot = enabled.snapshot()
+    assert snapshot["calc.double"]["count"] == 1
+    assert snapshot["calc.fail"]["errors"] == 1
+
+def test_histogram_buckets_and_prometheus_text():
+    registry = MetricsRegistry()
+    registry.observe("billing", 0.0002)
+    registry.observe("billing", 0.003)
+    registry.observe("billing", 20.0)
+
+    buckets = dict(registry.snapshot()["billing"]["buckets"])
+    assert buckets[0.0005] == 1
+    assert buckets[0.005] == 2
+    assert buckets[float("inf")] == 3
+
+    text = registry.to_prometheus()
+    assert 'photonic_call_duration_seconds_bucket{name="billing",le="+Inf"} 3' in text
+    assert 'photonic_call_duration_seconds_count{name="billing"} 3' in text
+    assert 'photonic_call_errors_total{name="billing"} 0' in text
+
+def test_write_prometheus(enabled, tmp_path):
+    with instrumentation.timed("http.amm"):
+        pass
+    path = tmp_path / "metrics.prom"
+    instrumentation.write_prometheus(str(path))
+    assert 'name="http.amm"' in path.read_text()
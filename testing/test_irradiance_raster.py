@@ -0,0 +1,70 @@
+import json
+
+import numpy as np
+import pytest
+
+from logic.utils.data_loader import DataStore
+from logic.utils.irradiance_raster import IrradianceRaster, build_irradiance_raster
+
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+def field(lat, lon, month):
+    # Linear in lat and lon, so bilinear interpolation reproduces it exactly
+    return 4.0 + 0.5 * (lat - 14.0) - 0.25 * (lon + 91.0) + 0.1 * month
+
+def write_power_csv(path, missing=()):
+    lines = ["-BEGIN HEADER-", "NASA/POWER Climatology", "-END HEADER-", "PARAMETER,LAT,LON," + ",".join(MONTHS) + ",ANN"]
+    for lat in (14.0, 14.5, 15.0):
+        for lon in (-91.0, -90.5, -90.0, -89.5):
+            values = [-999 if (lat, lon) in missing else round(field(lat, lon, m), 4) for m in range(12)]
+            lines.append(f"ALLSKY_SFC_SW_DWN,{lat},{lon}," + ",".join(map(str, values)) + ",5.0")
+            lines.append(f"T2M,{lat},{lon}," + ",".join(["25"] * 12) + ",25")
+    path.write_text("\n".join(lines) + "\n")
+
+@pytest.fixture
+def raster(tmp_path):
+    source = tmp_path / "power.csv"
+    write_power_csv(source, missing={(15.0, -89.5)})
+    path = tmp_path / "irradiance_raster.bin"
+    assert build_irradiance_raster(str(source), str(path)) == (3, 4)
+    return IrradianceRaster(str(path))
+
+def test_point_interpolation_is_bilinear(raster):
+    values = raster.monthly(14.3, -90.8)
+    assert values == pytest.approx([field(14.3, -90.8, m) for m in range(12)], abs=1e-5)
+    assert raster.monthly(14.0, -91.0) == pytest.approx([field(14.0, -91.0, m) for m in range(12)], abs=1e-5)
+
+def test_edges_and_missing_cells(raster):
+    # Half a cell beyond the outermost centers takes the edge values
+    assert raster.monthly(13.8, -91.2) == pytest.approx(raster.monthly(14.0, -91.0))
+    assert raster.monthly(13.7, -91.0) is None
+    assert raster.monthly(14.5, -88.0) is None
+    # The missing corner is left out of the average
+    assert raster.monthly(15.0, -89.5) is None
+    assert raster.monthly(14.9, -89.6)[0] == pytest.approx(field(14.9, -89.6, 0), abs=0.06)
+
+def test_bulk_matches_points(raster):
+    rng = np.random.default_rng(1)
+    lats = rng.uniform(13.6, 15.4, 500)
+    lons = rng.uniform(-91.4, -89.1, 500)
+    bulk = raster.monthly_many(lats, lons)
+    for lat, lon, row in zip(lats, lons, bulk):
+        point = raster.monthly(lat, lon)
+        if point is None:
+            assert np.isnan(row).all()
+        else:
+            assert row == pytest.approx(point, abs=1e-9)
+
+def test_store_prefers_raster_for_sites(tmp_path):
+    write_power_csv(tmp_path / "power.csv")
+    build_irradiance_raster(str(tmp_path / "power.csv"), str(tmp_path / "irradiance_raster.bin"))
+    pricing, irradiance = tmp_path / "pricing.json", tmp_path / "irradiance_monthly.json"
+    pricing.write_text("{}")
+    irradiance.write_text(json.dumps({"Guatemala": [5.0] * 12}))
+    store = DataStore(str(pricing), str(irradiance))
+
+    assert store.site_irradiance("Guatemala") == (5.0,) * 12
+    assert store.site_irradiance("Guatemala", 14.5, -90.5)[0] == pytest.approx(field(14.5, -90.5, 0), abs=1e-5)
+    assert store.site_irradiance("Petén", 14.5, -90.5) is not None
+    assert store.site_irradiance("Guatemala", 17.0, -90.5) == (5.0,) * 12
+    assert store.version[2] is not None
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from logic.energy.consumption_calculator import ConsumptionCalculator
+from logic.energy.load_profiles import normalized_load_shape
+from logic.utils.hourly_calendar import HOUR_OF_DAY, monthly_totals
+
+MONTHLY = [240, 230, 250, 260, 270, 265, 255, 250, 245, 240, 235, 250]
+
+def test_profile_preserves_monthly_totals():
+    hourly = ConsumptionCalculator.synthesize_hourly_load_profile(MONTHLY)
+    assert hourly.shape == (8760,)
+    assert np.allclose(monthly_totals(hourly), MONTHLY)
+
+def test_stack_of_customers_with_mixed_profiles():
+    monthly = np.array([MONTHLY, np.array(MONTHLY) * 10])
+    hourly = ConsumptionCalculator.synthesize_hourly_load_profile(monthly, ["residential", "commercial"])
+    assert hourly.shape == (2, 8760)
+    assert np.allclose(monthly_totals(hourly), monthly)
+    # Commercial load peaks during business hours, residential in the evening
+    assert hourly[1][HOUR_OF_DAY == 11].mean() > hourly[1][HOUR_OF_DAY == 20].mean()
+    assert hourly[0][HOUR_OF_DAY == 19].mean() > hourly[0][HOUR_OF_DAY == 11].mean()
+
+def test_shapes_are_cached_and_read_only():
+    assert normalized_load_shape("industrial") is normalized_load_shape("industrial")
+    with pytest.raises(ValueError):
+        normalized_load_shape("industrial")[0] = 1.0
+
+def test_unknown_profile_raises():
+    with pytest.raises(ValueError):
+        ConsumptionCalculator.synthesize_hourly_load_profile(MONTHLY, "agricultural")
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from logic.utils.mmap_store import open_arrays, write_arrays
+
+def test_round_trip_is_read_only_view(tmp_path):
+    path = str(tmp_path / "arrays.bin")
+    grid = np.linspace(0, 1, 5)
+    values = np.arange(24, dtype=np.float32).reshape(2, 3, 4)
+    write_arrays(path, {"grid": grid, "values": values, "empty": np.zeros(0)}, {"source": "test"})
+
+    arrays, meta = open_arrays(path)
+    assert meta == {"source": "test"}
+    np.testing.assert_array_equal(arrays["grid"], grid)
+    np.testing.assert_array_equal(arrays["values"], values)
+    assert arrays["values"].dtype == np.float32
+    assert arrays["empty"].shape == (0,)
+    with pytest.raises(ValueError):
+        arrays["grid"][0] = 1.0
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not an array file")
+    with pytest.raises(ValueError):
+        open_arrays(str(path))
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from logic import pipeline
+from logic.energy.system_calculator import SystemCalculator
+from logic.pipeline import RESULT_FIELDS, quote_lead, run_batch, run_quote
+from logic.utils.batch_io import normalize_lead, open_writer, read_leads
+from logic.utils.data_loader import DataStore
+from logic.utils.irradiance_raster import build_irradiance_raster
+
+def test_run_quote_is_reproducible():
+    first = run_quote([240, 250, 260, 255], "Guatemala", "EGGSA", "BT")
+    second = run_quote([240, 250, 260, 255], "Guatemala", "EGGSA", "BT")
+    assert first == second
+    assert first["panels"] == 4
+
+def test_normalize_lead_accepts_columns_and_aliases():
+    lead = normalize_lead({"kwh_2": "250", "kwh_1": "240", "tariff": "BT", "department": "Guatemala"})
+    assert lead["kwh"] == [240.0, 250.0]
+    assert lead["rate_type"] == "BT"
+    assert lead["sizing_preference"] == "Balanced"
+    assert normalize_lead({"kwh": "240; 250;260"})["kwh"] == [240.0, 250.0, 260.0]
+    assert normalize_lead({"kwh": "abc"})["error"]
+
+def test_quote_lead_reports_errors():
+    record = quote_lead({"id": 7, "kwh": [100], "department": "Atlantis", "distributor": "EGGSA", "rate_type": "BT"})
+    assert record["id"] == "7"
+    assert "Missing irradiance" in record["error"]
+    assert set(record) == set(RESULT_FIELDS)
+
+def test_quote_lead_records_unexpected_errors():
+    record = quote_lead({"id": 8, "kwh": [100, "n/a"], "department": "Guatemala", "distributor": "EGGSA", "rate_type": "BT"})
+    assert record["error"].startswith("TypeError")
+
+def test_optimal_preference_rejected_in_batch():
+    lead = {"id": 9, "kwh": [240], "department": "Guatemala", "distributor": "EGGSA", "rate_type": "BT", "sizing_preference": "Optimal"}
+    assert "Unsupported sizing preference" in quote_lead(lead)["error"]
+
+def test_lead_coordinates_use_the_raster(tmp_path, monkeypatch):
+    source = tmp_path / "power.csv"
+    lines = ["-END HEADER-", "PARAMETER,LAT,LON,JAN,FEB,MAR,APR,MAY,JUN,JUL,AUG,SEP,OCT,NOV,DEC"]
+    for lat in (14.0, 15.0):
+        for lon in (-91.0, -90.0):
+            lines.append(f"ALLSKY_SFC_SW_DWN,{lat},{lon}," + ",".join(["6.0"] * 12))
+    source.write_text("\n".join(lines) + "\n")
+    irradiance = tmp_path / "irradiance_monthly.json"
+    irradiance.write_text("{}")
+    build_irradiance_raster(str(source), str(tmp_path / "irradiance_raster.bin"))
+    monkeypatch.setattr(pipeline, "get_store", lambda: DataStore("data/pricing.json", str(irradiance)))
+
+    lead = {"id": 1, "kwh": [240, 250, 260, 255], "department": "Guatemala", "distributor": "EGGSA", "rate_type": "BT"}
+    assert "Missing irradiance" in quote_lead(lead)["error"]
+    record = quote_lead({**lead, "latitude": 14.5, "longitude": -90.5})
+    assert record["error"] is None
+    assert record["latitude"] == 14.5
+    # The raster's 6.0 kWh/m²/day everywhere sizes and generates the system
+    assert record["annual_generation"] == SystemCalculator.calculate_annual_generation_kwh(record["panels"], 6.0)
+
+@pytest.mark.parametrize("extension", [".jsonl", ".parquet"])
+def test_batch_streams_leads_to_output(tmp_path, extension):
+    leads_path = tmp_path / "leads.jsonl"
+    with open(leads_path, "w", encoding="utf-8") as f:
+        for i in range(25):
+            f.write(json.dumps({"id": i, "kwh": [200 + i, 210, 220], "department": "Guatemala",
+                                "distributor": "EGGSA", "tariff": "BT"}) + "\n")
+
+    output = tmp_path / f"results{extension}"
+    with open_writer(str(output), RESULT_FIELDS) as writer:
+        count = run_batch(read_leads(str(leads_path)), writer, workers=1, chunk_size=10)
+    assert count == 25
+
+    if extension == ".jsonl":
+        rows = [json.loads(line) for line in open(output, encoding="utf-8")]
+    else:
+        pq = pytest.importorskip("pyarrow.parquet")
+        rows = pq.read_table(output).to_pylist()
+    assert [row["id"] for row in rows] == [str(i) for i in range(25)]
+    assert all(row["error"] is None for row in rows)
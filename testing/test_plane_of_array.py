@@ -0,0 +1,41 @@
+import numpy as np
+
+from logic.generation.hourly_simulator import HourlyGenerationSimulator
+from logic.generation.plane_of_array import PlaneOfArray
+
+IRRADIANCE = [5.05, 5.28, 5.54, 5.68, 5.71, 5.60, 5.60, 5.50, 5.43, 5.35, 5.15, 5.01]
+GHI = HourlyGenerationSimulator.typical_year_irradiance(14.63, -90.51, IRRADIANCE)
+
+def test_flat_modules_receive_horizontal_irradiance():
+    poa = PlaneOfArray.irradiance(14.63, -90.51, 0, 180, GHI)
+    assert np.allclose(poa, GHI)
+
+def test_decomposition_closes_on_ghi():
+    position = HourlyGenerationSimulator.solar_position(14.63, -90.51)
+    dni, dhi = PlaneOfArray.decompose(GHI, position["cos_zenith"], position["extraterrestrial"])
+    assert (dni >= 0).all() and (dhi >= 0).all()
+    assert np.allclose(dhi + dni * np.maximum(position["cos_zenith"], 0), GHI)
+
+def test_east_and_west_roofs_produce_less_than_south():
+    south, east, west = (PlaneOfArray.irradiance(14.63, -90.51, 20, azimuth, GHI).sum() for azimuth in (180, 90, 270))
+    assert east < south and west < south
+    # Mornings and afternoons are symmetric around solar noon
+    assert abs(east - west) / south < 0.02
+
+def test_grid_matches_single_orientation():
+    result = PlaneOfArray.optimize_orientation(14.63, -90.51, GHI, tilts=[0, 15, 45], azimuths=[90, 180, 270])
+    assert result["surface"].shape == (3, 3)
+    single = PlaneOfArray.irradiance(14.63, -90.51, 45, 90, GHI).sum() / 1000
+    assert np.isclose(result["surface"][2, 0], single)
+    assert np.isclose(result["surface"][0, 1], result["horizontal_kwh_m2"])
+
+def test_optimum_faces_the_equator_near_latitude_tilt():
+    result = PlaneOfArray.optimize_orientation(14.63, -90.51, GHI)
+    assert result["azimuth"] == 180
+    assert 5 <= result["tilt"] <= 25
+    assert result["annual_kwh_m2"] >= result["horizontal_kwh_m2"]
+
+def test_measured_components_are_used():
+    dni = np.zeros(8760)
+    poa = PlaneOfArray.irradiance(14.63, -90.51, 30, 180, GHI, dni=dni, dhi=GHI, albedo=0)
+    assert np.allclose(poa, GHI * (1 + np.cos(np.radians(30))) / 2)
@@ -0,0 +1,56 @@
+import time
+
+from logic.utils import quote_cache as quote_cache_module
+from logic.utils.quote_cache import QuoteCache
+
+INPUTS = dict(kwh=[241, 249, 262, 255], department="Guatemala", distributor="EGGSA", rate_type="BT")
+
+def _counting_compute(calls):
+    def compute(**inputs):
+        calls.append(inputs)
+        return {"kwh": inputs["kwh"]}
+    return compute
+
+def test_similar_kwh_share_an_entry():
+    calls = []
+    cache = QuoteCache(kwh_precision=5)
+    first = cache.get_or_compute(_counting_compute(calls), **INPUTS)
+    second = cache.get_or_compute(_counting_compute(calls), **{**INPUTS, "kwh": [240, 251, 260, 254]})
+    assert len(calls) == 1
+    assert first is second
+    assert calls[0]["kwh"] == [240, 250, 260, 255]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_roof_area_only_matters_for_optimal():
+    cache = QuoteCache()
+    assert cache.normalize(**INPUTS, roof_area=40)["roof_area"] == 0
+    assert cache.normalize(**INPUTS, sizing_preference="optimal", roof_area=40)["roof_area"] == 40
+
+def test_roof_azimuth_only_matters_with_a_tilt():
+    cache = QuoteCache()
+    assert cache.normalize(**INPUTS, roof_azimuth=90)["roof_azimuth"] == 180
+    assert cache.normalize(**INPUTS, roof_tilt=20.4, roof_azimuth=90)["roof_tilt"] == 20
+    assert cache.normalize(**INPUTS, roof_tilt=20, roof_azimuth=90)["roof_azimuth"] == 90
+
+def test_lru_and_ttl_eviction():
+    calls = []
+    cache = QuoteCache(maxsize=2, ttl=0.05)
+    for kwh in ([100], [200], [300]):
+        cache.get_or_compute(_counting_compute(calls), **{**INPUTS, "kwh": kwh})
+    assert cache.stats()["size"] == 2
+    time.sleep(0.06)
+    assert cache.stats()["size"] == 0
+
+def test_data_change_invalidates(monkeypatch):
+    class FakeStore:
+        version = ("a", "b")
+
+    store = FakeStore()
+    monkeypatch.setattr(quote_cache_module, "get_store", lambda: store)
+    calls = []
+    cache = QuoteCache()
+    cache.get_or_compute(_counting_compute(calls), **INPUTS)
+    store.version = ("c", "b")
+    cache.get_or_compute(_counting_compute(calls), **INPUTS)
+    assert len(calls) == 2
+    assert cache.stats()["invalidations"] == 1
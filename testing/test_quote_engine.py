@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from logic import pipeline, quote_engine
+from logic.generation.hourly_simulator import HourlyGenerationSimulator
+from logic.pipeline import run_quote
+from logic.quote_engine import QuoteEngine
+from logic.utils import tariff_engine
+from logic.utils.data_loader import DataStore, get_store
+
+INPUTS = dict(kwh=[240, 250, 260, 255], department="Guatemala", distributor="EGGSA", rate_type="BT")
+
+def test_first_run_computes_every_stage():
+    engine = QuoteEngine()
+    engine.run(**INPUTS)
+    assert engine.last_computed == ["consumption", "sizing", "orientation", "generation", "billing", "metrics", "environmental"]
+
+def test_rerun_with_same_inputs_reuses_everything():
+    engine = QuoteEngine()
+    first = engine.run(**INPUTS)
+    second = engine.run(**INPUTS)
+    assert engine.last_computed == []
+    assert second["irr"] == first["irr"]
+
+def test_sizing_change_recomputes_only_downstream():
+    engine = QuoteEngine()
+    engine.run(**INPUTS)
+    result = engine.run(**INPUTS, sizing_preference="Maximum")
+    assert "consumption" not in engine.last_computed
+    assert engine.last_computed[0] == "sizing"
+    assert result["panels"] == run_quote(**{**_positional(), "sizing_preference": "Maximum"})["panels"]
+
+def test_matches_run_quote():
+    result = QuoteEngine().run(**INPUTS)
+    expected = run_quote(**_positional())
+    for field in ("panels", "annual_generation", "annual_savings", "investment", "payback", "roi", "irr", "co2_saved", "trees"):
+        value = result["financial"][field] if field == "annual_savings" else result[field]
+        assert value == expected[field]
+
+def test_roof_orientation_changes_generation_only_with_coordinates():
+    engine = QuoteEngine()
+    flat = engine.run(**INPUTS, latitude=14.63, longitude=-90.51)
+    east = engine.run(**INPUTS, latitude=14.63, longitude=-90.51, roof_tilt=30, roof_azimuth=90)
+    assert engine.last_computed[:2] == ["orientation", "generation"]
+    assert east["annual_generation"] < sum(flat["monthly_generation"])
+    assert east["orientation"]["roof_kwh_m2"] < east["orientation"]["annual_kwh_m2"]
+    assert engine.run(**INPUTS)["orientation"] is None
+
+def test_weather_site_generation_is_consistent(monkeypatch):
+    ghi = 0.9 * HourlyGenerationSimulator.typical_year_irradiance(14.63, -90.51, [5.5] * 12)
+    site = {"name": "guatemala", "distance_km": 1.0, "ghi": ghi, "dni": None, "dhi": None}
+    monkeypatch.setattr(get_store(), "tmy_site", lambda latitude=None, longitude=None: site)
+    result = QuoteEngine().run(**INPUTS, latitude=14.63, longitude=-90.51)
+    assert result["weather_site"]["name"] == "guatemala"
+    assert result["annual_generation"] == round(sum(result["monthly_generation"]), 2)
+
+def test_hourly_tariff_rules_are_billed_hourly(tmp_path, monkeypatch):
+    with open("data/pricing.json") as f:
+        pricing = json.load(f)
+    pricing["EGGSA"]["BT"]["Guatemala"]["exportCredit"] = {"mode": "none"}
+    path = tmp_path / "pricing.json"
+    path.write_text(json.dumps(pricing))
+    store = DataStore(str(path), "data/irradiance_monthly.json")
+    flat = QuoteEngine().run(**INPUTS)
+
+    for module in (quote_engine, tariff_engine, pipeline):
+        monkeypatch.setattr(module, "get_store", lambda: store)
+    result = QuoteEngine().run(**INPUTS)
+    # Midday exports earn nothing, so savings drop below monthly netting
+    assert result["financial"]["annual_savings"] < flat["financial"]["annual_savings"]
+    assert result["financial"]["annual_cost_without_solar"] == pytest.approx(flat["financial"]["annual_cost_without_solar"], abs=1)
+    assert run_quote(**_positional())["annual_savings"] == result["financial"]["annual_savings"]
+
+def test_unknown_input_rejected():
+    with pytest.raises(TypeError):
+        QuoteEngine().run(**INPUTS, tariff="BT")
+
+def _positional():
+    return {
+        "monthly_kwh_input": INPUTS["kwh"],
+        "department": INPUTS["department"],
+        "distributor": INPUTS["distributor"],
+        "rate_type": INPUTS["rate_type"],
+    }
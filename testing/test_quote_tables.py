@@ -0,0 +1,39 @@
+import pytest
+
+from logic.pipeline import run_quote
+from logic.quote_tables import TABLE_SEED, QuoteTables, build_quote_tables, fast_quote
+
+COMBO = ("Guatemala", "EGGSA", "BT")
+
+@pytest.fixture(scope="module")
+def table_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("tables") / "quote_tables.bin")
+    build_quote_tables(path, kwh_min=100, kwh_max=1000, kwh_step=10, preferences=("Balanced",))
+    return path
+
+def _exact(avg_kwh):
+    return run_quote([avg_kwh], *COMBO, "Balanced", seed=TABLE_SEED)
+
+def test_grid_points_match_pipeline(table_path):
+    result = QuoteTables(table_path).lookup(*COMBO, 500, "Balanced")
+    expected = _exact(500)
+    assert result["panels"] == expected["panels"]
+    assert result["annual_savings"] == pytest.approx(expected["annual_savings"])
+    assert result["irr"] == pytest.approx(expected["irr"])
+
+def test_interpolation_keeps_exact_panel_count(table_path):
+    tables = QuoteTables(table_path)
+    for avg_kwh in (123.4, 347.9, 512.5, 777.7, 993.1):
+        result = tables.lookup(*COMBO, avg_kwh, "balanced")
+        expected = _exact(avg_kwh)
+        assert result["panels"] == expected["panels"]
+        assert result["annual_savings"] == pytest.approx(expected["annual_savings"], rel=0.03)
+
+def test_outside_grid_falls_back_to_pipeline(table_path):
+    assert QuoteTables(table_path).lookup(*COMBO, 5000, "Balanced") is None
+    assert QuoteTables(table_path).lookup("Jalapa", "EGGSA", "BT", 500, "Balanced") is None
+    assert fast_quote(5000, *COMBO, path=table_path)["panels"] == _exact(5000)["panels"]
+
+def test_missing_file_falls_back(tmp_path):
+    result = fast_quote(500, *COMBO, path=str(tmp_path / "missing.bin"))
+    assert result["annual_savings"] == _exact(500)["annual_savings"]
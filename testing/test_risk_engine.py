@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+from logic.financial.risk_engine import MonteCarloRiskEngine
+
+def test_percentiles_are_ordered_and_reproducible():
+    engine = MonteCarloRiskEngine(n_scenarios=2000, seed=3)
+    summary = engine.run([240, 250, 260, 255], "Guatemala", "EGGSA", "BT")
+    again = MonteCarloRiskEngine(n_scenarios=2000, seed=3).run([240, 250, 260, 255], "Guatemala", "EGGSA", "BT")
+
+    assert summary == again
+    for bands in summary["percentiles"].values():
+        assert bands["P10"] <= bands["P50"] <= bands["P90"]
+
+def test_zero_variation_collapses_to_deterministic_bands():
+    engine = MonteCarloRiskEngine(
+        n_scenarios=50, seed=1, consumption_variation=0, monthly_consumption_variation=0,
+        irradiance_variation=0, monthly_irradiance_variation=0, tariff_escalation_std=0,
+        degradation_range=(0.005, 0.005),
+    )
+    results = engine.simulate([300, 300, 300, 300], "Guatemala", "EGGSA", "BT")
+    assert np.ptp(results["irr"]) == 0
+    assert np.ptp(results["annual_savings"]) == 0
+
+def test_missing_data_raises():
+    with pytest.raises(ValueError):
+        MonteCarloRiskEngine(n_scenarios=10).run([100], "Atlantis", "EGGSA", "BT")
@@ -0,0 +1,30 @@
+import numpy as np
+from logic.energy.consumption_calculator import ConsumptionCalculator
+from logic.generation.data_generator import DataGenerator
+from logic.generation.scenario_generator import ScenarioGenerator
+
+def test_monthly_distribution_rows_sum_to_total():
+    matrix = ScenarioGenerator(42).monthly_distribution(3000, n_scenarios=500)
+    assert matrix.shape == (500, 12)
+    assert np.allclose(matrix.sum(axis=1), 3000)
+    assert np.all(np.abs(matrix / 250 - 1) < 0.11)
+
+def test_monthly_distribution_per_scenario_totals():
+    totals = np.array([1200.0, 2400.0, 0.0])
+    matrix = ScenarioGenerator(1).monthly_distribution(totals, n_scenarios=3)
+    assert np.allclose(matrix.sum(axis=1), totals)
+
+def test_same_seed_is_reproducible():
+    assert DataGenerator.simulate_monthly_distribution(3000, seed=5) == DataGenerator.simulate_monthly_distribution(3000, seed=5)
+    assert DataGenerator.simulate_annual_data_series(100, years=3, seed=5) == DataGenerator.simulate_annual_data_series(100, years=3, seed=5)
+    assert ConsumptionCalculator.simulate_monthly_consumption(250, seed=5) == ConsumptionCalculator.simulate_monthly_consumption(250, seed=5)
+
+def test_seed_from_is_stable():
+    assert ScenarioGenerator.seed_from([240, 250], "EGGSA") == ScenarioGenerator.seed_from([240, 250], "EGGSA")
+    assert ScenarioGenerator.seed_from([240, 250], "EGGSA") != ScenarioGenerator.seed_from([240, 251], "EGGSA")
+
+def test_wrappers_keep_list_outputs():
+    values = DataGenerator.simulate_monthly_distribution(3000)
+    assert isinstance(values, list) and len(values) == 12
+    assert abs(sum(values) - 3000) < 0.1
+    assert len(DataGenerator.simulate_annual_data_series(100, years=25)) == 25
@@ -0,0 +1,32 @@
+import numpy as np
+from logic.energy.size_optimizer import SystemSizeOptimizer
+from logic.financial.metrics_calculator import FinancialMetricsCalculator
+from logic.generation.data_generator import DataGenerator
+from logic.utils.billing_calculator import BillingCalculator
+
+IRRADIANCE = [5.05, 5.28, 5.54, 5.68, 5.71, 5.60, 5.60, 5.50, 5.43, 5.35, 5.15, 5.01]
+CONSUMPTION = [250.0] * 12
+
+def test_max_panels_from_roof_area():
+    assert SystemSizeOptimizer.calculate_max_panels(27) == 10
+    assert SystemSizeOptimizer.calculate_max_panels(2) == 0
+
+def test_curve_matches_scalar_pipeline():
+    curve = SystemSizeOptimizer.evaluate_panel_counts(CONSUMPTION, IRRADIANCE, "EGGSA", "BT", "Guatemala", 6)
+    for i, panels in enumerate(curve["panels"]):
+        generation = DataGenerator.simulate_monthly_generation_from_irradiance(panels, IRRADIANCE)
+        savings = BillingCalculator.generate_annual_cost_comparison(CONSUMPTION, generation, "EGGSA", "BT", "Guatemala")["annual_savings"]
+        investment = FinancialMetricsCalculator.calculate_investment_cost(panels * 0.61)
+        assert curve["annual_savings"][i] == savings
+        assert curve["investment"][i] == investment
+        assert abs(curve["irr"][i] - FinancialMetricsCalculator.calculate_irr(
+            FinancialMetricsCalculator.calculate_cashflow_list(investment, savings))) <= 0.01
+
+def test_optimum_is_curve_maximum():
+    result = SystemSizeOptimizer.optimize(CONSUMPTION, IRRADIANCE, "EGGSA", "BT", "Guatemala", roof_area_m2=60)
+    assert result["npv"] == result["curve"]["npv"].max()
+    assert result["panels"] == result["curve"]["panels"][np.argmax(result["curve"]["npv"])]
+    assert len(result["curve"]["panels"]) == 22
+
+def test_optimize_without_room_returns_none():
+    assert SystemSizeOptimizer.optimize(CONSUMPTION, IRRADIANCE, "EGGSA", "BT", "Guatemala", roof_area_m2=1) is None
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from logic.energy.consumption_calculator import ConsumptionCalculator
+from logic.generation.hourly_simulator import HourlyGenerationSimulator
+from logic.utils.billing_calculator import BillingCalculator
+from logic.utils.hourly_calendar import HOUR_OF_DAY, monthly_totals
+from logic.utils.tariff_engine import TariffBillingEngine, TariffSchedule
+
+MONTHLY = [240, 230, 250, 260, 270, 265, 255, 250, 245, 240, 235, 250]
+IRRADIANCE = [5.05, 5.28, 5.54, 5.68, 5.71, 5.60, 5.60, 5.50, 5.43, 5.35, 5.15, 5.01]
+BASE = {"fixedCharge": 10.0, "pricePerKwh": 1.5, "municipalityFee": 0.1}
+
+def _profiles():
+    consumption = ConsumptionCalculator.synthesize_hourly_load_profile(MONTHLY)
+    generation = HourlyGenerationSimulator.simulate_hourly_generation(3, 14.63, -90.51, IRRADIANCE)
+    return consumption, generation
+
+def test_flat_tariff_without_solar_matches_monthly_billing():
+    consumption, _ = _profiles()
+    hourly = BillingCalculator.generate_hourly_cost_comparison(consumption, np.zeros(8760), "EGGSA", "BT", "Guatemala")
+    monthly = BillingCalculator.generate_annual_cost_comparison(
+        monthly_totals(consumption).tolist(), [0] * 12, "EGGSA", "BT", "Guatemala"
+    )
+    assert hourly["annual_cost_without_solar"] == pytest.approx(monthly["annual_cost_without_solar"], abs=0.05)
+
+def test_net_billing_gives_less_savings_than_net_metering():
+    consumption, generation = _profiles()
+    metering = TariffSchedule(BASE)
+    billing = TariffSchedule({**BASE, "exportCredit": {"mode": "net_billing", "pricePerKwh": 0.5}})
+    none = TariffSchedule({**BASE, "exportCredit": {"mode": "none"}})
+
+    bills = [TariffBillingEngine.bill_year(consumption, generation, s).sum() for s in (metering, billing, none)]
+    assert bills[0] < bills[1] < bills[2]
+
+def test_carryover_credit_reduces_later_bills():
+    consumption = np.full(8760, 0.2)
+    generation = np.where(HOUR_OF_DAY == 12, 10.0, 0.0) * (np.arange(8760) < 744)
+    plain = TariffSchedule(BASE)
+    carry = TariffSchedule({**BASE, "exportCredit": {"mode": "net_metering", "carryover": True}})
+    assert TariffBillingEngine.bill_year(consumption, generation, carry)[0, 1] < TariffBillingEngine.bill_year(consumption, generation, plain)[0, 1]
+
+def test_energy_blocks_and_demand_charge():
+    schedule = TariffSchedule({**BASE, "energyBlocks": [{"upToKwh": 100, "pricePerKwh": 1.0}, {"upToKwh": None, "pricePerKwh": 2.0}]})
+    assert schedule.energy_charge(np.array([50.0, 150.0])).tolist() == [50.0, 200.0]
+
+    demand = TariffSchedule({**BASE, "demandCharge": 10.0})
+    consumption = np.full(8760, 1.0)
+    difference = TariffBillingEngine.bill_year(consumption, None, demand) - TariffBillingEngine.bill_year(consumption, None, TariffSchedule(BASE))
+    assert np.allclose(difference, 10.0 * 1.1 * 1.12, atol=0.011)
+
+def test_time_of_use_prices_peak_hours():
+    schedule = TariffSchedule({**BASE, "touPeriods": [{"name": "peak", "hours": [18, 19, 20], "pricePerKwh": 3.0}]})
+    assert schedule.is_time_of_use
+    assert schedule.hourly_price[18] == 3.0 and schedule.hourly_price[12] == 1.5
+
+    evening = np.where(np.isin(HOUR_OF_DAY, [18, 19, 20]), 1.0, 0.0)
+    midday = np.where(np.isin(HOUR_OF_DAY, [11, 12, 13]), 1.0, 0.0)
+    assert TariffBillingEngine.bill_year(evening, None, schedule).sum() > TariffBillingEngine.bill_year(midday, None, schedule).sum()
+
+def test_compare_many_customers():
+    consumption, generation = _profiles()
+    stack = np.tile(consumption, (5, 1))
+    result = TariffBillingEngine.compare(stack, generation, "EGGSA", ["BT", "BTS", "BT", "BTS", "BT"], "Guatemala", chunk_size=2)
+    assert result["annual_savings"].shape == (5,)
+    assert result["annual_savings"][0] == result["annual_savings"][2]
+    assert result["annual_cost_without_solar"][1] > result["annual_cost_without_solar"][0]
@@ -0,0 +1,79 @@
+import json
+from datetime import date
+
+import pytest
+
+from logic.utils.tariff_history import TariffHistory, parse_period, parse_tariff_series, regenerate_pricing, sync_tariff_history
+
+@pytest.mark.parametrize("label, expected", [
+    ("2024-02-01", date(2024, 2, 1)),
+    ("2024-05", date(2024, 5, 1)),
+    ("01/08/2023", date(2023, 8, 1)),
+    ("11/2023", date(2023, 11, 1)),
+    ("Feb-2024", date(2024, 2, 1)),
+    ("febrero 24", date(2024, 2, 1)),
+    ("Ago-Oct 2022", date(2022, 8, 1)),
+    ("sin fecha", None),
+])
+def test_parse_period(label, expected):
+    assert parse_period(label) == expected
+
+RECORDS = [
+    {"category": "Feb-2024", "value1": "1.35", "value2": "1.45"},
+    {"category": "May-2024", "value1": "1.40", "value2": "1.50"},
+    {"category": "Ago-2024", "value1": "1,42", "value2": ""},
+    {"category": "total", "value1": "9", "value2": "9"},
+]
+
+@pytest.fixture
+def history(tmp_path):
+    history = TariffHistory(str(tmp_path / "history.sqlite"))
+    yield history
+    history.close()
+
+def test_upsert_is_incremental(history):
+    rows = parse_tariff_series(RECORDS)
+    assert len(rows) == 5
+    assert history.upsert("EGGSA", rows) == 5
+    assert history.upsert("EGGSA", rows) == 0
+    assert history.upsert("EGGSA", [("TS", date(2024, 8, 1), 1.43)]) == 1
+
+def test_tariff_at_returns_tariff_in_force(history):
+    history.upsert("EGGSA", parse_tariff_series(RECORDS))
+    assert history.tariff_at("EGGSA", "BTS", date(2024, 1, 31)) is None
+    assert history.tariff_at("EGGSA", "BTS", date(2024, 4, 30))["price_per_kwh"] == 1.45
+    assert history.tariff_at("EGGSA", "BTS", date(2025, 1, 1))["effective_from"] == date(2024, 5, 1)
+    assert history.tariff_at("EGGSA", "TS", date(2025, 1, 1))["price_per_kwh"] == 1.42
+
+def test_regenerate_pricing(history, tmp_path):
+    history.upsert("EGGSA", parse_tariff_series(RECORDS))
+    path = tmp_path / "pricing.json"
+    path.write_text(json.dumps({
+        "EGGSA": {"BT": {"Guatemala": {"fixedCharge": 11.198, "pricePerKwh": 1.0, "municipalityFee": 0.13}}},
+        "DEOCSA": {"BT": {"Guatemala": {"fixedCharge": 11.198, "pricePerKwh": 1.0, "municipalityFee": 0.13}}},
+    }))
+
+    assert regenerate_pricing(history, str(path), as_of=date(2024, 6, 1)) == 1
+    pricing = json.loads(path.read_text())
+    assert pricing["EGGSA"]["BT"]["Guatemala"] == {
+        "fixedCharge": 11.198, "pricePerKwh": 1.40, "municipalityFee": 0.13, "effectiveFrom": "2024-05-01",
+    }
+    assert pricing["DEOCSA"]["BT"]["Guatemala"]["pricePerKwh"] == 1.0
+    assert regenerate_pricing(history, str(path), as_of=date(2024, 6, 1)) == 0
+
+def test_sync_reports_failures(history):
+    class FakeFuture:
+        def __init__(self, records=None):
+            self.records = records
+
+        def result(self):
+            if self.records is None:
+                raise ConnectionError("down")
+            return self.records
+
+    class FakeClient:
+        def submit(self, key):
+            return FakeFuture(RECORDS if key[0] == 1 else None)
+
+    summary = sync_tariff_history(history, FakeClient(), ["EGGSA", "DEOCSA"])
+    assert summary == {"EGGSA": 5, "DEOCSA": None}
@@ -0,0 +1,95 @@
+import json
+
+import numpy as np
+import pytest
+
+from logic.utils.data_loader import DataStore
+from logic.utils.tmy_dataset import TMYDataset, build_tmy_dataset, read_tmy_csv
+
+HOURS = np.arange(8760)
+
+def hourly_pattern(offset):
+    # Distinct value for every local hour, so time shifts are easy to check
+    return (HOURS + offset) % 1000
+
+def write_pvgis(path, latitude, longitude, offset):
+    lines = [
+        f"Latitude (decimal degrees):\t{latitude}",
+        f"Longitude (decimal degrees):\t{longitude}",
+        "Elevation (m):\t1500",
+        "month,year",
+        "1,2012",
+        "time(UTC),T2m,RH,G(h),Gb(n),Gd(h),IR(h),WS10m,WD10m,SP",
+    ]
+    # PVGIS times are UTC: local hour h is UTC hour h + 6 in Guatemala
+    values = np.roll(hourly_pattern(offset), 6)
+    for hour, value in zip(range(8760), values):
+        day = hour // 24
+        month = np.searchsorted(np.cumsum([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]), day, side="right") + 1
+        day_of_month = day - ([0] + list(np.cumsum([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])))[month - 1] + 1
+        lines.append(f"2012{month:02d}{day_of_month:02d}:{hour % 24:02d}10,20.0,80,{value},{value / 2},{value / 4},300,1.5,90,85000")
+    lines += ["", "T2m: 2-m air temperature (degree Celsius)"]
+    path.write_text("\n".join(lines) + "\n")
+
+def write_nsrdb(path, latitude, longitude, offset):
+    lines = [
+        "Source,Location ID,City,State,Country,Latitude,Longitude,Time Zone,Elevation",
+        f"NSRDB,1,-,-,-,{latitude},{longitude},-6,1200",
+        "Year,Month,Day,Hour,Minute,GHI,DNI,DHI,Temperature,Wind Speed",
+    ]
+    days = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    hour = 0
+    for month, count in enumerate(days, start=1):
+        for day in range(1, count + 1):
+            for h in range(24):
+                value = hourly_pattern(offset)[hour]
+                lines.append(f"2010,{month},{day},{h},30,{value},{value / 2},{value / 4},22.5,2.0")
+                hour += 1
+    path.write_text("\n".join(lines) + "\n")
+
+@pytest.fixture
+def sources(tmp_path):
+    pvgis, nsrdb = tmp_path / "guatemala.csv", tmp_path / "coban.csv"
+    write_pvgis(pvgis, 14.634, -90.507, 0)
+    write_nsrdb(nsrdb, 15.47, -90.37, 100)
+    return [str(pvgis), str(nsrdb)]
+
+def test_read_formats_align_to_local_time(sources):
+    pvgis, nsrdb = (read_tmy_csv(source) for source in sources)
+    assert pvgis["latitude"] == 14.634 and pvgis["elevation"] == 1500
+    assert np.array_equal(pvgis["ghi"], hourly_pattern(0))
+    assert np.array_equal(nsrdb["ghi"], hourly_pattern(100))
+    assert nsrdb["temp_air"][0] == 22.5
+
+def test_dataset_sites_are_lazy_views(sources, tmp_path):
+    path = tmp_path / "tmy.bin"
+    assert build_tmy_dataset(sources, str(path)) == 2
+    dataset = TMYDataset(str(path))
+
+    site = dataset.site(1)
+    assert site["name"] == "coban"
+    assert site["ghi"].shape == (8760,)
+    assert not site["ghi"].flags.owndata and not site["ghi"].flags.writeable
+    assert site["dni"][5] == pytest.approx(hourly_pattern(100)[5] / 2)
+
+def test_nearest_site(sources, tmp_path):
+    path = tmp_path / "tmy.bin"
+    build_tmy_dataset(sources, str(path))
+    dataset = TMYDataset(str(path))
+
+    assert dataset.nearest(14.6, -90.5)[0] == 0
+    indices, distances = dataset.nearest_many([14.6, 15.5, 17.0], [-90.5, -90.4, -90.0])
+    assert indices.tolist() == [0, 1, 1]
+    assert distances[0] < 5
+    assert dataset.site_at(14.6, -90.5)["name"] == "guatemala"
+    assert dataset.site_at(17.0, -90.0) is None
+
+def test_store_tmy_site(sources, tmp_path):
+    build_tmy_dataset(sources, str(tmp_path / "tmy.bin"))
+    pricing, irradiance = tmp_path / "pricing.json", tmp_path / "irradiance_monthly.json"
+    pricing.write_text("{}")
+    irradiance.write_text(json.dumps({}))
+    store = DataStore(str(pricing), str(irradiance))
+    assert store.tmy_site(14.6, -90.5)["name"] == "guatemala"
+    assert store.tmy_site() is None
+    assert store.version[3] is not None